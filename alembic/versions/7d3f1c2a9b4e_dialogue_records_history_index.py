@@ -0,0 +1,34 @@
+"""dialogue_records history index
+
+Revision ID: 7d3f1c2a9b4e
+Revises: 2cb0a09b9194
+Create Date: 2026-10-17 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f1c2a9b4e'
+down_revision: Union[str, Sequence[str], None] = '2cb0a09b9194'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 会话历史查询：WHERE conversation_id = ? AND is_removed = false ORDER BY created_at DESC, id DESC
+    op.create_index(
+        'ix_dialogue_records_conversation_history',
+        'dialogue_records',
+        ['conversation_id', 'is_removed', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_dialogue_records_conversation_history', table_name='dialogue_records')
@@ -14,6 +14,8 @@ from src.modules import (
     get_record_business as handler_get_record_business,
     conversation_router, record_router, user_router
 )
+from src.modules.services.agent import HistoryCache, ToolExecutor
+from src.modules.services.business import LocalOwnershipCache
 from src.utils import BaseResponse, root_path
 from config import ConfigLoader
 from fastapi.middleware.cors import CORSMiddleware
@@ -39,9 +41,14 @@ def check_ownership_function_generator():
 
 
 # 初始化DAO和业务对象
-user_business_instance = UserBusiness(db_config)
-conversation_business_instance = ConversationBusiness(db_config)
-record_business_instance = DialogueRecordBusiness(db_config)
+# 会话归属缓存，config.yaml 中 ownership_cache: {max_size, ttl}；UserBusiness 与 ConversationBusiness 共用
+ownership_cache = LocalOwnershipCache(**CONFIG.get_config().get("ownership_cache", {}))
+user_business_instance = UserBusiness(db_config, ownership_cache=ownership_cache)
+conversation_business_instance = ConversationBusiness(db_config, ownership_cache=ownership_cache)
+# 可选的对话记录写后缓冲，config.yaml 中 dialogue_records.write_buffer: {max_batch, flush_interval}
+record_business_instance = DialogueRecordBusiness(
+    db_config, write_buffer=CONFIG.get_config().get("dialogue_records", {}).get("write_buffer")
+)
 
 # 注册工具
 """
@@ -56,11 +63,21 @@ note: 调用了这个工具就要输出 images = ["<图片链接1>", "<图片链
 """
 meal_top_k = 3
 registry = Registry()
-registry.register(MealService())
+# 订餐服务选项，config.yaml 中 meal_service: {max_workers, speculative_encode, encode_cache: {path, ttl, max_entries}}
+registry.register(MealService(**CONFIG.get_config().get("meal_service", {})))
 registry.register(TicketQueryMappingDate())
 registry.register(WeatherQuery())
 registry.register(TravelPlan())
-agent_manager_instance = AgentManager(tools=registry, record_business=record_business_instance, prompt_template=prompt)
+agent_config = CONFIG.get_config().get("agent", {})
+# 可选的跨请求历史缓存，config.yaml 中配置 agent.history_cache: {max_size, ttl} 后启用
+history_cache_config = agent_config.get("history_cache")
+history_cache = HistoryCache(**history_cache_config) if history_cache_config else None
+# 同一步多个工具调用的线程池与超时，config.yaml 中 agent.tools: {max_workers, timeout, timeouts: {工具名: 秒}}
+tool_executor = ToolExecutor(**agent_config.get("tools", {}))
+# prompt 选项，config.yaml 中 agent.prompt: {date_bucket_seconds, duplicate_system_prompt}
+agent_manager_instance = AgentManager(tools=registry, record_business=record_business_instance, prompt_template=prompt,
+                                      history_cache=history_cache, prompt_options=agent_config.get("prompt"),
+                                      tool_executor=tool_executor)
 
 
 
@@ -8,13 +8,19 @@ from typing import Generator, Dict, Any
 import os
 import yaml
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session                
 
 # 设置日志记录
 logger = logging.getLogger(__name__)
 
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
 class DataBaseSession:
 
     # def __init__(self, config: Dict[str, Any], is_regenerating_table: bool) -> None:
@@ -68,6 +74,8 @@ class DataBaseSession:
                     echo=db_cfg.get("echo", False),
                     connect_args={"check_same_thread": False}
                 )
+                # SQLite 默认不检查外键，写入对话记录依赖外键约束校验会话与用户是否存在
+                event.listen(self.__engine, "connect", _enable_sqlite_foreign_keys)
             else:
                 logger.info("Creating SQLAlchemy engine...")
                 self.__engine = create_engine(
@@ -4,6 +4,8 @@ from src.modules.dbController.models.conversation import Conversation
 from src.modules.dbController.models.user import User
 from src.modules.dbController.basis.dbSession import DatabaseSessionManager
 from typing import List
+from datetime import datetime
+from sqlalchemy import and_, or_, insert
 from sqlalchemy.exc import IntegrityError
 
 logger = logging.getLogger(__name__)
@@ -31,48 +33,73 @@ class DialogueRecordDAO:
 
     def create_dialogue_record(self, record: DialogueRecord) -> DialogueRecord:
         """
-        创建对话记录
+        创建对话记录。直接 INSERT，由外键与主键约束保证完整性，只有违反约束时才额外查询以确定原因
         :param record: DialogueRecord对象
         :return: 创建的DialogueRecord对象
         :raises ValueError: 会话或用户不存在，或conversation_id为None
         :raises LookupError: 记录已存在
         """
+        if not getattr(record, 'conversation_id', None):
+            raise ValueError("DialogueRecord.conversation_id cannot be None.")
+        if not getattr(record, 'user_id', None):
+            raise ValueError("DialogueRecord.user_id cannot be None.")
         with self.__db_session_manager.get_session() as session:
-            # 检查会话和用户是否存在
-            if not getattr(record, 'conversation_id', None):
-                raise ValueError("DialogueRecord.conversation_id cannot be None.")
-            if not getattr(record, 'user_id', None):
-                raise ValueError("DialogueRecord.user_id cannot be None.")
-            conversation_exists = session.query(Conversation).filter(Conversation.id == record.conversation_id).first()
-            if not conversation_exists:
-                raise ValueError(f"Conversation with ID {record.conversation_id} does not exist. Cannot create dialogue record.")
-            user_exists = session.query(User).filter(User.id == record.user_id).first()
-            if not user_exists:
-                raise ValueError(f"User with ID {record.user_id} does not exist. Cannot create dialogue record.")
-            # 检查记录是否已存在
-            if record.id is not None:
-                existing_record = session.query(DialogueRecord).filter(DialogueRecord.id == record.id).first()
-                if existing_record:
-                    if existing_record.is_removed:
-                        raise ValueError(f"Dialogue record with ID {record.id} has been soft-deleted.")
-                    raise LookupError(f"Dialogue record with ID {record.id} already exists.")
-            if not getattr(record, 'conversation_id', None):
-                raise ValueError("DialogueRecord.conversation_id cannot be None.")
-            if not getattr(record, 'user_id', None):
-                raise ValueError("DialogueRecord.user_id cannot be None.")
-            
+            # 提交后不再回读，返回的对象保持写入时的值
+            session.expire_on_commit = False
             try:
                 session.add(record)
                 session.commit()
-                logger.info(f"Dialogue record created successfully: {record}")
-                if record.id is None:
-                    raise ValueError("Dialogue Record ID cannot be automatically generated.")
-                return record
             except IntegrityError as e:
                 session.rollback()
                 logger.error(f"Error creating Dialogue Record:完整性约束不能满足 {e}")
+                self._raise_for_integrity_error(record.conversation_id, record.user_id, record.id)
+                raise
+            logger.info(f"Dialogue record created successfully: {record}")
+            if record.id is None:
+                raise ValueError("Dialogue Record ID cannot be automatically generated.")
+            return record
+
+    def create_dialogue_records(self, records: List[DialogueRecord]) -> None:
+        """
+        批量创建对话记录，在一个事务中以多行 INSERT 写入
+        :param records: DialogueRecord对象列表（需已设置 id）
+        :raises IntegrityError: 任一记录违反约束，整批回滚
+        """
+        if not records:
+            return
+        # 未设置的非空列交给列默认值；可空列总是带上，使各行的列集合一致，合并为同一条多行 INSERT
+        columns = DialogueRecord.__table__.columns
+        rows = [
+            {column.key: getattr(record, column.key) for column in columns
+             if column.nullable or getattr(record, column.key) is not None}
+            for record in records
+        ]
+        with self.__db_session_manager.get_session() as session:
+            try:
+                session.execute(insert(DialogueRecord), rows)
+                session.commit()
+                logger.info(f"{len(rows)} dialogue records created in one batch.")
+            except IntegrityError as e:
+                session.rollback()
+                logger.error(f"Error creating Dialogue Records in batch:完整性约束不能满足 {e}")
                 raise
 
+    def _raise_for_integrity_error(self, conversation_id: str, user_id: str, record_id: str | None) -> None:
+        """
+        INSERT 违反约束后查明原因，按 create_dialogue_record 的约定抛出 ValueError / LookupError
+        """
+        with self.__db_session_manager.get_session() as session:
+            if not session.query(Conversation.id).filter(Conversation.id == conversation_id).first():
+                raise ValueError(f"Conversation with ID {conversation_id} does not exist. Cannot create dialogue record.")
+            if not session.query(User.id).filter(User.id == user_id).first():
+                raise ValueError(f"User with ID {user_id} does not exist. Cannot create dialogue record.")
+            if record_id is not None:
+                existing = session.query(DialogueRecord.is_removed).filter(DialogueRecord.id == record_id).first()
+                if existing is not None:
+                    if existing.is_removed:
+                        raise ValueError(f"Dialogue record with ID {record_id} has been soft-deleted.")
+                    raise LookupError(f"Dialogue record with ID {record_id} already exists.")
+
     def update_dialogue_record(self, record: DialogueRecord) -> DialogueRecord:
         """
         更新对话记录
@@ -154,7 +181,7 @@ class DialogueRecordDAO:
         :raises LookupError: 如果没有找到对话记录
         """
         with self.__db_session_manager.get_session() as session:
-            reversed_records = session.query(DialogueRecord).filter(DialogueRecord.conversation_id == conversation_id, DialogueRecord.is_removed == False).order_by(DialogueRecord.created_at.desc()).limit(last_n).all()
+            reversed_records = session.query(DialogueRecord).filter(DialogueRecord.conversation_id == conversation_id, DialogueRecord.is_removed == False).order_by(DialogueRecord.created_at.desc(), DialogueRecord.id.desc()).limit(last_n).all()
             # if last_n is not None:
             #     reversed_records = reversed_records[:last_n]
             ordered_dialogue_records = reversed_records[::-1]  # Reverse to maintain chronological order
@@ -162,3 +189,30 @@ class DialogueRecordDAO:
                 logger.warning(f"No dialogue records found for conversation ID: {conversation_id}")
                 raise LookupError(f"No dialogue records found for conversation ID {conversation_id}.")
             return ordered_dialogue_records
+
+    def get_records_page(self, conversation_id: str, limit: int,
+                         before: tuple[datetime, str] | None = None) -> List[DialogueRecord]:
+        """
+        按 (created_at, id) 倒序分页获取会话的对话记录（keyset 分页，走 ix_dialogue_records_conversation_history 索引）
+        :param conversation_id: 会话ID
+        :param limit: 本页最多返回的记录数
+        :param before: 游标 (created_at, id)，只返回严格早于该记录的记录；None 表示从最新一条开始
+        :return: 对话记录列表，从新到旧
+        :raises LookupError: 第一页（before 为 None）没有任何记录
+        """
+        with self.__db_session_manager.get_session() as session:
+            query = session.query(DialogueRecord).filter(
+                DialogueRecord.conversation_id == conversation_id,
+                DialogueRecord.is_removed == False
+            )
+            if before is not None:
+                created_at, record_id = before
+                query = query.filter(or_(
+                    DialogueRecord.created_at < created_at,
+                    and_(DialogueRecord.created_at == created_at, DialogueRecord.id < record_id)
+                ))
+            records = query.order_by(DialogueRecord.created_at.desc(), DialogueRecord.id.desc()).limit(limit).all()
+            if not records and before is None:
+                logger.warning(f"No dialogue records found for conversation ID: {conversation_id}")
+                raise LookupError(f"No dialogue records found for conversation ID {conversation_id}.")
+            return records
@@ -1,5 +1,6 @@
 import logging
 
+from sqlalchemy import and_
 from sqlalchemy.orm import make_transient
 
 from src.modules.dbController.models.record import DialogueRecord
@@ -195,15 +196,19 @@ class UserDAO:
         :raises ValueError: 如果用户已被软删除
         """
         with self.__db_session_manager.get_session() as session:
-            user = session.query(User).filter(User.id == user_id).first()
-            if not user:
+            # 用户与其未删除的会话一次查询取回
+            row = session.query(User.is_removed, Conversation.id).outerjoin(
+                Conversation,
+                and_(Conversation.user_id == User.id, Conversation.id == conversation_id, Conversation.is_removed == False)
+            ).filter(User.id == user_id).first()
+            if not row:
                 logger.warning(f"User with ID {user_id} not found or is marked as removed.")
                 raise LookupError(f"User with ID {user_id} not found.")
-            if user.is_removed:
+            user_is_removed, owned_conversation_id = row
+            if user_is_removed:
                 logger.warning(f"User with ID {user_id} is marked as removed.")
                 raise ValueError(f"User with ID {user_id} is marked as removed.")
-            conversation = session.query(Conversation).filter(Conversation.id == conversation_id, Conversation.user_id == user_id, Conversation.is_removed == False).first()
-            if not conversation:
+            if owned_conversation_id is None:
                 logger.warning(f"Conversation with ID {conversation_id} not found for user {user_id}.")
                 return False
             logger.info(f"User {user_id} owns conversation {conversation_id}.")
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional, List
 
-from sqlalchemy import String, ForeignKey, Text, Boolean, DateTime, types
+from sqlalchemy import String, ForeignKey, Text, Boolean, DateTime, Index, types
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -26,6 +26,10 @@ class JsonEncodedList(types.TypeDecorator):
 class DialogueRecord(Base):
     """对话记录表"""
     __tablename__ = "dialogue_records"
+    __table_args__ = (
+        # 会话历史按 (created_at, id) 倒序分页读取，见 alembic 7d3f1c2a9b4e
+        Index("ix_dialogue_records_conversation_history", "conversation_id", "is_removed", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     conversation_id: Mapped[str] = mapped_column(String(36), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
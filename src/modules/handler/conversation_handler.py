@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Header
+from fastapi import APIRouter, HTTPException, Depends, status, Header, Query
 from pydantic import BaseModel, Field
 from typing import Optional, TYPE_CHECKING, List, Any, Dict
 from src.utils.response import BaseResponse
@@ -30,6 +30,7 @@ class SessionsResponse(BaseModel):
 
 class HistoryResponse(BaseModel):
     history: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
 
 
 
@@ -208,10 +209,23 @@ def delete_session(session_id: str, current_user=Depends(get_current_user), conv
         )
 
 @conversation_router.get("/session/{session_id}/history", summary="获取会话历史", response_model=BaseResponse)
-def get_session_history(session_id: str, current_user=Depends(get_current_user), conversation_business: 'ConversationBusiness' = Depends(get_conversation_business), record_business: 'DialogueRecordBusiness' = Depends(get_record_business)):
+def get_session_history(session_id: str,
+                        limit: int = Query(50, ge=1, le=200, description="每页记录数"),
+                        cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，不传则返回最新的记录"),
+                        current_user=Depends(get_current_user), conversation_business: 'ConversationBusiness' = Depends(get_conversation_business), record_business: 'DialogueRecordBusiness' = Depends(get_record_business)):
     try:
-        records = record_business.list_records_by_conversation(session_id)
-        return BaseResponse(msg="Success", data={"history": [r.__dict__ for r in records]})
+        records, next_cursor = record_business.list_records_page(session_id, limit=limit, cursor=cursor)
+        return BaseResponse(msg="Success", data={"history": [r.__dict__ for r in records], "next_cursor": next_cursor})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "status": "error",
+                "message": "Invalid history cursor.",
+                "error_code": "VALUE_ERROR",
+                "error_message": str(e)
+            }
+        )
     except LookupError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,4 +1,8 @@
+import json
+import logging
 from fastapi import APIRouter, HTTPException, Depends, status, Header
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Optional, TYPE_CHECKING, Any
 from src.utils.response import BaseResponse
@@ -7,6 +11,8 @@ from src.utils.auth_dependency import encode_user_id, get_current_user
 if TYPE_CHECKING:
     from src.modules.services.agent.agent_manager import AgentManager
 
+logger = logging.getLogger(__name__)
+
 def get_agent_manager() -> 'AgentManager':
     raise NotImplementedError("请在 main.py 中通过 Depends 覆盖此依赖")
 
@@ -22,33 +28,52 @@ class ChatRequest(BaseModel):
     query: str = Field(..., description="用户查询内容")
 
 @record_router.post("/chat", summary="会话对话", response_model=BaseResponse)
-def chat(req: ChatRequest, current_user=Depends(get_current_user), agent_manager: 'AgentManager' = Depends(get_agent_manager), ownership_checker = Depends(check_ownership_function_generator)):
+async def chat(req: ChatRequest, current_user=Depends(get_current_user), agent_manager: 'AgentManager' = Depends(get_agent_manager), ownership_checker = Depends(check_ownership_function_generator)):
     try:
         user_id = current_user
-        # user 一定要拥有session
-        if not ownership_checker(user_id, req.session_id):
+        # user 一定要拥有session（数据库查询，放到线程池中避免阻塞事件循环）
+        if not await run_in_threadpool(ownership_checker, user_id, req.session_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限访问该会话")
-        # 开始锁 agent
-        answer = agent_manager.get_and_use_agent(user_id, req.session_id, req.query)
-        # 结束锁 agent
+        # 异步调用 agent，等待 LLM 时不占用 worker 线程
+        answer = await agent_manager.acall_agent(user_id, req.session_id, req.query)
         return BaseResponse(msg="success", data=answer)
     except HTTPException as e:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@record_router.post("/chat/stream", summary="会话对话（流式）", response_model=BaseResponse)
-def chat_stream(req: ChatRequest, current_user=Depends(get_current_user), agent_manager: 'AgentManager' = Depends(get_agent_manager), ownership_checker = Depends(check_ownership_function_generator)):
+def format_sse(event: dict) -> str:
+    """
+    将 agent 事件编码为一条 Server-Sent Event：event 为事件类型，data 为事件的 JSON
+    """
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+@record_router.post("/chat/stream", summary="会话对话（流式，SSE）")
+async def chat_stream(req: ChatRequest, current_user=Depends(get_current_user), agent_manager: 'AgentManager' = Depends(get_agent_manager), ownership_checker = Depends(check_ownership_function_generator)):
     try:
         user_id = current_user
         # user 一定要拥有session
-        if not ownership_checker(user_id, req.session_id):
+        if not await run_in_threadpool(ownership_checker, user_id, req.session_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限访问该会话")
-        # 开始锁 agent
-        answer_generator = agent_manager.stream_agent(user_id, req.session_id, req.query)
-        # 结束锁 agent
-        return BaseResponse(msg="success", data=answer_generator)
+        events = agent_manager.astream_agent(user_id, req.session_id, req.query)
     except HTTPException as e:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_stream():
+        try:
+            async for event in events:
+                yield format_sse(event)
+        except Exception as e:
+            # 响应头已发出，只能以 error 事件告知前端
+            logger.error(f"Error during chat stream: {e}")
+            yield format_sse({"type": "error", "content": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
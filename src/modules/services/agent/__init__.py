@@ -1,7 +1,11 @@
 from .agent_manager import AgentManager
 from .prompt import prompt
+from .history_cache import HistoryCache
+from .tool_executor import ToolExecutor
 
 __all__ = [
     "AgentManager",
-    "prompt"
+    "prompt",
+    "HistoryCache",
+    "ToolExecutor",
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
-from typing import Any
+from typing import Any, AsyncGenerator
 import sys
 import json
 import copy
+import functools
+import asyncio
 import logging
 from datetime import datetime
 import threading
@@ -11,11 +13,13 @@ if str(get_root_path()) not in sys.path:
     sys.path.append(str(get_root_path()))
 
 from .state import State
+from .history_cache import HistoryCache
 from .parser import LLMOutputParser
 from .prompt_builder import PromptBuilder
+from .tool_executor import ToolExecutor, get_default_tool_executor
 
 from src.modules.services.business.record_bussiness import DialogueRecordBusiness
-from src.utils.chatgpt import feed_LLM_full, gather_llm_output
+from src.utils.chatgpt import feed_LLM_full, gather_llm_output, afeed_LLM_full, agather_llm_output
 from src.modules.services.service_basis.ToolRegistry import Registry
 from src.modules.services.service_basis.user_info import UserInfo
 from src.modules.services.service_basis.basis.tool import Tool
@@ -28,15 +32,22 @@ class Agent():
     Refactored to separate concerns: Logic (Agent), Data (State), Parsing (Parser), View (PromptBuilder).
     """
 
-    def __init__(self, user_id: str, conversation_id: str, record_business: DialogueRecordBusiness, tools: Registry, prompt_template: str):
+    def __init__(self, user_id: str, conversation_id: str, record_business: DialogueRecordBusiness, tools: Registry, prompt_template: str,
+                 history_cache: HistoryCache | None = None, prompt_options: dict | None = None,
+                 tool_executor: ToolExecutor | None = None):
         # State 只负责数据存储
-        self.state = State(user_id, conversation_id, record_business)
+        self.state = State(user_id, conversation_id, record_business, history_cache=history_cache)
         
         # PromptBuilder 负责构建 Prompt
-        self.prompt_builder = PromptBuilder(prompt_template, str(tools), tools.list_services())
+        # prompt_options: PromptBuilder 的可选参数（date_bucket_seconds / duplicate_system_prompt）
+        self.prompt_builder = PromptBuilder(prompt_template, str(tools), tools.list_services(), **(prompt_options or {}))
         
         self.llm = gather_llm_output(feed_LLM_full)
+        # 异步版本，供 acall 使用：等待模型输出时不占用线程
+        self.allm = agather_llm_output(afeed_LLM_full)
         self.tools = tools
+        # 同一步中多个工具调用的并发执行器（有界线程池 + 超时），默认所有 Agent 共用一个
+        self.tool_executor = tool_executor or get_default_tool_executor()
         self.user_info = UserInfo(user_id=user_id, ticket_info={})
         self.lock = threading.Lock()
 
@@ -45,99 +56,51 @@ class Agent():
         
         while True:
             # 1. Build Prompt (View)
-            messages = self.prompt_builder.build(
-                query=query,
-                history=self.state.get_history(),
-                context=self.state.get_context()
-            )
-            
-            logger.debug(f"Prompt Messages: {messages}")
+            messages = self._build_messages(query)
             
             # 2. LLM Call (IO)
             response = self.llm(messages)
             logger.debug(f"LLM response: {response}")
 
             # 3. Logic & Control Flow
-            
-            # Check for Final Answer first
-            if LLMOutputParser.is_final_answer(response):
-                try:
-                    final_res = LLMOutputParser.parse_final_answer(response)
-                    self.state.set_final_answer(final_res)
-                    self.state.save_to_db()
-                    break 
-                except ValueError as e:
-                     logger.error(f"Error parsing Final Answer: {e}")
-                     # Continue to treat as thought/action or retry?
-                     # If parsing failed but "Final Answer" is present, it's risky to continue.
-                     # But for now, let's treat it as a normal response that might be malformed.
-                     pass 
-
-            # Parse Thought/Action
-            parsed_ta = LLMOutputParser.parse_thought_action(response)
-            self.state.set_thought_action(parsed_ta)
-            
-            action_name = parsed_ta.get("action")
-            action_input = parsed_ta.get("action_input")
-
-            # Check loop limit
-            if self.state.looper.is_maxed_out():
-                logger.warning("Maximum loop count reached; generating final answer.")
-                fallback_dict = {
-                    "thought": "Max steps reached",
-                    "answer": "I'm sorry, I couldn't arrive at a final answer within the allowed number of steps.",
-                    "picture": []
-                }
-                self.state.set_final_answer(fallback_dict)
-                self.state.save_to_db()
+            final_answer, actions = self._handle_response(response)
+            if final_answer is not None:
                 break
-            
-            self.state.looper.increment()
 
-            # Execute Tool
-            tools_output = ""
-            if action_name == "ERROR":
-                 tools_output = f"Format Error: Could not parse Thought and Action from your response. Please follow the format strictly.\nExpected format:\nThought: ...\nAction: ...\nAction Input: ..."
-            elif not action_name:
-                 logger.warning("LLM did not provide an action name; skipping tool call. action_input=%s", action_input)
-                 tools_output = f"No action produced by LLM. action_input={action_input}"
-            else:
-                 try:
-                     service: Tool = self.tools.get_service(action_name)
-                     copy_input = copy.deepcopy(action_input)
-                     
-                     # Build history for tool (without system prompt)
-                     tool_history = self.prompt_builder.build(
-                        query=query,
-                        history=self.state.get_history(),
-                        context=self.state.get_context(),
-                        include_system_prompt=False
-                     )
-                     
-                     tools_output = service(
-                        copy_input, 
-                        self.user_info,
-                        tool_history
-                     )
-                     
-                     # Serialize tool output to JSON
-                     try:
-                        tools_output = json.dumps(tools_output, ensure_ascii=False, default=str)
-                     except Exception:
-                        tools_output = str(tools_output)
-                        
-                 except KeyError:
-                    logger.error(f"Service '{action_name}' not found in tools registry.")
-                    tools_output = f"Service '{action_name}' not found. Please check the service name and try again."
-                 except Exception as e:
-                    logger.error(f"Error executing tool '{action_name}': {e}")
-                    tools_output = f"Error executing tool '{action_name}': {str(e)}"
+            # Execute Tools（同一步中的多个调用并行执行）
+            tools_output = self._execute_actions(query, actions)
 
             # Update Observation (Data)
             self.state.update_observation(tools_output)
 
         return self.state.get_final_result()
 
+    async def acall(self, query: str) -> dict:
+        """
+        __call__ 的异步版本：LLM 调用走共享的 AsyncOpenAI 客户端，数据库读写与工具在线程池中执行，
+        等待期间不阻塞事件循环
+        :param query: 用户输入
+        :return: Agent 处理结果字典
+        """
+        self.state.init_query(query)
+
+        while True:
+            messages = await asyncio.to_thread(self._build_messages, query)
+
+            response = await self.allm(messages)
+            logger.debug(f"LLM response: {response}")
+
+            final_answer, actions = await asyncio.to_thread(self._handle_response, response)
+            if final_answer is not None:
+                break
+
+            prepared = await asyncio.to_thread(self._prepare_actions, query, actions)
+            outputs = [output async for _, _, output, _ in self._arun_prepared(prepared)]
+
+            self.state.update_observation(self._merge_observations(prepared, outputs))
+
+        return self.state.get_final_result()
+
     def stream_call(self, query: str) -> Any:
         """
         Stream-based call to process query with streaming responses.
@@ -147,13 +110,7 @@ class Agent():
         
         while True:
             # 1. Build Prompt (View)
-            messages = self.prompt_builder.build(
-                query=query,
-                history=self.state.get_history(),
-                context=self.state.get_context()
-            )
-            
-            logger.debug(f"Prompt Messages: {messages}")
+            messages = self._build_messages(query)
             
             # 2. LLM Call with streaming (IO)
             response = ""
@@ -172,87 +129,256 @@ class Agent():
             logger.debug(f"LLM response: {response}")
 
             # 3. Logic & Control Flow
-            
-            # Check for Final Answer first
-            if LLMOutputParser.is_final_answer(response):
-                try:
-                    final_res = LLMOutputParser.parse_final_answer(response)
-                    self.state.set_final_answer(final_res)
-                    self.state.save_to_db()
-                    yield {"type": "final_answer", "content": final_res}
-                    break 
-                except ValueError as e:
-                     logger.error(f"Error parsing Final Answer: {e}")
-                     pass 
-
-            # Parse Thought/Action
-            parsed_ta = LLMOutputParser.parse_thought_action(response)
-            self.state.set_thought_action(parsed_ta)
-            
-            action_name = parsed_ta.get("action")
-            action_input = parsed_ta.get("action_input")
-
-            # Check loop limit
-            if self.state.looper.is_maxed_out():
-                logger.warning("Maximum loop count reached; generating final answer.")
-                fallback_dict = {
-                    "thought": "Max steps reached",
-                    "answer": "I'm sorry, I couldn't arrive at a final answer within the allowed number of steps.",
-                    "picture": []
-                }
-                self.state.set_final_answer(fallback_dict)
-                self.state.save_to_db()
-                yield {"type": "final_answer", "content": fallback_dict}
+            final_answer, actions = self._handle_response(response)
+            if final_answer is not None:
+                yield {"type": "final_answer", "content": final_answer}
                 break
-            
-            self.state.looper.increment()
 
-            # Execute Tool
-            tools_output = ""
-            if action_name == "ERROR":
-                 tools_output = f"Format Error: Could not parse Thought and Action from your response. Please follow the format strictly.\nExpected format:\nThought: ...\nAction: ...\nAction Input: ..."
-            elif not action_name:
-                 logger.warning("LLM did not provide an action name; skipping tool call. action_input=%s", action_input)
-                 tools_output = f"No action produced by LLM. action_input={action_input}"
-            else:
-                 try:
-                     service: Tool = self.tools.get_service(action_name)
-                     copy_input = copy.deepcopy(action_input)
-                     
-                     # Build history for tool (without system prompt)
-                     tool_history = self.prompt_builder.build(
-                        query=query,
-                        history=self.state.get_history(),
-                        context=self.state.get_context(),
-                        include_system_prompt=False
-                     )
-                     
-                     # Yield tool execution info
-                     yield {"type": "tool_start", "tool": action_name, "input": copy_input}
-                     
-                     tools_output = service(
-                        copy_input, 
-                        self.user_info,
-                        tool_history
-                     )
-                     
-                     # Serialize tool output to JSON
-                     try:
-                        tools_output = json.dumps(tools_output, ensure_ascii=False, default=str)
-                     except Exception:
-                        tools_output = str(tools_output)
-                     
-                     # Yield tool result
-                     yield {"type": "tool_result", "tool": action_name, "result": tools_output}
-                        
-                 except KeyError:
-                    logger.error(f"Service '{action_name}' not found in tools registry.")
-                    tools_output = f"Service '{action_name}' not found. Please check the service name and try again."
-                    yield {"type": "tool_error", "tool": action_name, "error": tools_output}
-                 except Exception as e:
-                    logger.error(f"Error executing tool '{action_name}': {e}")
-                    tools_output = f"Error executing tool '{action_name}': {str(e)}"
-                    yield {"type": "tool_error", "tool": action_name, "error": tools_output}
+            # Execute Tools：先产生全部 tool_start，再按顺序产生各调用的结果
+            prepared = self._prepare_actions(query, actions)
+            yield from self._tool_start_events(prepared)
+            outputs = []
+            for action_name, copy_input, output, event_type in self._run_prepared(prepared):
+                if event_type:
+                    yield self._tool_event(event_type, action_name, output)
+                outputs.append(output)
 
             # Update Observation (Data)
-            self.state.update_observation(tools_output)
\ No newline at end of file
+            self.state.update_observation(self._merge_observations(prepared, outputs))
+
+    async def astream_call(self, query: str) -> AsyncGenerator[dict, None]:
+        """
+        stream_call 的异步版本，产生相同的事件（token / tool_start / tool_result / tool_error / final_answer / error）。
+        LLM 输出通过共享的 AsyncOpenAI 客户端流式读取，数据库读写与工具执行放到线程池，
+        因此一个 worker 可以同时维持大量流式会话，而不是每个会话占用一个线程。
+        :param query: 用户输入
+        :return: 异步生成器，逐步产生事件字典
+        """
+        self.state.init_query(query)
+
+        while True:
+            messages = await asyncio.to_thread(self._build_messages, query)
+
+            response = ""
+            try:
+                async for chunk in await afeed_LLM_full(messages):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        delta = chunk.choices[0].delta.content
+                        response += delta
+                        yield {"type": "token", "content": delta}
+            except Exception as e:
+                logger.error(f"Error during LLM streaming: {e}")
+                yield {"type": "error", "content": str(e)}
+                break
+
+            logger.debug(f"LLM response: {response}")
+
+            final_answer, actions = await asyncio.to_thread(self._handle_response, response)
+            if final_answer is not None:
+                yield {"type": "final_answer", "content": final_answer}
+                break
+
+            prepared = await asyncio.to_thread(self._prepare_actions, query, actions)
+            for event in self._tool_start_events(prepared):
+                yield event
+            outputs = []
+            async for action_name, copy_input, output, event_type in self._arun_prepared(prepared):
+                if event_type:
+                    yield self._tool_event(event_type, action_name, output)
+                outputs.append(output)
+
+            self.state.update_observation(self._merge_observations(prepared, outputs))
+
+    def _build_messages(self, query: str) -> list:
+        messages = self.prompt_builder.build(
+            query=query,
+            history=self.state.get_history(),
+            context=self.state.get_context()
+        )
+        logger.debug(f"Prompt Messages: {messages}")
+        return messages
+
+    def _handle_response(self, response: str) -> tuple:
+        """
+        处理一次 LLM 输出：识别最终答案、解析 Thought/Action、检查循环上限
+        :param response: LLM 的完整输出
+        :return: (final_answer, actions)；final_answer 不为 None 表示本轮结束，
+                 此时最终答案已写入 state 并保存；actions 为 [(action_name, action_input)]
+        """
+        # Check for Final Answer first
+        if LLMOutputParser.is_final_answer(response):
+            try:
+                final_res = LLMOutputParser.parse_final_answer(response)
+                self.state.set_final_answer(final_res)
+                self.state.save_to_db()
+                return final_res, None
+            except ValueError as e:
+                 logger.error(f"Error parsing Final Answer: {e}")
+                 # Continue to treat as thought/action or retry?
+                 # If parsing failed but "Final Answer" is present, it's risky to continue.
+                 # But for now, let's treat it as a normal response that might be malformed.
+                 pass 
+
+        # Parse Thought/Action
+        parsed_ta = LLMOutputParser.parse_thought_action(response)
+        self.state.set_thought_action(parsed_ta)
+
+        # Check loop limit
+        if self.state.looper.is_maxed_out():
+            logger.warning("Maximum loop count reached; generating final answer.")
+            fallback_dict = {
+                "thought": "Max steps reached",
+                "answer": "I'm sorry, I couldn't arrive at a final answer within the allowed number of steps.",
+                "picture": []
+            }
+            self.state.set_final_answer(fallback_dict)
+            self.state.save_to_db()
+            return fallback_dict, None
+        
+        self.state.looper.increment()
+        return None, self.state.get_current_actions()
+
+    def _execute_actions(self, query: str, actions: list) -> str:
+        """
+        执行 LLM 选择的工具（可能多个），返回写入 observation 的字符串（出错时为错误说明）
+        """
+        prepared = self._prepare_actions(query, actions)
+        outputs = [output for _, _, output, _ in self._run_prepared(prepared)]
+        return self._merge_observations(prepared, outputs)
+
+    def _prepare_actions(self, query: str, actions: list) -> list[tuple]:
+        """
+        查找工具并准备调用参数，同一步的调用共用一份 tool_history
+        :param actions: [(action_name, action_input)]
+        :return: [(action_name, call, copy_input, error)]；call 为 None 时无需调用工具，error 直接作为 observation
+        """
+        prepared = []
+        tool_history = None
+        for action_name, action_input in actions:
+            if action_name == "ERROR":
+                prepared.append((action_name, None, action_input, f"Format Error: Could not parse Thought and Action from your response. Please follow the format strictly.\nExpected format:\nThought: ...\nAction: ...\nAction Input: ..."))
+                continue
+            if not action_name:
+                logger.warning("LLM did not provide an action name; skipping tool call. action_input=%s", action_input)
+                prepared.append((action_name, None, action_input, f"No action produced by LLM. action_input={action_input}"))
+                continue
+            try:
+                service, copy_input, tool_history = self._prepare_tool(query, action_name, action_input, tool_history)
+            except Exception as e:
+                prepared.append((action_name, None, action_input, e))
+                continue
+            call = functools.partial(self._invoke_tool, service, copy_input, tool_history)
+            prepared.append((action_name, call, copy_input, None))
+        return prepared
+
+    def _prepare_tool(self, query: str, action_name: str, action_input, tool_history: list | None = None) -> tuple:
+        """
+        查找工具并准备调用参数
+        :param tool_history: 已构建的 tool_history（同一步的多个调用可复用），为 None 时重新构建
+        :return: (service, copy_input, tool_history)
+        :raises KeyError: 如果工具未注册
+        """
+        service: Tool = self.tools.get_service(action_name)
+        copy_input = copy.deepcopy(action_input)
+        
+        # Build history for tool (without system prompt)
+        if tool_history is None:
+            tool_history = self.prompt_builder.build(
+                query=query,
+                history=self.state.get_history(),
+                context=self.state.get_context(),
+                include_system_prompt=False
+            )
+        return service, copy_input, tool_history
+
+    def _run_prepared(self, prepared: list[tuple]):
+        """
+        执行已准备好的调用，按顺序产生 (action_name, copy_input, output, event_type)，
+        event_type 为 "tool_result" / "tool_error"，未调用工具（如格式错误）时为 None。
+        只有一个调用时直接在当前线程执行；多个时交给 tool_executor 并发执行（带超时）
+        """
+        calls = [(action_name, call) for action_name, call, _, _ in prepared if call is not None]
+        if len(calls) > 1:
+            results = self.tool_executor.imap(calls)
+        else:
+            results = (self._call_safely(call) for _, call in calls)
+        for action_name, call, copy_input, error in prepared:
+            yield self._prepared_output(action_name, copy_input, next(results) if call is not None else error,
+                                        call is not None)
+
+    async def _arun_prepared(self, prepared: list[tuple]):
+        """
+        _run_prepared 的异步版本
+        """
+        calls = [(action_name, call) for action_name, call, _, _ in prepared if call is not None]
+        if len(calls) > 1:
+            results = self.tool_executor.aimap(calls)
+        else:
+            async def run_inline():
+                for _, call in calls:
+                    try:
+                        yield await asyncio.to_thread(call)
+                    except Exception as e:
+                        yield e
+            results = run_inline()
+        for action_name, call, copy_input, error in prepared:
+            result = await results.__anext__() if call is not None else error
+            yield self._prepared_output(action_name, copy_input, result, call is not None)
+
+    @staticmethod
+    def _call_safely(call):
+        try:
+            return call()
+        except Exception as e:
+            return e
+
+    def _prepared_output(self, action_name: str, copy_input, result, called: bool) -> tuple:
+        if isinstance(result, Exception):
+            return action_name, copy_input, self._tool_error_message(action_name, result), "tool_error"
+        return action_name, copy_input, result, "tool_result" if called else None
+
+    @staticmethod
+    def _tool_start_events(prepared: list[tuple]) -> list[dict]:
+        return [
+            {"type": "tool_start", "tool": action_name, "input": copy_input}
+            for action_name, call, copy_input, _ in prepared if call is not None
+        ]
+
+    @staticmethod
+    def _tool_event(event_type: str, action_name: str, output: str) -> dict:
+        if event_type == "tool_result":
+            return {"type": "tool_result", "tool": action_name, "result": output}
+        return {"type": "tool_error", "tool": action_name, "error": output}
+
+    @staticmethod
+    def _merge_observations(prepared: list[tuple], outputs: list[str]) -> str:
+        """
+        合并同一步中各调用的 observation；只有一个调用时保持原样
+        """
+        if len(outputs) == 1:
+            return outputs[0]
+        return "\n".join(
+            f"[{i}] {action_name}: {output}"
+            for i, ((action_name, _, _, _), output) in enumerate(zip(prepared, outputs), start=1)
+        )
+
+    def _invoke_tool(self, service: Tool, copy_input, tool_history) -> str:
+        tools_output = service(
+            copy_input, 
+            self.user_info,
+            tool_history
+        )
+        
+        # Serialize tool output to JSON
+        try:
+            return json.dumps(tools_output, ensure_ascii=False, default=str)
+        except Exception:
+            return str(tools_output)
+
+    @staticmethod
+    def _tool_error_message(action_name: str, e: Exception) -> str:
+        if isinstance(e, KeyError):
+            logger.error(f"Service '{action_name}' not found in tools registry.")
+            return f"Service '{action_name}' not found. Please check the service name and try again."
+        logger.error(f"Error executing tool '{action_name}': {e}")
+        return f"Error executing tool '{action_name}': {str(e)}"
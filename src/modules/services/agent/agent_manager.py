@@ -2,17 +2,34 @@
 # 修改说明：移除内存缓存 (_agents)，改为每次请求创建新的 Agent 实例，以实现无状态化。
 # 这解决了在多 worker 部署下的状态不一致问题，并避免了内存泄漏风险。
 
-from typing import Dict, Generator
+from typing import Dict, Generator, AsyncGenerator
 from datetime import datetime
 from src.modules.services.agent.agent import Agent
+from src.modules.services.agent.history_cache import HistoryCache
+from src.modules.services.agent.tool_executor import ToolExecutor
 from src.modules.services.service_basis.ToolRegistry import Registry
 from src.modules.services.business.record_bussiness import DialogueRecordBusiness
 
 class AgentManager:
-    def __init__(self, tools: Registry, record_business: DialogueRecordBusiness, prompt_template: str):
+    def __init__(self, tools: Registry, record_business: DialogueRecordBusiness, prompt_template: str,
+                 history_cache: HistoryCache | None = None, prompt_options: dict | None = None,
+                 tool_executor: ToolExecutor | None = None):
+        """
+        :param history_cache: 可选的跨请求历史缓存；为 None 时每轮对话从数据库加载一次历史
+        :param prompt_options: 传给 PromptBuilder 的可选参数，如 {"duplicate_system_prompt": False}
+        :param tool_executor: 并发执行同一步多个工具调用的执行器，为 None 时使用默认实例
+        """
         self._tools = tools
         self._record_business = record_business
         self._prompt_template = prompt_template
+        self._history_cache = history_cache
+        self._prompt_options = prompt_options
+        self._tool_executor = tool_executor
+
+    def _new_agent(self, user_id: str, sessionid: str) -> Agent:
+        return Agent(user_id, sessionid, self._record_business, self._tools, self._prompt_template,
+                     history_cache=self._history_cache, prompt_options=self._prompt_options,
+                     tool_executor=self._tool_executor)
 
     def call_agent(self, user_id: str, sessionid: str, query: str) -> dict:
         """
@@ -26,13 +43,25 @@ class AgentManager:
         :return: Agent 处理结果字典
         """
         # 创建新的 Agent 实例
-        agent = Agent(user_id, sessionid, self._record_business, self._tools, self._prompt_template)
+        agent = self._new_agent(user_id, sessionid)
         
         # 直接调用 agent 处理逻辑
         # 由于每次都是新实例，不需要额外的锁机制（除非 Agent 内部有共享资源的并发写操作，
         # 但通常每个请求都在独立的线程/协程中处理，且 Agent 实例是局部的）
         return agent(query)
 
+    async def acall_agent(self, user_id: str, sessionid: str, query: str) -> dict:
+        """
+        call_agent 的异步版本：等待 LLM 输出期间不占用 worker 线程。
+        
+        :param user_id: 用户ID
+        :param sessionid: 会话ID
+        :param query: 用户输入
+        :return: Agent 处理结果字典
+        """
+        agent = self._new_agent(user_id, sessionid)
+        return await agent.acall(query)
+
     def stream_agent(self, user_id: str, sessionid: str, query: str) -> Generator:
         """
         创建并使用一个新的 agent 实例来处理请求（流式）。
@@ -44,8 +73,19 @@ class AgentManager:
         :return: 生成器，逐步产生事件字典 (type, content)
         """
         # 创建新的 Agent 实例
-        agent = Agent(user_id, sessionid, self._record_business, self._tools, self._prompt_template)
+        agent = self._new_agent(user_id, sessionid)
         
         # 返回流式生成器
         return agent.stream_call(query)
 
+    def astream_agent(self, user_id: str, sessionid: str, query: str) -> AsyncGenerator:
+        """
+        stream_agent 的异步版本，供 SSE 接口使用。
+        
+        :param user_id: 用户ID
+        :param sessionid: 会话ID
+        :param query: 用户输入
+        :return: 异步生成器，逐步产生事件字典 (type, content)
+        """
+        agent = self._new_agent(user_id, sessionid)
+        return agent.astream_call(query)
@@ -0,0 +1,61 @@
+from src.utils.ttl_cache import TTLLRUCache
+
+
+class HistoryCache:
+    """
+    跨请求共享的对话历史缓存（LRU + TTL），以 conversation_id 为键。
+
+    State 在写入新记录后会调用 invalidate，因此同一进程内读到的历史总是最新的；
+    其它 worker / 进程写入的记录最多在 ttl 秒后可见。默认不启用，
+    由 AgentManager 按配置创建后传入。
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        """
+        :param max_size: 最多缓存的会话数，超出时淘汰最久未使用的会话
+        :param ttl: 缓存有效期（秒）
+        :raises ValueError: 参数非法
+        """
+        if ttl is None:
+            raise ValueError("ttl must be positive")
+        self._cache = TTLLRUCache(max_size, ttl)
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def get(self, conversation_id: str) -> list[dict] | None:
+        """
+        读取会话历史
+        :param conversation_id: 会话ID
+        :return: OpenAI 格式的消息列表；未命中或已过期时返回 None
+        """
+        messages = self._cache.get(conversation_id)
+        if messages is None:
+            return None
+        return [dict(msg) for msg in messages]
+
+    def put(self, conversation_id: str, history: list[dict]) -> None:
+        """
+        写入会话历史
+        :param conversation_id: 会话ID
+        :param history: OpenAI 格式的消息列表
+        """
+        self._cache.put(conversation_id, tuple(dict(msg) for msg in history))
+
+    def invalidate(self, conversation_id: str) -> None:
+        """
+        使某个会话的缓存失效（写入新记录或删除记录后调用）
+        :param conversation_id: 会话ID
+        """
+        self._cache.pop(conversation_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: {"hits", "misses", "size", "hit_rate"}
+        """
+        return self._cache.stats()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -11,7 +11,9 @@ class LLMOutputParser:
     def parse_thought_action(text: str) -> Dict[str, Any]:
         """
         解析 Thought, Action, Action Input
-        返回字典: {"thought": ..., "action": ..., "action_input": ..., "raw": ...}
+        返回字典: {"thought": ..., "action": ..., "action_input": ..., "actions": [...], "raw": ...}
+        一步中可以连续给出多组 Action / Action Input（中间没有 Observation），表示相互独立、可并行执行的调用，
+        全部放在 "actions" 中（每个元素为 {"action": ..., "action_input": ...}）；"action" / "action_input" 为第一组
         如果解析失败，返回带有 action="ERROR" 的字典
         """
         # 提取 Thought
@@ -23,39 +25,57 @@ class LLMOutputParser:
         action = action_match.group(1).strip() if action_match else ""
 
         if thought == "" or action == "":
-            return {
-                "thought": text,
-                "action": "ERROR",
-                "action_input": {},
-                "raw": text
-            }
+            return LLMOutputParser._error(text)
 
-        # 提取 Action Input
-        input_match = re.search(r"Action Input:\s*(.*)", text, re.DOTALL)
-        action_input_str = input_match.group(1).strip() if input_match else ""
-        
-        parsed_input = {}
-        if not action_input_str or action_input_str == "{}":
-             parsed_input = {}
+        action_starts = [m.start() for m in re.finditer(r"Action:", text)]
+        if len(action_starts) > 1 and "Observation:" not in text[action_starts[0]:]:
+            actions = []
+            for start, end in zip(action_starts, action_starts[1:] + [len(text)]):
+                match = re.match(r"Action:\s*(.*?)\s*Action Input:\s*(.*)", text[start:end], re.DOTALL)
+                if not match or not match.group(1).strip():
+                    return LLMOutputParser._error(text)
+                actions.append({
+                    "action": match.group(1).strip(),
+                    "action_input": LLMOutputParser._parse_action_input(match.group(2).strip())
+                })
         else:
-            try:
-                # 尝试直接解析
-                parsed_input = json.loads(action_input_str)
-            except json.JSONDecodeError:
-                # 尝试提取 JSON 片段解析
-                match = re.search(r"\{.*\}", action_input_str, re.DOTALL)
-                if match:
-                    try:
-                        parsed_input = json.loads(match.group(0))
-                    except json.JSONDecodeError:
-                        parsed_input = action_input_str
-                else:
-                    parsed_input = action_input_str
+            # 提取 Action Input
+            input_match = re.search(r"Action Input:\s*(.*)", text, re.DOTALL)
+            action_input_str = input_match.group(1).strip() if input_match else ""
+            actions = [{"action": action, "action_input": LLMOutputParser._parse_action_input(action_input_str)}]
 
         return {
             "thought": thought,
-            "action": action,
-            "action_input": parsed_input,
+            "action": actions[0]["action"],
+            "action_input": actions[0]["action_input"],
+            "actions": actions,
+            "raw": text
+        }
+
+    @staticmethod
+    def _parse_action_input(action_input_str: str) -> Any:
+        if not action_input_str or action_input_str == "{}":
+            return {}
+        try:
+            # 尝试直接解析
+            return json.loads(action_input_str)
+        except json.JSONDecodeError:
+            # 尝试提取 JSON 片段解析
+            match = re.search(r"\{.*\}", action_input_str, re.DOTALL)
+            if match:
+                try:
+                    return json.loads(match.group(0))
+                except json.JSONDecodeError:
+                    return action_input_str
+            return action_input_str
+
+    @staticmethod
+    def _error(text: str) -> Dict[str, Any]:
+        return {
+            "thought": text,
+            "action": "ERROR",
+            "action_input": {},
+            "actions": [{"action": "ERROR", "action_input": {}}],
             "raw": text
         }
 
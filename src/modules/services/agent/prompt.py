@@ -26,6 +26,7 @@ Final Answer: {{
 1.  **Interaction Flow**:
     - Your response must follow the `Thought/Action/Action Input/Observation` cycle to process information and use tools.
     - When you have a definitive answer, conclude with the `Thought/Final Answer` format.
+    - If you need several pieces of information that do not depend on each other (e.g. the weather of two cities and a train ticket query), you may write several `Action`/`Action Input` pairs one after another in the same step, with no `Observation` in between. They are executed in parallel and their observations are returned numbered in the same order.
     - Use the provided tools to gather information if you are uncertain about an answer.
 
 2.  **Final Answer Format**:
@@ -1,12 +1,49 @@
 import json
 import datetime
-from typing import List, Dict, Any
+import functools
+from typing import List, Dict, Any, Tuple
+
+# 拼接在 user 消息中 context 之前的提示语
+_QUESTION_PREFIX = """
+            Begin!
+
+            Question: 
+            """
+
+
+@functools.lru_cache(maxsize=64)
+def _format_prefix(prompt_template: str, tools_description: str, tools_names: Tuple[str, ...], date: str) -> str:
+    """
+    格式化 system prompt。同一模板 / 工具集 / 时间段内的结果相同，
+    缓存在进程内，所有请求共用（各请求的 Agent 会各自创建 PromptBuilder）
+    """
+    return prompt_template.format(
+        str_tool_description=tools_description,
+        date=date,
+        tool_names=", ".join(tools_names)
+    )
+
 
 class PromptBuilder:
-    def __init__(self, prompt_template: str, tools_description: str, tools_names: List[str]):
+    def __init__(self, prompt_template: str, tools_description: str, tools_names: List[str],
+                 date_bucket_seconds: int = 60, duplicate_system_prompt: bool = True):
+        """
+        :param prompt_template: system prompt 模板
+        :param tools_description: 工具描述
+        :param tools_names: 工具名列表
+        :param date_bucket_seconds: 模板中 {date} 的时间粒度（秒）。同一时间段内 system prompt 完全相同，
+                                    只格式化一次，也便于模型服务端的前缀缓存命中
+        :param duplicate_system_prompt: 是否在 user 消息开头再拼接一遍 system prompt（原有行为）。
+                                        关闭后每步少发送一份 system prompt 的 token
+        """
         self.prompt_template = prompt_template
         self.tools_description = tools_description
         self.tools_names = tools_names
+        self.date_bucket_seconds = date_bucket_seconds
+        self.duplicate_system_prompt = duplicate_system_prompt
+        # context 增量序列化：已序列化的 raw 字符串及拼接结果
+        self._context_raws: List[str] = []
+        self._context_str = ""
 
     def build(self, query: str, history: List[Dict[str, Any]], context: List[Dict[str, Any]], include_system_prompt: bool = True) -> List[Dict[str, str]]:
         """
@@ -18,52 +55,55 @@ class PromptBuilder:
         """
         messages = []
         
-        # 1. System Prompt
+        # 1. System Prompt（稳定前缀）
         system_content = self._format_template()
         if include_system_prompt:
             messages.append({"role": "system", "content": system_content})
         
         # 2. History
-        # 原逻辑: history += self.__load_history()
         messages.extend(history)
         
         # 3. Current Context
-        # 原逻辑: contexts = [idx.get("raw") for idx in self.__context]
+        # context 中 raw 为字符串（thought + action + observation），每个元素 json.dumps 后按行拼接
         context_raw_strs = [item.get("raw") for item in context if item and item.get("raw")]
+        context_str = query + "\n" + self._serialize_context(context_raw_strs)
         
-        # 拼接 context
-        # 原逻辑: contexts_str = self.__query + "\n" + "\n".join(json.dumps(c, ensure_ascii=False) for c in contexts if c is not None)
-        # 注意: 原逻辑中 context保存的是raw string吗？
-        # Check parser: raw = text (thought + action).
-        # Check __close_thought_action: raw = old_raw + "\nObservation: " + observation
-        # So raw is a string.
-        # But wait, original code did: json.dumps(c, ensure_ascii=False) where c is from contexts list of raw strings?
-        # If c is a string, json.dumps(c) will quote it. "Thought: ...".
-        # Let's double check state.py logic.
-        
-        context_str = query + "\n" + "\n".join(json.dumps(c, ensure_ascii=False) for c in context_raw_strs)
-        
-        # Append Reminder
-        final_user_content = (
-            system_content
-            + """
-            Begin!
-
-            Question: 
-            """ 
-            + context_str
-        )
-        
+        prefix = system_content + _QUESTION_PREFIX if self.duplicate_system_prompt else _QUESTION_PREFIX
         messages.append({
             "role": "user",
-            "content": final_user_content
+            "content": prefix + context_str
         })
         
         return messages
 
+    def _serialize_context(self, raws: List[str]) -> str:
+        """
+        增量序列化 context：一轮对话中 context 只会追加，
+        已序列化过的前缀（按对象身份比较）直接复用，只对新增元素调用 json.dumps
+        """
+        cached = self._context_raws
+        n = len(cached)
+        if len(raws) < n or any(raws[i] is not cached[i] for i in range(n)):
+            cached, n = [], 0
+            self._context_str = ""
+        new_parts = [json.dumps(c, ensure_ascii=False) for c in raws[n:]]
+        if new_parts:
+            joined = "\n".join(new_parts)
+            self._context_str = self._context_str + "\n" + joined if n else joined
+        self._context_raws = cached + raws[n:]
+        return self._context_str
+
     def _format_template(self) -> str:
-        return self.prompt_template.format(
-            str_tool_description=self.tools_description,
-            date=str(datetime.datetime.now()),
-            tool_names=", ".join(self.tools_names)
+        return _format_prefix(
+            self.prompt_template,
+            self.tools_description,
+            tuple(self.tools_names),
+            self._current_date()
         )
+
+    def _current_date(self) -> str:
+        now = datetime.datetime.now()
+        if self.date_bucket_seconds and self.date_bucket_seconds > 1:
+            timestamp = now.timestamp()
+            now = datetime.datetime.fromtimestamp(timestamp - timestamp % self.date_bucket_seconds)
+        return str(now)
@@ -1,5 +1,6 @@
 import sys
 import json
+from typing import Any
 from datetime import datetime
 from src.utils.root_path import get_root_path
 if str(get_root_path()) not in sys.path:
@@ -8,6 +9,7 @@ if str(get_root_path()) not in sys.path:
 from .utils import Looper
 from src.modules.services.service_basis.user_info import UserInfo
 from ..business.record_bussiness import DialogueRecordBusiness
+from .history_cache import HistoryCache
 
 class State:
     """
@@ -17,7 +19,8 @@ class State:
     """
     def __init__(self, user_id: str, conversation_id:str,
                  record_business: DialogueRecordBusiness,
-                 patient: int = 3):
+                 patient: int = 3,
+                 history_cache: HistoryCache | None = None):
         if not user_id: raise ValueError("user_id cannot be None or empty")
         if not conversation_id: raise ValueError("conversation_id cannot be None or empty")
         
@@ -25,6 +28,11 @@ class State:
         self.__conversation_id = conversation_id
         self.__record_business = record_business
         self.looper = Looper(patient)
+        # history_cache: 跨请求共享（可选）；__history: 本轮内只从数据库加载一次
+        self.__history_cache = history_cache
+        self.__history: list | None = None
+        self.history_hits = 0
+        self.history_misses = 0
         
         self.__query = ""
         self.__query_sent_at = None
@@ -41,12 +49,34 @@ class State:
         self.__context = []
         self.__thought_action = {}
         self.__final_answer = {}
+        self.__history = None
         self.looper.reset()
 
     def get_query(self) -> str:
         return self.__query
 
     def get_history(self) -> list:
+        """
+        获取历史记录：每轮对话只加载一次，后续步骤复用；
+        配置了 history_cache 时先查跨请求缓存，未命中再访问数据库
+        """
+        if self.__history is not None:
+            self.history_hits += 1
+            return list(self.__history)
+        history = None
+        if self.__history_cache is not None:
+            history = self.__history_cache.get(self.__conversation_id)
+        if history is None:
+            self.history_misses += 1
+            history = self.__load_history()
+            if self.__history_cache is not None:
+                self.__history_cache.put(self.__conversation_id, history)
+        else:
+            self.history_hits += 1
+        self.__history = history
+        return list(history)
+
+    def __load_history(self) -> list:
         """从数据库加载历史记录"""
         try:
             history_dtos = self.__record_business.list_records_by_conversation(self.__conversation_id, last_n=10)
@@ -54,6 +84,12 @@ class State:
         except LookupError:
             return []
 
+    def invalidate_history(self):
+        """历史记录已变化（写入新记录），丢弃本轮及跨请求缓存"""
+        self.__history = None
+        if self.__history_cache is not None:
+            self.__history_cache.invalidate(self.__conversation_id)
+
     def get_context(self) -> list:
         """获取当前执行上下文"""
         return self.__context
@@ -69,6 +105,13 @@ class State:
             self.__thought_action.get("action_input", {})
         )
 
+    def get_current_actions(self) -> list[tuple[str, Any]]:
+        """获取当前步骤的全部 (Action, Input)，一步中可能有多个相互独立的调用"""
+        actions = self.__thought_action.get("actions")
+        if not actions:
+            return [self.get_current_action()]
+        return [(item.get("action", ""), item.get("action_input", {})) for item in actions]
+
     def update_observation(self, observation: str):
         """更新 Observation 并推送到上下文"""
         self.__thought_action["observation"] = observation
@@ -93,16 +136,19 @@ class State:
         
         system_thoughts = json.dumps(self.__context, ensure_ascii=False, indent=4) if self.__context else ""
 
-        self.__record_business.create_record(
-            conversation_id=self.__conversation_id,
-            user_id=self.__user_id,
-            user_query=self.__query,
-            query_sent_at=self.__query_sent_at,
-            system_response=system_response,
-            system_thoughts=system_thoughts,
-            image_list=self.__final_answer.get("picture", []),
-            response_received_at=datetime.now().isoformat()
-        )
+        try:
+            self.__record_business.create_record(
+                conversation_id=self.__conversation_id,
+                user_id=self.__user_id,
+                user_query=self.__query,
+                query_sent_at=self.__query_sent_at,
+                system_response=system_response,
+                system_thoughts=system_thoughts,
+                image_list=self.__final_answer.get("picture", []),
+                response_received_at=datetime.now().isoformat()
+            )
+        finally:
+            self.invalidate_history()
 
     def get_final_result(self) -> dict:
         """获取最终返回给用户的格式化结果"""
@@ -0,0 +1,113 @@
+import time
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, AsyncGenerator, Callable, Generator
+
+# 工具调用默认超时（秒），None 表示不限，与单个工具调用时的行为一致；
+# 耗时较长的工具（如 旅行规划 自带 5 分钟的搜索上限）如需限制，应通过 timeouts 单独设置
+DEFAULT_TOOL_TIMEOUT = None
+
+
+class ToolTimeoutError(TimeoutError):
+    pass
+
+
+class ToolExecutor:
+    """
+    在有界线程池中并发执行同一步中的多个工具调用，结果按提交顺序返回。
+
+    每个工具的超时从提交时开始计算（包含排队时间）。线程无法被强制终止，
+    超时的调用会在后台继续执行完毕，但其结果被丢弃，Agent 不再等待。
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float | None = DEFAULT_TOOL_TIMEOUT,
+                 timeouts: dict[str, float] | None = None):
+        """
+        :param max_workers: 线程池大小（所有请求共享）
+        :param timeout: 默认超时（秒），None 表示不限
+        :param timeouts: 按工具名单独设置的超时，如 {"旅行规划": 310}
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+        self._pool: concurrent.futures.ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="agent-tool"
+                    )
+        return self._pool
+
+    def timeout_for(self, name: str) -> float | None:
+        return self.timeouts.get(name, self.timeout)
+
+    def imap(self, calls: list[tuple[str, Callable[[], Any]]]) -> Generator[Any, None, None]:
+        """
+        提交全部调用，按顺序产生结果；调用抛出的异常（包括超时的 ToolTimeoutError）作为结果产生而不是抛出
+        :param calls: [(工具名, 无参可调用对象)]
+        :return: 生成器
+        """
+        started = time.monotonic()
+        futures = [(name, self.pool.submit(fn)) for name, fn in calls]
+
+        def results():
+            for name, future in futures:
+                timeout = self.timeout_for(name)
+                remaining = None if timeout is None else max(0.0, started + timeout - time.monotonic())
+                try:
+                    yield future.result(timeout=remaining)
+                except concurrent.futures.TimeoutError:
+                    future.cancel()
+                    yield ToolTimeoutError(f"timed out after {timeout}s")
+                except Exception as e:
+                    yield e
+
+        return results()
+
+    def map(self, calls: list[tuple[str, Callable[[], Any]]]) -> list:
+        return list(self.imap(calls))
+
+    async def aimap(self, calls: list[tuple[str, Callable[[], Any]]]) -> AsyncGenerator[Any, None]:
+        """
+        imap 的异步版本：在同一线程池中执行，等待时不阻塞事件循环
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        futures = [(name, loop.run_in_executor(self.pool, fn)) for name, fn in calls]
+        for name, future in futures:
+            timeout = self.timeout_for(name)
+            remaining = None if timeout is None else max(0.0, started + timeout - loop.time())
+            try:
+                yield await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                yield ToolTimeoutError(f"timed out after {timeout}s")
+            except Exception as e:
+                yield e
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
+
+
+_default_executor: ToolExecutor | None = None
+_default_lock = threading.Lock()
+
+
+def get_default_tool_executor() -> ToolExecutor:
+    """
+    未显式传入 ToolExecutor 时各 Agent 共用的默认实例
+    """
+    global _default_executor
+    if _default_executor is None:
+        with _default_lock:
+            if _default_executor is None:
+                _default_executor = ToolExecutor()
+    return _default_executor
@@ -1,5 +1,6 @@
 from .user_bussiness import UserBusiness
 from .record_bussiness import DialogueRecordBusiness
 from .conversation_bussiness import ConversationBusiness
+from .ownership_cache import OwnershipCacheBackend, LocalOwnershipCache
 
-__all__ = [UserBusiness, DialogueRecordBusiness, ConversationBusiness]
\ No newline at end of file
+__all__ = [UserBusiness, DialogueRecordBusiness, ConversationBusiness, OwnershipCacheBackend, LocalOwnershipCache]
\ No newline at end of file
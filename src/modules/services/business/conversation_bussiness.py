@@ -1,11 +1,17 @@
 from src.modules.dbController.dao.conversation_dao import ConversationDAO
 from src.modules.dbController.models.conversation import Conversation
 from src.modules.services.dto.dto import ConversationDTO
+from src.modules.services.business.ownership_cache import OwnershipCacheBackend
 from typing import List
 
 class ConversationBusiness:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, ownership_cache: OwnershipCacheBackend | None = None):
+        """
+        :param config: 数据库配置
+        :param ownership_cache: 与 UserBusiness 共用的会话归属缓存，删除会话时使其失效
+        """
         self.conversation_dao = ConversationDAO(config)
+        self.ownership_cache = ownership_cache
 
     def create_conversation(self, user_id: str, session_name: str | None = None) -> ConversationDTO:
         """
@@ -63,7 +69,11 @@ class ConversationBusiness:
         :raises LookupError: 会话不存在
         :raises Exception: 其它数据库或系统异常
         """
-        self.conversation_dao.delete_conversation(conversation_id)
+        try:
+            self.conversation_dao.delete_conversation(conversation_id)
+        finally:
+            if self.ownership_cache is not None:
+                self.ownership_cache.invalidate_conversation(conversation_id)
 
     def list_user_conversations(self, user_id: str) -> List[ConversationDTO]:
         """
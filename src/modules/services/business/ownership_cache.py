@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from src.utils.ttl_cache import TTLLRUCache
+
+
+class OwnershipCacheBackend(ABC):
+    """
+    会话归属缓存的存储后端：conversation_id -> 拥有者 user_id。
+
+    会话的拥有者创建后不会改变，因此只缓存“拥有”的结果；会话或用户被删除时必须失效。
+    默认使用进程内的 LocalOwnershipCache，多个 worker 共享时可实现基于外部存储（如 Redis）的后端。
+    """
+
+    @abstractmethod
+    def get(self, conversation_id: str) -> str | None:
+        """
+        :return: 缓存的拥有者 user_id；未命中时返回 None
+        """
+
+    @abstractmethod
+    def set(self, conversation_id: str, user_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_conversation(self, conversation_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        使该用户拥有的全部会话失效（删除用户后调用）
+        """
+
+    def is_owner(self, user_id: str, conversation_id: str) -> bool:
+        return self.get(conversation_id) == user_id
+
+
+class LocalOwnershipCache(OwnershipCacheBackend):
+    """
+    进程内的 LRU 实现。ttl 限制其它 worker 删除会话后本进程最多沿用旧结果的时间
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float | None = 300.0):
+        """
+        :param max_size: 最多缓存的会话数
+        :param ttl: 有效期（秒），None 表示只在失效时删除
+        :raises ValueError: 参数非法
+        """
+        # conversation_id -> user_id；条目被删除时同步维护 _by_user
+        self._cache = TTLLRUCache(max_size, ttl, on_remove=self._unindex)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._by_user: dict[str, set[str]] = {}
+
+    def get(self, conversation_id: str) -> str | None:
+        return self._cache.get(conversation_id)
+
+    def set(self, conversation_id: str, user_id: str) -> None:
+        with self._cache.lock:
+            self._cache.put(conversation_id, user_id)
+            self._by_user.setdefault(user_id, set()).add(conversation_id)
+
+    def invalidate_conversation(self, conversation_id: str) -> None:
+        self._cache.pop(conversation_id)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._cache.lock:
+            for conversation_id in list(self._by_user.get(user_id, ())):
+                self._cache.pop(conversation_id)
+
+    def _unindex(self, conversation_id: str, user_id: str) -> None:
+        conversations = self._by_user.get(user_id)
+        conversations.discard(conversation_id)
+        if not conversations:
+            del self._by_user[user_id]
+
+    def clear(self) -> None:
+        with self._cache.lock:
+            self._cache.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: {"hits", "misses", "size", "hit_rate"}
+        """
+        return self._cache.stats()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -1,13 +1,43 @@
 from src.modules.dbController.dao.dialogue_record_dao import DialogueRecordDAO
 from src.modules.dbController.models.record import DialogueRecord
 from src.modules.services.dto.dto import DialogueRecordDTO
+from src.modules.services.business.record_write_buffer import DialogueRecordWriteBuffer
 import uuid
+import json
+import base64
+import binascii
 from typing import List
 from datetime import datetime
 
+def encode_history_cursor(created_at: datetime, record_id: str) -> str:
+    """
+    将 (created_at, id) 编码为不透明的分页游标
+    """
+    raw = json.dumps([created_at.isoformat(), record_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    :raises ValueError: 游标格式非法
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, record_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(record_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+
 class DialogueRecordBusiness:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, write_buffer: dict | None = None):
+        """
+        :param config: 数据库配置
+        :param write_buffer: 写后缓冲参数 {max_batch, flush_interval}，None 表示每条记录同步写入。
+                             启用后 create_record 不再抛出外键相关的 ValueError，写入失败只记录日志
+        """
         self.dialogue_record_dao = DialogueRecordDAO(config)
+        self.write_buffer = DialogueRecordWriteBuffer(self.dialogue_record_dao, **write_buffer) if write_buffer else None
 
     def create_record(
         self,
@@ -34,17 +64,30 @@ class DialogueRecordBusiness:
             response_received_at=response_received_at or datetime.utcnow(),
             created_at=datetime.utcnow()
         )
+        if self.write_buffer is not None:
+            self.write_buffer.submit(record)
+            return DialogueRecordDTO.from_obj(record)
         try:
             record = self.dialogue_record_dao.create_dialogue_record(record)
         except (LookupError, ValueError, AttributeError) as e:
             raise e
         return DialogueRecordDTO.from_obj(record)
 
+    def flush(self, conversation_id: str | None = None) -> None:
+        """
+        写入写后缓冲中尚未落库的记录（未启用缓冲时什么也不做）
+        :param conversation_id: 只在该会话有未写入记录时才写入；None 表示全部写入
+        """
+        if self.write_buffer is not None:
+            self.write_buffer.flush(conversation_id)
+
     def get_record(self, record_id: str) -> DialogueRecordDTO:
+        self.flush()
         record = self.dialogue_record_dao.get_record_by_record_id(record_id)
         return DialogueRecordDTO.from_obj(record)
 
     def update_record(self, record_id: str, **kwargs) -> DialogueRecordDTO:
+        self.flush()
         record = self.dialogue_record_dao.get_record_by_record_id(record_id)
         for key, value in kwargs.items():
             if hasattr(record, key):
@@ -53,9 +96,33 @@ class DialogueRecordBusiness:
         return DialogueRecordDTO.from_obj(record)
 
     def delete_record(self, record_id: str, is_hard_delete: bool = False) -> None:
+        self.flush()
         self.dialogue_record_dao.delete_dialogue_record(record_id, is_hard_delete)
 
     def list_records_by_conversation(self, conversation_id: str, last_n: int | None = None) -> List[DialogueRecordDTO]:
-
+        self.flush(conversation_id)
         records = self.dialogue_record_dao.get_records_by_conversation_id(conversation_id, last_n=last_n)
         return [DialogueRecordDTO.from_obj(r) for r in records]
+
+    def list_records_page(self, conversation_id: str, limit: int = 50,
+                          cursor: str | None = None) -> tuple[List[DialogueRecordDTO], str | None]:
+        """
+        分页获取会话历史，从最新的记录向前翻页
+        :param conversation_id: 会话ID
+        :param limit: 每页记录数
+        :param cursor: 上一页返回的 next_cursor，None 表示第一页（最新的 limit 条）
+        :return: (本页记录（按时间正序）, 更早一页的游标；没有更早的记录时为 None)
+        :raises ValueError: limit 或游标非法
+        :raises LookupError: 会话没有任何记录
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive.")
+        before = decode_history_cursor(cursor) if cursor else None
+        self.flush(conversation_id)
+        # 多取一条用于判断是否还有更早的记录
+        records = self.dialogue_record_dao.get_records_page(conversation_id, limit + 1, before=before)
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_history_cursor(records[-1].created_at, records[-1].id)
+        return [DialogueRecordDTO.from_obj(r) for r in reversed(records)], next_cursor
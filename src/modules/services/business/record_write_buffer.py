@@ -0,0 +1,120 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+from typing import List
+
+from src.modules.dbController.dao.dialogue_record_dao import DialogueRecordDAO
+from src.modules.dbController.models.record import DialogueRecord
+
+logger = logging.getLogger(__name__)
+
+
+class DialogueRecordWriteBuffer:
+    """
+    对话记录的写后缓冲（write-behind）：create_record 只把记录放入缓冲区，
+    由后台线程每 flush_interval 秒（或攒满 max_batch 条时）用一条多行 INSERT 批量写入，
+    多个会话的记录合并在同一批中。
+
+    - 读取某个会话的记录前调用 flush(conversation_id)，保证读到本进程已提交的写入；
+    - 整批写入失败时逐条重试，仍然失败的记录（如会话已被删除）只记录日志，不会抛给调用方；
+    - 进程退出时写入剩余记录。
+    """
+
+    def __init__(self, dao: DialogueRecordDAO, max_batch: int = 100, flush_interval: float = 0.5):
+        """
+        :param dao: 对话记录 DAO
+        :param max_batch: 单批最多写入的记录数
+        :param flush_interval: 最长写入间隔（秒）
+        :raises ValueError: 参数非法
+        """
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        self.dao = dao
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._pending: List[DialogueRecord] = []
+        # 各会话尚未写入完成（在缓冲区中或正在写入）的记录数
+        self._unwritten: Counter[str] = Counter()
+        self._cond = threading.Condition()
+        # 保证批次按提交顺序写入，且 flush 返回时正在写入的批次已完成
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="dialogue-record-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, record: DialogueRecord) -> None:
+        """
+        放入缓冲区
+        :param record: 已设置 id 的 DialogueRecord
+        :raises RuntimeError: 缓冲区已关闭
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("DialogueRecordWriteBuffer is closed.")
+            self._pending.append(record)
+            self._unwritten[record.conversation_id] += 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def has_unwritten(self, conversation_id: str | None = None) -> bool:
+        with self._cond:
+            if conversation_id is None:
+                return bool(self._unwritten)
+            return self._unwritten[conversation_id] > 0
+
+    def flush(self, conversation_id: str | None = None) -> None:
+        """
+        立即写入缓冲区中的记录
+        :param conversation_id: 只在该会话有未写入的记录时才写入；None 表示无条件写入
+        """
+        if not self.has_unwritten(conversation_id):
+            return
+        with self._write_lock:
+            while True:
+                with self._cond:
+                    batch = self._pending[:self.max_batch]
+                    del self._pending[:self.max_batch]
+                if not batch:
+                    return
+                self._write(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def _write(self, batch: List[DialogueRecord]) -> None:
+        try:
+            self.dao.create_dialogue_records(batch)
+        except Exception as e:
+            logger.warning(f"Batch insert of {len(batch)} dialogue records failed, retrying one by one: {e}")
+            for record in batch:
+                try:
+                    self.dao.create_dialogue_record(record)
+                except Exception as e:
+                    logger.error(f"Dropping dialogue record {record.id} of conversation {record.conversation_id}: {e}")
+        finally:
+            with self._cond:
+                self._unwritten.subtract(record.conversation_id for record in batch)
+                self._unwritten += Counter()  # 去掉计数为 0 的会话
+
+    def close(self) -> None:
+        """
+        停止后台线程并写入剩余记录
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        atexit.unregister(self.close)
@@ -1,6 +1,7 @@
 from src.modules.dbController.dao.user_dao import UserDAO
 from src.modules.dbController.models.user import User
 from src.modules.services.dto.dto import UserDTO
+from src.modules.services.business.ownership_cache import OwnershipCacheBackend
 import hashlib
 
 def to_hash(password: str) -> str:
@@ -12,8 +13,13 @@ def to_hash(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 class UserBusiness:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, ownership_cache: OwnershipCacheBackend | None = None):
+        """
+        :param config: 数据库配置
+        :param ownership_cache: 会话归属缓存，需与 ConversationBusiness 共用同一实例以便删除会话时失效；None 表示不缓存
+        """
         self.user_dao = UserDAO(config)
+        self.ownership_cache = ownership_cache
 
     def register_user(self, user_id: str, username: str, email: str, password: str) -> UserDTO:
         """
@@ -113,7 +119,11 @@ class UserBusiness:
         :raises LookupError: 如果用户不存在
         
         """
-        self.user_dao.delete_user(user_id, is_hard_delete)
+        try:
+            self.user_dao.delete_user(user_id, is_hard_delete)
+        finally:
+            if self.ownership_cache is not None:
+                self.ownership_cache.invalidate_user(user_id)
 
 
     def check_conversation_ownership(self, user_id: str, conversation_id: str) -> bool:
@@ -122,7 +132,15 @@ class UserBusiness:
         :param user_id: 用户 ID
         :param conversation_id: 会话 ID
         :return: 如果用户拥有该会话则返回 True，否则返回 False
+        :raises LookupError: 用户不存在
+        :raises ValueError: 用户已被软删除
         """
-        return self.user_dao.check_user_ownership(user_id, conversation_id)
+        if self.ownership_cache is not None and self.ownership_cache.is_owner(user_id, conversation_id):
+            return True
+        owned = self.user_dao.check_user_ownership(user_id, conversation_id)
+        # 只缓存“拥有”的结果：会话不存在时可能稍后才被创建
+        if owned and self.ownership_cache is not None:
+            self.ownership_cache.set(conversation_id, user_id)
+        return owned
     
 
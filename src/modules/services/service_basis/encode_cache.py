@@ -0,0 +1,170 @@
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+
+from src.utils.root_path import get_root_path
+
+# 默认缓存文件位置（与数据集放在一起，不纳入版本管理）
+DEFAULT_ENCODE_CACHE_PATH = get_root_path() / 'dataset' / 'meal_service' / 'encode_cache.sqlite3'
+
+
+def normalize_name(name) -> str:
+    """
+    缓存键：全角转半角、去掉空白、英文转小写，使 "皇堡"、" 皇堡 "、"ＫＦＣ" / "kfc" 命中同一条目
+    """
+    return ''.join(unicodedata.normalize('NFKC', str(name)).split()).lower()
+
+
+class EncodeCache:
+    """
+    MealService.encode 结果（52 维特征 JSON）的持久化缓存，存储在本地 SQLite 文件中，
+    以规范化后的餐食名为键，多个进程可以共享同一个文件。
+
+    - ttl：条目写入后的有效期，过期条目在读取时删除；
+    - max_entries：条目数上限，写入后超出时按最近访问时间淘汰最旧的条目；
+    - version：编码版本（如 encoding_prompt 的哈希），版本不同的条目视为未命中，
+      修改提示词后旧结果自动失效。
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_ENCODE_CACHE_PATH, ttl: float | None = 30 * 24 * 3600,
+                 max_entries: int = 100_000, version: str = ''):
+        """
+        :param path: SQLite 文件路径，":memory:" 表示仅在内存中
+        :param ttl: 有效期（秒），None 表示永不过期
+        :param max_entries: 最多缓存的条目数
+        :param version: 编码版本
+        :raises ValueError: 参数非法
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS encode_cache ("
+                " name TEXT PRIMARY KEY,"
+                " version TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_encode_cache_accessed ON encode_cache (accessed_at)")
+
+    def get(self, name) -> dict | None:
+        """
+        :param name: 餐食名
+        :return: 缓存的 encode 结果；未命中、过期或版本不同时返回 None
+        """
+        key = normalize_name(name)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, value, created_at FROM encode_cache WHERE name = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != self.version or self._expired(row[2], now):
+                if row is not None:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM encode_cache WHERE name = ?", (key,))
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE encode_cache SET accessed_at = ? WHERE name = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, name, value: dict) -> None:
+        """
+        :param name: 餐食名
+        :param value: encode 结果
+        """
+        key = normalize_name(name)
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO encode_cache (name, version, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, self.version, data, now, now)
+            )
+            self._evict()
+
+    def __contains__(self, name) -> bool:
+        key = normalize_name(name)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, created_at FROM encode_cache WHERE name = ?", (key,)
+            ).fetchone()
+        return row is not None and row[0] == self.version and not self._expired(row[1], time.time())
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and created_at + self.ttl <= now
+
+    def _evict(self) -> None:
+        """
+        删除过期条目，条目数仍超出上限时删除最久未访问的条目（调用方持有锁并处于事务中）
+        """
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM encode_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM encode_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM encode_cache WHERE name IN "
+                "(SELECT name FROM encode_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM encode_cache")
+
+    def stats(self) -> dict:
+        """
+        :return: {"hits", "misses", "size", "hit_rate"}，hits / misses 为本进程内的计数
+        """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM encode_cache").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": size,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return self.stats()["size"]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == '__main__':
+    # 离线预热：为 item.csv 中的全部菜品名调用一次 encode 并写入缓存
+    # python -m src.modules.services.service_basis.encode_cache [缓存文件] [--workers N]
+    import argparse
+    import logging
+    from .meal_service import MealService
+
+    parser = argparse.ArgumentParser(description="Pre-encode the meal catalogue into the encode cache.")
+    parser.add_argument('path', nargs='?', default=str(DEFAULT_ENCODE_CACHE_PATH))
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    service = MealService(max_workers=args.workers, encode_cache={'path': args.path})
+    encoded = service.warm_encode_cache()
+    print(f"encoded {encoded} names, cache stats: {service.encode_cache.stats()}")
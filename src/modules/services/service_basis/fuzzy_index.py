@@ -0,0 +1,148 @@
+import heapq
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+import Levenshtein
+
+
+class FuzzyIndex:
+    """
+    名称近似匹配索引：返回与查询串编辑距离最近的 top-k 个名称（结果与逐个计算编辑距离完全一致）。
+
+    建立一次字符倒排索引（字符 -> 包含它的名称及出现次数）。查询时：
+    - 与查询串有公共字符的名称，用 max(|a|, |b|) - 公共字符数 作为编辑距离的下界，
+      按下界从小到大逐个精确计算，当下界超过当前第 k 名时停止；
+    - 没有公共字符的名称，编辑距离恰好为 max(|a|, |b|)，无需计算，只在需要时参与排序。
+    因此只对少量候选调用 Levenshtein.distance，而不是遍历全部名称。
+    """
+
+    def __init__(self, names: Sequence[str]):
+        """
+        :param names: 名称列表，查询结果中的下标即该列表的下标
+        """
+        self.names = [str(name) for name in names]
+        self.lengths = np.array([len(name) for name in self.names], dtype=np.int32)
+        self.min_length = int(self.lengths.min()) if len(self.names) else 0
+
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        for i, name in enumerate(self.names):
+            for ch, count in Counter(name).items():
+                ids, counts = postings.setdefault(ch, ([], []))
+                ids.append(i)
+                counts.append(count)
+        self._postings = {
+            ch: (np.array(ids, dtype=np.int32), np.array(counts, dtype=np.int32))
+            for ch, (ids, counts) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nearest(self, query: str, k: int = 5, normalized: bool = False) -> list[tuple[int, float]]:
+        """
+        查询最近的 k 个名称
+        :param query: 查询串
+        :param k: 返回个数
+        :param normalized: False 时按编辑距离排序，返回 (下标, 编辑距离)；
+                           True 时按归一化相似度 1 - 距离 / max(|a|, |b|) 排序，返回 (下标, 相似度)
+        :return: 按距离从小到大（相似度从大到小）排列，距离相同时下标小的在前
+        """
+        query = str(query)
+        k = min(k, len(self.names))
+        if k <= 0:
+            return []
+        lq = len(query)
+
+        ids, common = self._common_chars(query)
+        lengths = self.lengths[ids]
+        bounds = self._score(np.maximum(lq, lengths) - common, lengths, lq, normalized)
+        order = np.lexsort((ids, bounds))
+
+        # 最大堆保存当前最好的 k 个 (score, idx)
+        heap: list[tuple[float, int]] = []
+        for j in order:
+            idx, bound = int(ids[j]), float(bounds[j])
+            if len(heap) == k and (bound, idx) > (-heap[0][0], -heap[0][1]):
+                break
+            distance = Levenshtein.distance(query, self.names[idx])
+            score = float(self._score(distance, int(self.lengths[idx]), lq, normalized))
+            entry = (-score, -idx)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        best = [(-s, -i) for s, i in heap]
+        best.extend(self._untouched(ids, lq, k, normalized, best))
+        best.sort()
+        best = best[:k]
+        if normalized:
+            return [(idx, 1 - score) for score, idx in best]
+        return [(idx, int(score)) for score, idx in best]
+
+    def nearest_many(self, queries: Sequence[str], k: int = 5, normalized: bool = False) -> list[list[tuple[int, float]]]:
+        """
+        批量查询，重复的查询串只计算一次
+        :return: 与 queries 一一对应的结果列表
+        """
+        cache: dict[str, list[tuple[int, float]]] = {}
+        results = []
+        for query in queries:
+            if query not in cache:
+                cache[query] = self.nearest(query, k, normalized)
+            results.append(cache[query])
+        return results
+
+    def nearest_names(self, query: str, k: int = 5, normalized: bool = False) -> list[str]:
+        return [self.names[idx] for idx, _ in self.nearest(query, k, normalized)]
+
+    def _common_chars(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        与查询串有公共字符的名称下标，及公共字符数（多重集交集大小）
+        """
+        id_parts, count_parts = [], []
+        for ch, q_count in Counter(query).items():
+            posting = self._postings.get(ch)
+            if posting is not None:
+                id_parts.append(posting[0])
+                count_parts.append(np.minimum(posting[1], q_count))
+        if not id_parts:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        ids, inverse = np.unique(np.concatenate(id_parts), return_inverse=True)
+        common = np.bincount(inverse, weights=np.concatenate(count_parts)).astype(np.int32)
+        return ids, common
+
+    @staticmethod
+    def _score(distance, lengths, lq: int, normalized: bool):
+        """
+        排序用的分数（越小越好）：编辑距离，或归一化距离 距离 / max(|a|, |b|)（两者都为空串时为 0）
+        """
+        if not normalized:
+            return np.asarray(distance, dtype=np.float64)
+        max_len = np.maximum(lq, lengths)
+        return np.where(max_len > 0, np.asarray(distance, dtype=np.float64) / np.maximum(max_len, 1), 0.0)
+
+    def _untouched(self, ids: np.ndarray, lq: int, k: int, normalized: bool,
+                   best: list[tuple[float, int]]) -> list[tuple[float, int]]:
+        """
+        与查询串没有公共字符的名称：编辑距离为 max(|a|, |b|)。
+        只有在它们可能进入前 k 名时才展开计算
+        """
+        if len(best) == k:
+            worst = max(best)[0]
+            if normalized:
+                lowest = 1.0 if lq > 0 else 0.0
+            else:
+                lowest = max(lq, self.min_length)
+            if lowest > worst:
+                return []
+        mask = np.ones(len(self.names), dtype=bool)
+        mask[ids] = False
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+        lengths = self.lengths[candidates]
+        scores = self._score(np.maximum(lq, lengths), lengths, lq, normalized)
+        top = np.lexsort((candidates, scores))[:k]
+        return [(float(scores[j]), int(candidates[j])) for j in top]
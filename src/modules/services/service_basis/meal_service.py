@@ -9,12 +9,14 @@ DATASET_ITEM_PATH = PATH_TO_ROOT / 'dataset' / 'meal_service' / 'item.csv'
 import pandas as pd
 import re, json
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-import Levenshtein
 import time
+import hashlib
+import concurrent.futures
 
 from src.modules.services.service_basis.basis.tool import Tool
 from src.modules.services.service_basis.user_info import UserInfo
+from src.modules.services.service_basis.fuzzy_index import FuzzyIndex
+from src.modules.services.service_basis.encode_cache import EncodeCache
 import re
 import json
 from typing import Any
@@ -121,6 +123,9 @@ mapping = {
     'spring': '春', 'summer': '夏', 'autumn': '秋', 'winter': '冬'
 }
 
+# encode 缓存的版本：提示词或特征列表变化后，旧的缓存结果自动失效
+ENCODE_VERSION = hashlib.sha1((encoding_prompt + ','.join(soft_constraints)).encode('utf-8')).hexdigest()[:12]
+
 # 导出按顺序排列的值
 
 
@@ -129,14 +134,67 @@ class MealService(Tool):
     订餐服务模块，负责获取订餐信息
     """
 
-    def __init__(self, name="订餐服务", description=mealservice_desc, topK=10):
+    def __init__(self, name="订餐服务", description=mealservice_desc, topK=10,
+                 max_workers: int = 4, speculative_encode: bool = False,
+                 encode_cache: EncodeCache | dict | None = None):
+        """
+        :param max_workers: 并发 encode（LLM 调用）的最大线程数
+        :param speculative_encode: 为 True 时在 judge 的同时为所有候选提前 encode，
+                                   能省掉一轮 LLM 往返，但被 judge 匹配上的候选的 encode 结果会被丢弃
+        :param encode_cache: encode 结果的持久化缓存，可传入 EncodeCache 或其参数 {path, ttl, max_entries}；
+                             None 表示不缓存
+        """
         super().__init__(name, description)
+        self.max_workers = max_workers
+        self.speculative_encode = speculative_encode
+        if isinstance(encode_cache, dict):
+            encode_cache = EncodeCache(**{'version': ENCODE_VERSION, **encode_cache})
+        self.encode_cache = encode_cache
         self.items = pd.read_csv(DATASET_ITEM_PATH)
         self.items.set_index(inplace=True, keys=['is_dinner', 'cuisine', 'food_type'])
         self.items['id'] = self.items['city_id'].astype(str) + '_' + self.items['restaurant_id'].astype(str) + '_' + self.items['food_id'].astype(str)
         self.cols = ['is_dinner', 'cuisine', 'food_type']
         self.topK = topK
         self.item_names = self.items['food_name'].to_list()
+        self.item_ids = self.items['id'].to_list()
+        # 菜品名近似匹配索引，只在加载数据时建立一次
+        self.name_index = FuzzyIndex(self.item_names)
+        # KNN 使用的特征矩阵与过滤位图，只在加载数据时建立一次
+        self._build_feature_index()
+
+    def _build_feature_index(self):
+        """
+        预计算 KNN 所需的数据（行按 (is_dinner, cuisine, food_type) 排序，与原 sort_index 后的顺序一致）：
+        - 47 维软约束特征：缺失值填 0 后按行 L2 归一化，存为连续的 float32 矩阵；
+        - 饮食类型 / 菜系 / 中西餐与 4 个辣度列：每个取值一个布尔位图；
+        - 价格：有序数组，按区间二分查找。
+        """
+        keys = self.items.index.to_frame(index=False)
+        order = np.lexsort((keys['food_type'].to_numpy(), keys['cuisine'].to_numpy(), keys['is_dinner'].to_numpy()))
+        self._knn_rows = order  # 排序后第 i 行在 self.items 中的位置
+
+        features = self.items[soft_constraints].fillna(0).to_numpy(dtype=np.float32)[order]
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        self._knn_features = np.ascontiguousarray(features / np.where(norms > 0, norms, 1))
+
+        def bitmaps(values):
+            return {float(v): values == v for v in np.unique(values[~np.isnan(values)])}
+
+        self._knn_category_bitmaps = {
+            attr: bitmaps(keys[col].to_numpy(dtype=np.float64)[order])
+            for attr, col in zip(['饮食类型', '菜系', '中西餐'], self.cols)
+        }
+        self._knn_spicy_bitmaps = {
+            attr: bitmaps(self.items[col].to_numpy(dtype=np.float64)[order])
+            for attr, col in zip(['不辣', '微辣', '中辣', '特辣'],
+                                 ['not-spicy', 'slightly-spicy', 'medium-spicy', 'extra-spicy'])
+        }
+
+        price = self.items['price'].to_numpy(dtype=np.float64)[order]
+        valid = np.flatnonzero(~np.isnan(price))
+        price_order = valid[np.argsort(price[valid], kind='stable')]
+        self._knn_price_order = price_order
+        self._knn_prices = price[price_order]
 
     def __call__(self, parameter: dict, user_info: UserInfo, history: list):
         import time
@@ -158,36 +216,80 @@ class MealService(Tool):
         except Exception as e:
             logger.error(f"[MealService] Error in retrieve: {e}", exc_info=True)
             raise
+        # encode 各候选相互独立，在线程池中并发调用 LLM
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="meal-encode")
         try:
-            t4 = time.time()
-            judge_result = self.judge(raw_candidates, retrieved_items)
-            t5 = time.time()
-            logger.info(f"[MealService] judge耗时: {t5-t4:.3f}s, judge_result: {judge_result}")
-        except Exception as e:
-            logger.error(f"[MealService] Error in judge: {e}", exc_info=True)
-            raise
-        recommended_list = []
-        t6 = time.time()
-        for raw_candidate, linked_item in judge_result.items():
-            if linked_item is not None:
-                recommended_list.append(linked_item)
-            else:
+            encodings = {}
+            if self.speculative_encode:
+                encodings = self._submit_encodes(pool, raw_candidates)
+            try:
+                t4 = time.time()
+                judge_result = self.judge(raw_candidates, retrieved_items)
+                t5 = time.time()
+                logger.info(f"[MealService] judge耗时: {t5-t4:.3f}s, judge_result: {judge_result}")
+            except Exception as e:
+                logger.error(f"[MealService] Error in judge: {e}", exc_info=True)
+                raise
+            recommended_list = []
+            t6 = time.time()
+            unmatched = [raw_candidate for raw_candidate, linked_item in judge_result.items() if linked_item is None]
+            encodings.update(self._submit_encodes(pool, [c for c in unmatched if c not in encodings]))
+            # 未匹配上的候选 encode 完成后一次性批量 KNN；slots 记录其在结果中的位置
+            slots, queries = [], []
+            for raw_candidate, linked_item in judge_result.items():
+                if linked_item is not None:
+                    recommended_list.append(linked_item)
+                    continue
                 try:
-                    encode_start = time.time()
-                    unmatched_item = self.encode(raw_candidate)
-                    encode_end = time.time()
-                    knn_start = time.time()
-                    match = self.KNN(unmatched_item)
-                    knn_end = time.time()
-                    recommended_list.append({'food_id': match['id'], 'food_name': match['food_name']})
-                    logger.info(f"[MealService] encode耗时: {encode_end-encode_start:.3f}s, KNN耗时: {knn_end-knn_start:.3f}s, candidate: {raw_candidate}")
+                    unmatched_item = encodings[raw_candidate].result()
                 except Exception as e:
-                    logger.error(f"[MealService] Error in encode/KNN for {raw_candidate}: {e}", exc_info=True)
+                    logger.error(f"[MealService] Error in encode for {raw_candidate}: {e}", exc_info=True)
+                    continue
+                slots.append((len(recommended_list), raw_candidate))
+                recommended_list.append(None)
+                queries.append(unmatched_item)
+        finally:
+            # 投机 encode 中已匹配候选的调用不再等待
+            pool.shutdown(wait=False, cancel_futures=True)
+        if queries:
+            knn_start = time.time()
+            try:
+                matches = self.knn_many(queries, k=1)
+            except Exception as e:
+                # 批量失败时逐个重试，只丢弃出错的候选
+                logger.error(f"[MealService] Error in batched KNN: {e}", exc_info=True)
+                matches = []
+                for query, (_, raw_candidate) in zip(queries, slots):
+                    try:
+                        matches.append(self.knn_many([query], k=1)[0])
+                    except Exception as e:
+                        logger.error(f"[MealService] Error in KNN for {raw_candidate}: {e}", exc_info=True)
+                        matches.append(None)
+            logger.info(f"[MealService] KNN耗时: {time.time()-knn_start:.3f}s, queries: {len(queries)}")
+            for (slot, raw_candidate), match in zip(slots, matches):
+                if match is None or match.empty:
+                    logger.error(f"[MealService] No KNN match for {raw_candidate}")
+                    continue
+                match = match.iloc[0]
+                recommended_list[slot] = {'food_id': match['id'], 'food_name': match['food_name']}
+            recommended_list = [item for item in recommended_list if item is not None]
         t7 = time.time()
         logger.info(f"[MealService] recommended_list: {recommended_list}")
         logger.info(f"[MealService] Timing: recommend={t1-t0:.3f}s, retrieve={t3-t2:.3f}s, judge={t5-t4:.3f}s, encode+KNN={t7-t6:.3f}s, total={t7-start_time:.3f}s")
         return recommended_list
 
+    def _submit_encodes(self, pool: concurrent.futures.Executor, candidates: list) -> dict:
+        """
+        为每个候选提交一次 encode
+        :return: {候选名: Future}
+        """
+        def timed_encode(candidate):
+            encode_start = time.time()
+            result = self.encode(candidate)
+            logger.info(f"[MealService] encode耗时: {time.time()-encode_start:.3f}s, candidate: {candidate}")
+            return result
+        return {candidate: pool.submit(timed_encode, candidate) for candidate in dict.fromkeys(candidates)}
+
     def recommend(self, user_info: UserInfo, history: list):
         # 使用大模型进行零样本对话式推荐
         prompt = recommend_prompt.format(top_k=3, user_info=user_info, dialogue=history[-3:])
@@ -203,18 +305,17 @@ class MealService(Tool):
             raise ValueError("No list block found in LLM response.")
 
     def retrieve(self, raw_candidates: list):
+        """
+        为每个候选餐食检索编辑距离最近的 5 个菜品，按菜品名去重
+        """
         retrieved_items = []
-        for raw_candidate in raw_candidates:
-            sim = []
-            for item_name in self.item_names:
-                sim.append(Levenshtein.distance(raw_candidate, item_name))
-            top3_idx = np.array(sim).argsort().tolist() # To-Improve：可以匹配多个，再交给LLM判断
-            for idx in top3_idx[:5]:
-                retrieved_items.append({'food_id': self.items.iloc[idx]['id'],'food_name':self.item_names[idx]})
-        df = pd.DataFrame(retrieved_items)
-
-        df = df.drop_duplicates(subset='food_name')
-        retrieved_items = df.to_dict(orient='records')
+        seen_names = set()
+        for matches in self.name_index.nearest_many(raw_candidates, k=5): # To-Improve：可以匹配多个，再交给LLM判断
+            for idx, _ in matches:
+                if self.item_names[idx] in seen_names:
+                    continue
+                seen_names.add(self.item_names[idx])
+                retrieved_items.append({'food_id': self.item_ids[idx], 'food_name': self.item_names[idx]})
 
         return retrieved_items
 
@@ -285,6 +386,39 @@ class MealService(Tool):
         return judge_result
 
     def encode(self, raw_candidates: list):
+        if self.encode_cache is not None:
+            cached = self.encode_cache.get(raw_candidates)
+            if cached is not None:
+                return cached
+        query = self._encode_with_llm(raw_candidates)
+        if self.encode_cache is not None:
+            self.encode_cache.put(raw_candidates, query)
+        return query
+
+    def warm_encode_cache(self, names: list | None = None) -> int:
+        """
+        预先 encode 并写入缓存（已缓存的名称跳过），默认覆盖 item.csv 中的全部菜品名
+        :param names: 要预热的餐食名
+        :return: 本次新 encode 的名称数
+        :raises ValueError: 未配置 encode_cache
+        """
+        if self.encode_cache is None:
+            raise ValueError("encode_cache is not configured.")
+        names = [name for name in dict.fromkeys(self.item_names if names is None else names)
+                 if name not in self.encode_cache]
+        encoded = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="meal-encode") as pool:
+            futures = {pool.submit(self.encode, name): name for name in names}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                    encoded += 1
+                except Exception as e:
+                    logger.error(f"[MealService] Error in encode for {futures[future]}: {e}")
+        logger.info(f"[MealService] encode cache warmed: {encoded}/{len(names)}, stats: {self.encode_cache.stats()}")
+        return encoded
+
+    def _encode_with_llm(self, raw_candidates: list):
         prompt = encoding_prompt.format(items=raw_candidates)
         completion = feed_LLM(prompt)
         result = ''
@@ -361,32 +495,15 @@ class MealService(Tool):
     """
 
     def KNN(self, query: dict) -> pd.Series:
-        for attr in ['饮食类型', '菜系', '中西餐']:
-            if query[attr] == 0:
-                query[attr] = slice(None)
-        price_range = query.get('价格', '未加限定')
-        if price_range != '未加限定' and isinstance(price_range, list) and len(price_range) == 2:
-            filtered_items = self.items[
-                (self.items['price'] >= query['价格'][0]) & (self.items['price'] <= query['价格'][1])]
-        else:
-            filtered_items = self.items
-
-        indexes = (query['饮食类型'], query['菜系'], query['中西餐'])
-        filtered_items = filtered_items[(filtered_items['not-spicy']==query['不辣'])|
-                                        (filtered_items['slightly-spicy']==query['微辣'])|
-                                        (filtered_items['medium-spicy']==query['中辣'])|
-                                        (filtered_items['extra-spicy']==query['特辣'])]
-        filtered_items = filtered_items.sort_index()
-        filtered_items = filtered_items.loc[indexes]
-
-        # vectors = filtered_items[soft_constraints].to_numpy()
-        vectors = filtered_items[soft_constraints].fillna(0).to_numpy()
-        # vector = np.array([query[k] for k in soft_constraints]).reshape(1, -1)
-        vector = np.array(list(query.get(mapping.get(k), 3) for k in soft_constraints)).reshape(1, -1)
-        # vector = np.array(list(query.values())[8:]).reshape(1,-1)
-        sim = cosine_similarity(vector, vectors)
-        top_idx = sim.argmax(axis=1)
-        # print(filtered_items)
+        """
+        在满足硬约束（饮食类型 / 菜系 / 中西餐 / 辣度 / 价格）的菜品中，返回软约束特征余弦相似度最高的一个
+        :param query: encode 的输出
+        :return: self.items 中对应的行
+        :raises ValueError: 没有满足约束的菜品
+        """
+        matches = self.knn_many([query], k=1)[0]
+        if matches.empty:
+            raise ValueError("No item satisfies the constraints of the query.")
         # 输出样例：
         # city_id                   17
         # restaurant_id              9
@@ -396,7 +513,64 @@ class MealService(Tool):
         # ...（省略其它字段）...
         # id                    17_9_7
         # Name: (1.0, 1.0, 1.0), dtype: object
-        return filtered_items.iloc[top_idx.item()]
+        return matches.iloc[0]
+
+    def knn_many(self, queries: list[dict], k: int = 1) -> list[pd.DataFrame]:
+        """
+        批量 KNN：所有查询的相似度由一次矩阵乘法得到，再分别应用各自的过滤条件
+        :param queries: encode 的输出列表
+        :param k: 每个查询返回的个数
+        :return: 与 queries 一一对应，每个元素为 self.items 中按相似度从高到低排列的至多 k 行
+        """
+        if not queries:
+            return []
+        vectors = np.array(
+            [[query.get(mapping.get(key), 3) for key in soft_constraints] for query in queries],
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1)
+        similarity = self._knn_features @ vectors.T
+
+        results = []
+        for j, query in enumerate(queries):
+            candidates = np.flatnonzero(self._knn_mask(query))
+            scores = similarity[candidates, j]
+            # 相似度相同时取排序靠前的一行
+            top = candidates[np.argsort(-scores, kind='stable')[:k]]
+            results.append(self.items.iloc[self._knn_rows[top]])
+        return results
+
+    def _knn_mask(self, query: dict) -> np.ndarray:
+        """
+        硬约束对应的行掩码（排序后的行顺序）
+        """
+        def lookup(bitmaps: dict, value):
+            if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                bitmap = bitmaps.get(float(value))
+                if bitmap is not None:
+                    return bitmap
+            return np.zeros(len(self._knn_rows), dtype=bool)
+
+        mask = np.ones(len(self._knn_rows), dtype=bool)
+        for attr, bitmaps in self._knn_category_bitmaps.items():
+            # 0 表示未加限定
+            if query[attr] != 0:
+                mask &= lookup(bitmaps, query[attr])
+
+        spicy = np.zeros(len(self._knn_rows), dtype=bool)
+        for attr, bitmaps in self._knn_spicy_bitmaps.items():
+            spicy |= lookup(bitmaps, query[attr])
+        mask &= spicy
+
+        price_range = query.get('价格', '未加限定')
+        if price_range != '未加限定' and isinstance(price_range, list) and len(price_range) == 2:
+            lo = np.searchsorted(self._knn_prices, price_range[0], side='left')
+            hi = np.searchsorted(self._knn_prices, price_range[1], side='right')
+            in_range = np.zeros(len(self._knn_rows), dtype=bool)
+            in_range[self._knn_price_order[lo:hi]] = True
+            mask &= in_range
+        return mask
 
     
 
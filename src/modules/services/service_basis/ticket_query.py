@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import json
 
 import os, sys
@@ -8,10 +9,15 @@ if str(PATH_TO_ROOT) not in sys.path:
     sys.path.append(str(PATH_TO_ROOT))
 from src.modules.services.service_basis.user_info import UserInfo
 from src.modules.services.service_basis.basis.tool import Tool
+from src.modules.services.service_basis.ticket_store import TicketStore, NO_DATE, to_day, to_minute
 
 # 路径常量集中管理
 
 TICKET_CSV_PATH = PATH_TO_ROOT / 'dataset' / 'ticket_service' / 'ticket.csv'
+# 不需要的列，编译时丢弃
+DROP_COLUMNS = ('软卧/动卧/一等卧',)
+# 返回结果（提示信息 + 车次）最多条数
+MAX_RESULTS = 6
 
 
 ticketquery_desc = '''车票查询：本接口用于从数据库中查询符合用户要求的火车票。接口输入格式：{"起始站":<起始高铁站>, "终点站":<终点高铁站>, "发车日期":<发车日期>, "到站日期":<到站日期>, "最早发车时刻":<最早发车时刻>, "最晚发车时刻":<最晚发车时刻>, "最早到站时刻":<最早到站时刻>, "最晚到站时刻":<最晚到站时刻>}，其中：时刻的格式都应该形如"08:15"、日期的格式都应该形如"2025-6-7"、起始站和终点站不可缺失、用None作缺失值表示不作要求'''
@@ -23,21 +29,16 @@ class TicketQuery(Tool):
     def __init__(self, name="车票查询", description=ticketquery_desc):
         super().__init__(name, description)
         # 兼容容器和本地开发环境，始终从项目根目录定位 dataset/ticket.csv
-        self.tickets = pd.read_csv(TICKET_CSV_PATH, low_memory=False)
-        self.tickets.drop('软卧/动卧/一等卧', axis=1, inplace=True)
-        self.tickets = self.tickets.groupby(['起始站', '终点站']).apply(lambda X: X)
-        self.tickets['出发日期'] = pd.to_datetime(self.tickets['出发日期'], format="mixed")
-        self.tickets['到达日期'] = pd.to_datetime(self.tickets['到达日期'], format='mixed')
-        self.tickets['出发时间'] = pd.to_datetime(self.tickets['出发时间'], format='mixed')
-        self.tickets['到达时间'] = pd.to_datetime(self.tickets['到达时间'], format='mixed')
+        # 首次启动时编译为列式存储（ticket.store/），之后直接 mmap 打开
+        self.store = TicketStore.open(TICKET_CSV_PATH, drop_columns=DROP_COLUMNS)
+        self.all_stations = set(self.store.src_stations()) | set(self.store.dst_stations())
         
         # 创建城市名到车站名的映射
         self._build_city_station_mapping()
     
     def _build_city_station_mapping(self):
         """构建城市名到车站名的映射关系"""
-        all_stations = set(self.tickets.index.get_level_values('起始站').unique()) | \
-                      set(self.tickets.index.get_level_values('终点站').unique())
+        all_stations = self.all_stations
         
         self.city_to_stations = {}
         
@@ -95,10 +96,7 @@ class TicketQuery(Tool):
         
         # 模糊匹配：查看是否有车站名包含输入的城市名
         matching_stations = []
-        all_stations = set(self.tickets.index.get_level_values('起始站').unique()) | \
-                      set(self.tickets.index.get_level_values('终点站').unique())
-        
-        for station in all_stations:
+        for station in self.all_stations:
             if city_input in station:
                 matching_stations.append(station)
         
@@ -158,11 +156,11 @@ class TicketQuery(Tool):
         des_stations = self._find_matching_stations(des)
         
         if not src_stations:
-            all_src_stations = list(set(self.tickets.index.get_level_values('起始站').unique()))[:10]
+            all_src_stations = self.store.src_stations()[:10]
             return [f'找不到起始站"{src}"，可用的起始站示例：{all_src_stations}']
         
         if not des_stations:
-            all_des_stations = list(set(self.tickets.index.get_level_values('终点站').unique()))[:10]
+            all_des_stations = self.store.dst_stations()[:10]
             return [f'找不到终点站"{des}"，可用的终点站示例：{all_des_stations}']
         
         # 安全转换时间参数，处理None值
@@ -181,80 +179,77 @@ class TicketQuery(Tool):
         l_arrv_time = safe_timestamp(parameter.get('最早到站时刻'))
         r_arrv_time = safe_timestamp(parameter.get('最晚到站时刻'))
         
-        # 收集所有匹配的路线
-        all_results = []
+        # 收集所有匹配的路线（每条路线是存储中连续的一段行）
+        ranges = []
         route_info = []
         
         for src_station in src_stations:
             for des_station in des_stations:
-                try:
-                    # 尝试查找从src_station到des_station的路线
-                    route_results = self.tickets.loc[src_station].loc[des_station]
-                    if not route_results.empty:
-                        all_results.append(route_results)
-                        route_info.append(f"{src_station} → {des_station}")
-                except KeyError:
-                    continue
+                route = self.store.route_range(src_station, des_station)
+                if route is not None:
+                    ranges.append(route)
+                    route_info.append(f"{src_station} → {des_station}")
         
-        if not all_results:
+        if not ranges:
             return [f'找不到从"{src}"到"{des}"的直达车次。匹配的起始站：{src_stations}，匹配的终点站：{des_stations}']
         
-        # 合并所有结果
-        results = pd.concat(all_results, ignore_index=False)
+        store = self.store
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
         
-        # 应用时间和日期过滤条件
-        if not pd.isna(s_date) and (results['出发日期'] == s_date).sum() == 0:
-            # 获取可用的出发日期
-            available_dates = sorted(results['出发日期'].dt.strftime('%Y-%m-%d').unique())
-            l_info.append(f'出发日期为{s_date.strftime("%Y-%m-%d")}的车次不存在，可用的出发日期有：{", ".join(available_dates[:5])}')
-            # 如果指定日期不存在，显示所有可用车次而不是返回空结果
-        elif not pd.isna(s_date):
-            results = results[results['出发日期'] == s_date]
-            
-        if not pd.isna(e_date) and (results['到达日期'] == e_date).sum() == 0:
-            available_dates = sorted(results['到达日期'].dt.strftime('%Y-%m-%d').unique())
-            l_info.append(f'到站日期为{e_date.strftime("%Y-%m-%d")}的车次不存在，可用的到站日期有：{", ".join(available_dates[:5])}')
-        elif not pd.isna(e_date):
-            results = results[results['到达日期'] == e_date]
-            
-        if not pd.isna(l_dept_time) and (results['出发时间'] >= l_dept_time).sum() == 0:
-            l_info.append(f'出发时间在{l_dept_time.strftime("%H:%M:%S")}之后的车次不存在')
-        elif not pd.isna(l_dept_time):
-            results = results[results['出发时间'] >= l_dept_time]
+        # 应用时间和日期过滤条件：条件过滤后为空时给出提示并忽略该条件
+        if not pd.isna(s_date):
+            # 路线内按出发日期有序，二分查找
+            day = to_day(s_date)
+            date_rows = [] if day is None else [np.arange(*store.date_range(start, end, day)) for start, end in ranges]
+            date_rows = np.concatenate(date_rows) if date_rows else rows[:0]
+            if len(date_rows) == 0:
+                # 获取可用的出发日期
+                available_dates = [store.format_day(d) for d in np.unique(store.dep_date[rows])[:5]]
+                l_info.append(f'出发日期为{s_date.strftime("%Y-%m-%d")}的车次不存在，可用的出发日期有：{", ".join(available_dates)}')
+                # 如果指定日期不存在，显示所有可用车次而不是返回空结果
+            else:
+                rows = date_rows
             
-        if not pd.isna(r_dept_time) and (results['出发时间'] <= r_dept_time).sum() == 0:
-            l_info.append(f'出发时间在{r_dept_time.strftime("%H:%M:%S")}之前的车次不存在')
-        elif not pd.isna(r_dept_time):
-            results = results[results['出发时间'] <= r_dept_time]
-            
-        if not pd.isna(l_arrv_time) and (results['到达时间'] >= l_arrv_time).sum() == 0:
-            l_info.append(f'到站时间在{l_arrv_time.strftime("%H:%M:%S")}之后的车次不存在')
-        elif not pd.isna(l_arrv_time):
-            results = results[results['到达时间'] >= l_arrv_time]
-            
-        if not pd.isna(r_arrv_time) and (results['到达时间'] <= r_arrv_time).sum() == 0:
-            l_info.append(f'到站时间在{r_arrv_time.strftime("%H:%M:%S")}之前的车次不存在')
-        elif not pd.isna(r_arrv_time):
-            results = results[results['到达时间'] <= r_arrv_time]
+        if not pd.isna(e_date):
+            day = to_day(e_date)
+            matched = rows[store.arr_date[rows] == day] if day is not None else rows[:0]
+            if len(matched) == 0:
+                available_dates = [store.format_day(d) for d in np.unique(store.arr_date[rows])[:5]]
+                l_info.append(f'到站日期为{e_date.strftime("%Y-%m-%d")}的车次不存在，可用的到站日期有：{", ".join(available_dates)}')
+            else:
+                rows = matched
+        
+        # 时刻以一天中的分钟数比较
+        time_filters = [
+            (l_dept_time, store.dep_time, np.greater_equal, '出发时间在{}之后的车次不存在'),
+            (r_dept_time, store.dep_time, np.less_equal, '出发时间在{}之前的车次不存在'),
+            (l_arrv_time, store.arr_time, np.greater_equal, '到站时间在{}之后的车次不存在'),
+            (r_arrv_time, store.arr_time, np.less_equal, '到站时间在{}之前的车次不存在'),
+        ]
+        for bound, times, compare, message in time_filters:
+            if pd.isna(bound):
+                continue
+            values = times[rows].astype(np.int32) * 60
+            seconds = to_minute(bound) * 60 + bound.second
+            matched = rows[(values >= 0) & compare(values, seconds)]
+            if len(matched) == 0:
+                l_info.append(message.format(bound.strftime("%H:%M:%S")))
+            else:
+                rows = matched
 
         # 处理查询结果
         try:
             # 添加路线信息说明
             if len(route_info) > 1:
-                l_info.append(f'找到{len(route_info)}条路线：{", ".join(set(route_info))}')
+                l_info.append(f'找到{len(route_info)}条路线：{", ".join(route_info)}')
             
-            for _, result in results.iterrows():
-                info = {}
-                for idx in result.index.to_list():
-                    if str(result[idx]) != 'nan':
-                        info[idx] = result[idx]
-                l_info.append(info)
-            if len(l_info) > 6:  # 增加显示条数以包含提示信息
-                l_info = l_info[:6]
+            today = pd.Timestamp.today().normalize()
+            for i in rows[:max(0, MAX_RESULTS - len(l_info))]:
+                l_info.append(store.row(int(i), today))
         except Exception as e:
             l_info.append(f'处理查询结果时出错: {str(e)}')
 
-        return l_info
+        return l_info[:MAX_RESULTS]
 
 class TicketQueryMappingDate(TicketQuery):
     """
@@ -263,8 +258,15 @@ class TicketQueryMappingDate(TicketQuery):
     def __init__(self, name="车票查询", description=ticketquery_desc):
         super().__init__(name, description)
 
-        self.departure_date_range: list[pd.Timestamp] = [self.tickets['出发日期'].min(), self.tickets['出发日期'].max()]
-        self.arrive_date_range: list[pd.Timestamp] = [self.tickets['到达日期'].min(), self.tickets['到达日期'].max()]
+        self.departure_date_range: list[pd.Timestamp] = self._valid_date_range(self.store.dep_date)
+        self.arrive_date_range: list[pd.Timestamp] = self._valid_date_range(self.store.arr_date)
+
+    @staticmethod
+    def _valid_date_range(days: np.ndarray) -> list[pd.Timestamp]:
+        days = days[days != NO_DATE]
+        if len(days) == 0:
+            return [pd.NaT, pd.NaT]
+        return [pd.Timestamp(int(days.min()), unit="D"), pd.Timestamp(int(days.max()), unit="D")]
 
 
     def mapping_date(self, date_str_0: str, date_str_1: str, valid_range: list[pd.Timestamp]) -> tuple[pd.Timestamp, pd.Timestamp]:
@@ -0,0 +1,319 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 磁盘格式版本，格式变化时递增，旧的编译结果会被自动重建
+STORE_VERSION = 1
+
+STATION_COLUMNS = ('起始站', '终点站')
+DATE_COLUMNS = ('出发日期', '到达日期')
+TIME_COLUMNS = ('出发时间', '到达时间')
+
+# 缺失值：日期为 NO_DATE，时刻为 NO_TIME
+NO_DATE = np.iinfo(np.int32).min
+NO_TIME = -1
+
+
+def to_day(value: pd.Timestamp) -> int | None:
+    """
+    日期 -> 自 1970-01-01 起的天数；带时刻（非零点）的值与任何日期都不相等，返回 None
+    """
+    if value != value.normalize():
+        return None
+    return int(value.value // (86400 * 10**9))
+
+
+def to_minute(value: pd.Timestamp) -> int:
+    """
+    时刻 -> 一天中的分钟数
+    """
+    return value.hour * 60 + value.minute
+
+
+class TicketStore:
+    """
+    车票数据的列式存储。
+
+    由 ticket.csv 编译一次，保存为一组 .npy 文件（同目录下的 ticket.store/），
+    之后启动时以 mmap 方式直接打开，不再用 pandas 解析 CSV。
+    - 行按 (起始站, 终点站, 出发日期, 出发时间) 排序，同一线路的车次是连续的一段行，
+      线路 -> 行区间通过对 route_codes 二分查找得到；
+    - 日期存为天数（int32），时刻存为分钟数（int16），同一线路内按出发日期二分查找；
+    - 其余列按原类型存为数值或定长字符串数组，缺失值单独记录掩码。
+    查询代价只与命中线路的车次数有关，与总表大小无关。
+    """
+
+    def __init__(self, columns: list[dict], arrays: dict[str, np.ndarray], stations: np.ndarray,
+                 route_codes: np.ndarray, route_offsets: np.ndarray):
+        """
+        :param columns: 列描述 [{"name", "kind", "file", "mask"}]，按原 CSV 列顺序
+        :param arrays: 文件名 -> 数组
+        :param stations: 车站名（有序）
+        :param route_codes: 每条线路的编码 起始站id * len(stations) + 终点站id（有序）
+        :param route_offsets: 每条线路的起始行，长度为线路数 + 1
+        """
+        self.columns = columns
+        self.arrays = arrays
+        self.stations = stations
+        self.route_codes = route_codes
+        self.route_offsets = route_offsets
+        self.station_ids = {str(name): i for i, name in enumerate(stations)}
+        self.dep_date = self.column('出发日期')
+        self.arr_date = self.column('到达日期')
+        self.dep_time = self.column('出发时间')
+        self.arr_time = self.column('到达时间')
+
+    def __len__(self) -> int:
+        return len(self.dep_date)
+
+    def column(self, name: str) -> np.ndarray:
+        for col in self.columns:
+            if col["name"] == name:
+                return self.arrays[col["file"]]
+        raise KeyError(name)
+
+    # ---------------------------------------------------------------- 查询
+
+    def route_range(self, src: str, dst: str) -> tuple[int, int] | None:
+        """
+        线路 src -> dst 的行区间 [start, end)，没有车次时返回 None
+        """
+        src_id = self.station_ids.get(src)
+        dst_id = self.station_ids.get(dst)
+        if src_id is None or dst_id is None:
+            return None
+        code = src_id * len(self.stations) + dst_id
+        i = int(np.searchsorted(self.route_codes, code))
+        if i == len(self.route_codes) or self.route_codes[i] != code:
+            return None
+        return int(self.route_offsets[i]), int(self.route_offsets[i + 1])
+
+    def date_range(self, start: int, end: int, day: int) -> tuple[int, int]:
+        """
+        线路区间 [start, end) 内出发日期为 day 的行区间（二分查找）
+        """
+        dates = self.dep_date[start:end]
+        lo = int(np.searchsorted(dates, day, side="left"))
+        hi = int(np.searchsorted(dates, day, side="right"))
+        return start + lo, start + hi
+
+    def src_stations(self) -> list[str]:
+        return self._stations_in(0)
+
+    def dst_stations(self) -> list[str]:
+        return self._stations_in(1)
+
+    def _stations_in(self, which: int) -> list[str]:
+        n = len(self.stations)
+        ids = self.route_codes // n if which == 0 else self.route_codes % n
+        return [str(self.stations[i]) for i in np.unique(ids)]
+
+    def row(self, i: int, today: pd.Timestamp | None = None) -> dict:
+        """
+        第 i 行转换为字典，键为原 CSV 列名，缺失值不输出。
+        日期为 pd.Timestamp，时刻为 today（默认当天）该时刻的 pd.Timestamp，与原 pandas 实现的输出一致
+        """
+        today = pd.Timestamp.today().normalize() if today is None else today
+        info = {}
+        for col in self.columns:
+            values = self.arrays[col["file"]]
+            if col["mask"] is not None and self.arrays[col["mask"]][i]:
+                continue
+            value = values[i]
+            kind = col["kind"]
+            if kind == "station":
+                info[col["name"]] = str(self.stations[value])
+            elif kind == "date":
+                if value == NO_DATE:
+                    continue
+                info[col["name"]] = pd.Timestamp(int(value), unit="D")
+            elif kind == "time":
+                if value == NO_TIME:
+                    continue
+                info[col["name"]] = today + pd.Timedelta(minutes=int(value))
+            elif kind == "float":
+                if np.isnan(value):
+                    continue
+                info[col["name"]] = float(value)
+            elif kind == "str":
+                info[col["name"]] = str(value)
+            else:
+                info[col["name"]] = value.item()
+        return info
+
+    @staticmethod
+    def format_day(day: int) -> str:
+        return pd.Timestamp(int(day), unit="D").strftime('%Y-%m-%d')
+
+    # ---------------------------------------------------------------- 编译 / 读写
+
+    @classmethod
+    def compile(cls, csv_path: str | Path, drop_columns: tuple[str, ...] = ()) -> "TicketStore":
+        """
+        解析 CSV 并构建内存中的 TicketStore
+        :raises KeyError: CSV 缺少起始站 / 终点站 / 日期 / 时刻列
+        """
+        df = pd.read_csv(csv_path, low_memory=False)
+        df = df.drop(columns=[c for c in drop_columns if c in df.columns])
+        for name in STATION_COLUMNS + DATE_COLUMNS + TIME_COLUMNS:
+            if name not in df.columns:
+                raise KeyError(f"ticket csv is missing column '{name}'")
+
+        stations = np.unique(np.concatenate([
+            df['起始站'].astype(str).to_numpy(), df['终点站'].astype(str).to_numpy()
+        ]).astype(str))
+        station_ids = {name: i for i, name in enumerate(stations)}
+        src = df['起始站'].astype(str).map(station_ids).to_numpy(np.int32)
+        dst = df['终点站'].astype(str).map(station_ids).to_numpy(np.int32)
+
+        def days(series):
+            parsed = pd.to_datetime(series, format="mixed")
+            out = parsed.dt.normalize().to_numpy().astype('datetime64[D]').astype(np.int64)
+            return np.where(parsed.isna().to_numpy(), NO_DATE, out).astype(np.int32)
+
+        def minutes(series):
+            parsed = pd.to_datetime(series, format="mixed")
+            out = (parsed.dt.hour * 60 + parsed.dt.minute).fillna(NO_TIME)
+            return out.to_numpy().astype(np.int16)
+
+        converted = {}
+        for name in DATE_COLUMNS:
+            converted[name] = days(df[name])
+        for name in TIME_COLUMNS:
+            converted[name] = minutes(df[name])
+
+        order = np.lexsort((converted['出发时间'], converted['出发日期'], dst, src))
+        src, dst = src[order], dst[order]
+
+        columns, arrays = [], {}
+        for i, name in enumerate(df.columns):
+            file = f"c{i}"
+            mask = None
+            if name == '起始站':
+                kind, values = "station", src
+            elif name == '终点站':
+                kind, values = "station", dst
+            elif name in converted:
+                kind = "date" if name in DATE_COLUMNS else "time"
+                values = converted[name][order]
+            else:
+                series = df[name]
+                if pd.api.types.is_bool_dtype(series):
+                    kind, values = "bool", series.to_numpy(bool)[order]
+                elif pd.api.types.is_integer_dtype(series):
+                    kind, values = "int", series.to_numpy(np.int64)[order]
+                elif pd.api.types.is_float_dtype(series):
+                    kind, values = "float", series.to_numpy(np.float64)[order]
+                else:
+                    kind = "str"
+                    missing = series.isna().to_numpy()[order]
+                    values = np.array(series.fillna('').astype(str).to_numpy()[order], dtype=str)
+                    if missing.any():
+                        mask = f"{file}.mask"
+                        arrays[mask] = missing
+            arrays[file] = np.ascontiguousarray(values)
+            columns.append({"name": str(name), "kind": kind, "file": file, "mask": mask})
+
+        codes = src.astype(np.int64) * len(stations) + dst
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.int64)
+        route_codes = codes[starts]
+        route_offsets = np.r_[starts, len(codes)].astype(np.int64)
+        return cls(columns, arrays, stations, route_codes, route_offsets)
+
+    def save(self, directory: str | Path, source: dict | None = None) -> None:
+        """
+        保存到目录：先写入临时目录再改名，多个进程同时编译也不会读到写了一半的文件
+        :param source: 记录源 CSV 的信息，用于判断编译结果是否过期
+        """
+        directory = Path(directory)
+        tmp = Path(tempfile.mkdtemp(prefix=directory.name + ".", dir=directory.parent))
+        try:
+            for file, values in self.arrays.items():
+                np.save(tmp / f"{file}.npy", values)
+            np.save(tmp / "stations.npy", self.stations)
+            np.save(tmp / "route_codes.npy", self.route_codes)
+            np.save(tmp / "route_offsets.npy", self.route_offsets)
+            meta = {"version": STORE_VERSION, "source": source or {}, "columns": self.columns}
+            with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            if directory.exists():
+                shutil.rmtree(directory, ignore_errors=True)
+            os.rename(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / "meta.json").exists():
+                raise
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> "TicketStore":
+        """
+        从目录加载（默认 mmap，不读入内存）
+        :raises FileNotFoundError: 目录或文件不存在
+        """
+        directory = Path(directory)
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        mmap_mode = "r" if mmap else None
+        arrays = {}
+        for col in meta["columns"]:
+            for file in (col["file"], col["mask"]):
+                if file is not None:
+                    arrays[file] = np.load(directory / f"{file}.npy", mmap_mode=mmap_mode)
+        return cls(
+            meta["columns"], arrays,
+            np.load(directory / "stations.npy"),
+            np.load(directory / "route_codes.npy"),
+            np.load(directory / "route_offsets.npy"),
+        )
+
+    @staticmethod
+    def read_meta(directory: str | Path) -> dict | None:
+        try:
+            with open(Path(directory) / "meta.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def open(cls, csv_path: str | Path, store_dir: str | Path | None = None,
+             drop_columns: tuple[str, ...] = ()) -> "TicketStore":
+        """
+        打开 csv_path 对应的编译结果；不存在或已过期（CSV 有改动 / 格式版本变化）时重新编译并保存。
+        保存失败（如目录只读）时直接使用内存中的编译结果
+        :param csv_path: ticket.csv 路径
+        :param store_dir: 编译结果目录，默认与 CSV 同目录的 <文件名>.store
+        :param drop_columns: 不需要的列
+        """
+        csv_path = Path(csv_path)
+        store_dir = Path(store_dir) if store_dir is not None else csv_path.with_suffix(".store")
+        stat = csv_path.stat()
+        source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "drop_columns": list(drop_columns)}
+        meta = cls.read_meta(store_dir)
+        if meta is not None and meta.get("version") == STORE_VERSION and meta.get("source") == source:
+            return cls.load(store_dir)
+
+        logger.info("Compiling ticket store %s -> %s", csv_path, store_dir)
+        store = cls.compile(csv_path, drop_columns)
+        try:
+            store.save(store_dir, source)
+        except OSError as e:
+            logger.warning("Failed to save ticket store to %s: %s", store_dir, e)
+            return store
+        return cls.load(store_dir)
+
+
+if __name__ == '__main__':
+    # 预先编译（如构建镜像或更新数据后）：python -m src.modules.services.service_basis.ticket_store [ticket.csv]
+    import sys
+    from .ticket_query import TICKET_CSV_PATH, DROP_COLUMNS
+    path = sys.argv[1] if len(sys.argv) > 1 else TICKET_CSV_PATH
+    store = TicketStore.open(path, drop_columns=DROP_COLUMNS)
+    print(f"{len(store)} rows, {len(store.route_codes)} routes, {len(store.stations)} stations")
@@ -11,6 +11,7 @@ import tiktoken
 import re
 import sys
 import os
+import copy
 
 project_root_path = os.path.dirname(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -55,6 +56,26 @@ class AbstractLLM(ABC):
         self.input_token_maxx = 0
         pass
 
+    def for_request(self):
+        """
+        复制一个共享客户端与 tokenizer、token 计数独立的实例，供并发的请求各自统计
+        """
+        llm = copy.copy(self)
+        llm.input_token_count = 0
+        llm.output_token_count = 0
+        llm.input_token_maxx = 0
+        return llm
+
+    def __copy__(self):
+        llm = self.__class__.__new__(self.__class__)
+        llm.__dict__.update(self.__dict__)
+        return llm
+
+    def __reduce__(self):
+        # pickle 到其它进程（如并行搜索的子进程）时在对方进程中重新构造，客户端与 tokenizer 不跨进程传递；
+        # 构造函数需要参数的子类不支持
+        return (self.__class__, ())
+
     def __call__(self, messages, one_line=True, json_mode=False):
         if one_line and json_mode:
             raise self.ModeError(
@@ -56,12 +56,12 @@ class LLMDrivenAgent(NesyAgent):
 
         self.llm_rec_count += 1
 
-        print(answer)
+        self.log(answer)
         match = re.search(r'IDList:\s*(\[[^\]]+\])', answer)
         # if match:
         try:
             intercity_transport_list = eval(match.group(1))
-            print('selected intercity_transports: ',intercity_transport_list) 
+            self.log('selected intercity_transports: ',intercity_transport_list) 
             # print(intercity_transport_list)
 
             ranking_idx = []
@@ -74,7 +74,7 @@ class LLMDrivenAgent(NesyAgent):
                     selected_index = np.where(selected_index)[0][0]
                     ranking_idx.append(selected_index)
         except Exception as e:
-            print("!!!Error in eval intercity_transport_list", e)
+            self.log("!!!Error in eval intercity_transport_list", e)
 
             self.llm_rec_format_error += 1
 
@@ -108,12 +108,12 @@ class LLMDrivenAgent(NesyAgent):
         self.llm_inference_time_count += time.time() - time_before
 
         self.llm_rec_count += 1
-        print(answer)
+        self.log(answer)
         match = re.search(r'IDList:\s*(\[[^\]]+\])', answer)
         # if match:
         try:
             intercity_transport_list = eval(match.group(1))
-            print('selected intercity_transports: ',intercity_transport_list) 
+            self.log('selected intercity_transports: ',intercity_transport_list) 
 
             # print(intercity_transport_list)
 
@@ -128,7 +128,7 @@ class LLMDrivenAgent(NesyAgent):
                     selected_index = np.where(selected_index)[0][0]
                     ranking_idx.append(selected_index)
         except Exception as e:
-            print("!!!Error in eval intercity_transport_list", e)
+            self.log("!!!Error in eval intercity_transport_list", e)
             self.llm_rec_format_error += 1
             
         # else:
@@ -149,7 +149,7 @@ class LLMDrivenAgent(NesyAgent):
     
     def ranking_hotel(self, hotel_info, query):
         
-        print(hotel_info.head())
+        self.log(hotel_info.head())
         
         hotel_info = hotel_info.drop(columns=["hotelname_en"])
 
@@ -162,7 +162,7 @@ class LLMDrivenAgent(NesyAgent):
         self.llm_inference_time_count += time.time() - time_before
         self.llm_rec_count += 1
 
-        print(answer)
+        self.log(answer)
         match = re.search(r'HotelNameList:\s*\[(.*?)\]', answer, re.DOTALL)
         
         ranking_idx = []
@@ -170,12 +170,12 @@ class LLMDrivenAgent(NesyAgent):
         try:
             HotelNameList = re.findall(r'"([^"]+)"', match.group(1))
     
-            print('selected HotelNameList: ',HotelNameList) 
+            self.log('selected HotelNameList: ',HotelNameList) 
             for cand_i in HotelNameList:
                 selected_index = np.where(hotel_info['name']==cand_i)[0][0]
                 ranking_idx.append(selected_index)
         except:
-            print("!!!Error in eval HotelNameList")
+            self.log("!!!Error in eval HotelNameList")
             self.llm_rec_format_error += 1
             
             cost_list = hotel_info["price"].tolist()
@@ -221,12 +221,17 @@ class LLMDrivenAgent(NesyAgent):
         if poi_type is not None and poi_type in candidates_type:
             return poi_type, candidates_type
         else:
-            print("The selected POI type is not in the candidate POI type list.")
+            self.log("The selected POI type is not in the candidate POI type list.")
             return candidates_type[0], candidates_type
         
         
     
-    def ranking_attractions(self, plan, poi_plan, current_day, current_time, current_position, intercity_with_hotel_cost):
+    def _prepare_parallel_search(self, branch):
+        # 景点、餐馆的 LLM 推荐在整次搜索中只请求一次，并行搜索前先在 self 上算好，各分支直接沿用
+        self._suggest_attractions(branch["intercity_with_hotel_cost"])
+        self._suggest_restaurants(branch["intercity_with_hotel_cost"])
+
+    def _suggest_attractions(self, intercity_with_hotel_cost):
         
         if self.ranking_attractions_flag:
             pass
@@ -249,12 +254,16 @@ class LLMDrivenAgent(NesyAgent):
                 try:
                     attraction_list = eval(match.group(1))
                 except:
-                    print("!!!Error in eval attraction_list")
-            print('selected attractions: ',attraction_list)    
+                    self.log("!!!Error in eval attraction_list")
+            self.log('selected attractions: ',attraction_list)    
             self.suggested_attractions_from_query = attraction_list  
             self.ranking_attractions_flag = True
 
-        attraction_list = self.suggested_attractions_from_query
+        return self.suggested_attractions_from_query
+
+    def ranking_attractions(self, plan, poi_plan, current_day, current_time, current_position, intercity_with_hotel_cost):
+
+        attraction_list = self._suggest_attractions(intercity_with_hotel_cost)
         num_attractions = len(self.memory["attractions"])
         attr_info = self.memory["attractions"]
 
@@ -284,7 +293,7 @@ class LLMDrivenAgent(NesyAgent):
         
         return ranking_idx
     
-    def ranking_restaurants(self, plan, poi_plan, current_day, current_time, current_position, intercity_with_hotel_cost):
+    def _suggest_restaurants(self, intercity_with_hotel_cost):
         
         if self.ranking_restaurants_flag:
             pass
@@ -299,19 +308,23 @@ class LLMDrivenAgent(NesyAgent):
             
             self.llm_inference_time_count += time.time() - time_before
 
-            print(answer)
+            self.log(answer)
             restaurant_list=[]
             match = re.search(r'RestaurantNameList:\s*(\[[^\]]+\])', answer)
             if match:
                 try:
                     restaurant_list = eval(match.group(1))
                 except:
-                    print("!!!Error in eval restaurant_list")
-            print('selected restaurants: ',restaurant_list)  
+                    self.log("!!!Error in eval restaurant_list")
+            self.log('selected restaurants: ',restaurant_list)  
             self.suggested_restaurants_from_query = restaurant_list  
             self.ranking_restaurants_flag = True
+
+        return self.suggested_restaurants_from_query
+
+    def ranking_restaurants(self, plan, poi_plan, current_day, current_time, current_position, intercity_with_hotel_cost):
         
-        restaurant_list = self.suggested_restaurants_from_query
+        restaurant_list = self._suggest_restaurants(intercity_with_hotel_cost)
         num_restaurants = len(self.memory["restaurants"])
         res_info = self.memory["restaurants"]
 
@@ -391,14 +404,14 @@ class LLMDrivenAgent(NesyAgent):
             if num_beds < 1:
                 num_beds = None
         else:
-            print("!!!Error in matching RoomInfo")
+            self.log("!!!Error in matching RoomInfo")
             num_rooms, num_beds = None, None
 
             self.llm_rec_format_error += 1
         
         
         # print(answer)
-        print("extracted room_number: ", num_rooms, "room_type:", num_beds)
+        self.log("extracted room_number: ", num_rooms, "room_type:", num_beds)
         return num_rooms, num_beds
     def extract_budget(self, query):
 
@@ -421,14 +434,14 @@ class LLMDrivenAgent(NesyAgent):
             if budget < 1:
                 budget = None
         else:
-            print("!!!Error in extracting budget")
+            self.log("!!!Error in extracting budget")
             budget = None
 
             self.llm_rec_format_error += 1
         
         
         # print(answer)
-        print("extracted budget: ", budget)
+        self.log("extracted budget: ", budget)
         # exit(0)
         return budget
     
@@ -439,7 +452,7 @@ class LLMDrivenAgent(NesyAgent):
         query_message=[{"role": "user", "content": INNERCITY_TRANSPORTS_SELECTION_INSTRUCTION.format(user_requirements=query['nature_language'])}]
         answer=self.backbone_llm(query_message,one_line=False)
 
-        print(answer)
+        self.log(answer)
 
         self.llm_inference_time_count += time.time() - time_before
 
@@ -450,11 +463,11 @@ class LLMDrivenAgent(NesyAgent):
             try:
                 TransportRanking = re.findall(r'"([^"]+)"', match.group(1))
             except:
-                print("!!!Error in eval TransportRanking")
+                self.log("!!!Error in eval TransportRanking")
                 self.llm_rec_format_error += 1
                 TransportRanking = []
 
-            print('selected TransportRanking: ',TransportRanking) 
+            self.log('selected TransportRanking: ',TransportRanking) 
             rank_ = []
             for item in TransportRanking:
                 if item in ["metro", "taxi", "walk"]:
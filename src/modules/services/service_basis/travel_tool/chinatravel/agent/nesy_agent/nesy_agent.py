@@ -1,6 +1,12 @@
 import sys
 import os
 import time
+import copy
+import logging
+import itertools
+import threading
+import multiprocessing
+import multiprocessing.forkserver
 import argparse
 import pandas as pd
 import json
@@ -21,11 +27,12 @@ from agent.nesy_agent.utils import (
     calc_cost_from_itinerary_wo_intercity,
     add_time_delta,
     TimeOutError,
+    SearchCancelled,
 )
 
 # from chinatravel.eval.utils import load_json_file, validate_json, save_json_file
 from chinatravel.data.load_datasets import load_json_file, save_json_file
-from chinatravel.agent.utils import Logger
+from chinatravel.agent.utils import request_log, request_logger
 from chinatravel.symbol_verification.commonsense_constraint import (
     func_commonsense_constraints,
 )
@@ -38,10 +45,94 @@ from chinatravel.symbol_verification.preference import evaluate_preference_py
 
 from chinatravel.symbol_verification.concept_func import *
 from chinatravel.agent.nesy_agent.nl2sl_hybrid import nl2sl_reflect
+from chinatravel.agent.nesy_agent.search_state import PlanSearchState
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+# 并行搜索子进程中的 agent 与共享的取消序号，由 _init_search_worker 设置
+_worker_agent = None
+_worker_cancel_after = None
+
+
+class _BranchCancelFlag:
+    """
+    跨进程的分支取消标记：序号大于共享的 cancel_after 的分支被取消，接口与 threading.Event.is_set 相同
+    """
+
+    def __init__(self, index, cancel_after):
+        self.index = index
+        self.cancel_after = cancel_after
+
+    def is_set(self):
+        return self.index > self.cancel_after.value
+
+
+def _init_search_worker(agent, cancel_after):
+    global _worker_agent, _worker_cancel_after
+    agent._init_search_worker()
+    _worker_agent, _worker_cancel_after = agent, cancel_after
+
+
+_forkserver_lock = threading.Lock()
+
+
+def _search_context(modules):
+    """
+    返回并行搜索使用的 forkserver 上下文，首次调用时启动 forkserver 并预先导入 modules，
+    之后创建的子进程直接从 forkserver fork，不再重复导入 pandas 等依赖。
+
+    3.11 的 forkserver 不会应用父进程的 sys.path（预导入的 ImportError 被忽略），
+    而 chinatravel 依赖运行时追加的 sys.path，因此启动 forkserver 时通过 PYTHONPATH 传递
+    """
+    context = multiprocessing.get_context("forkserver")
+    with _forkserver_lock:
+        context.set_forkserver_preload(list(modules))
+        python_path = os.environ.get("PYTHONPATH")
+        os.environ["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+        try:
+            multiprocessing.forkserver.ensure_running()
+        finally:
+            if python_path is None:
+                del os.environ["PYTHONPATH"]
+            else:
+                os.environ["PYTHONPATH"] = python_path
+    return context
+
+
+def _kill_search_workers(pool):
+    # ProcessPoolExecutor 没有公开的终止接口（3.14 起才有 terminate_workers），只在子进程卡住时使用；
+    # 进程退出后 shutdown(wait=True) 会把其余 future 标记为失败并正常返回
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+
+
+def _search_branch_in_worker(index, branch):
+    agent = _worker_agent._branch_agent(_BranchCancelFlag(index, _worker_cancel_after))
+    status, plan = agent._search_branch(agent.query, branch)
+    return status, plan, agent._branch_stats()
 
 
 class NesyAgent(BaseAgent):
+    # 并行搜索时每个分支独立累计、结束后合并回来的计数器
+    BRANCH_COUNTERS = (
+        "llm_rec_format_error",
+        "llm_rec_count",
+        "search_nodes",
+        "backtrack_count",
+        "constraints_validation_count",
+        "commonsense_pass_count",
+        "logical_pass_count",
+        "all_constraints_pass",
+    )
+    # 并行搜索时由 _parallel_search 设置，dfs_poi 在其被 set 后放弃当前分支
+    search_cancelled = None
+    # 并行搜索时，父进程在 TIME_CUT 之后最多再等待子进程这么多秒（如 LLM 请求未返回）
+    PARALLEL_SEARCH_GRACE = 10
+    # 搜索过程的输出；run 中替换为本次请求的 logger（见 request_logger）
+    logger = logging.getLogger(__name__)
+    log_files = None
+
     # def __init__(
     #     self,
     #     env,
@@ -72,7 +163,7 @@ class NesyAgent(BaseAgent):
         self.least_plan_schema, self.least_plan_comm = None, None
         self.method = kwargs["method"]
 
-        print("cache dir:", self.cache_dir)
+        self.log("cache dir:", self.cache_dir)
         if not os.path.exists(
             os.path.join(self.cache_dir, self.method + "_" + self.backbone_llm.name)
         ):
@@ -80,6 +171,9 @@ class NesyAgent(BaseAgent):
                 os.path.join(self.cache_dir, self.method + "_" + self.backbone_llm.name)
             )
         self.search_width = kwargs.get("search_width", None)
+        # 顶层分支（去程 × 返程 × 酒店）的并行搜索进程数，None 表示顺序搜索
+        self.parallel_search_workers = kwargs.get("parallel_search_workers", None)
+        self.parallel_search_ordered = kwargs.get("parallel_search_ordered", True)
 
         self.preference_search = False
         self.prompt_upd = True
@@ -87,17 +181,65 @@ class NesyAgent(BaseAgent):
     def reset(self):
         pass
 
+    def log(self, *args):
+        """
+        写入本次请求的日志，参数的拼接方式与 print 相同
+        """
+        self.logger.info(" ".join(str(arg) for arg in args))
+
+    def for_request(self):
+        """
+        为一次 run 创建独立的 agent（每次请求的上下文）：共享 LLM 客户端、配置以及
+        TravelDataStore 中的只读数据表；memory、query、访问列表、计数器、least_plan_*、
+        env 的查询历史和 LLM 的 token 计数都在新对象上，同一个原型 agent 可以被并发的请求同时使用
+        """
+        agent = copy.copy(self)
+        agent.env = self.env.for_request()
+        agent.backbone_llm = self.backbone_llm.for_request()
+        agent.memory = {}
+        agent.query = None
+        agent.search_cancelled = None
+        agent._reset_search_state()
+        return agent
+
+    def _reset_search_state(self):
+        self.time_before_search = time.time()
+        self.llm_inference_time_count = 0
+
+        # reset the cache before searching
+        self.restaurants_visiting = []
+        self.attractions_visiting = []
+        self.food_type_visiting = []
+        self.spot_type_visiting = []
+        self.attraction_names_visiting = []
+        self.restaurant_names_visiting = []
+        self.plan_state = PlanSearchState()
+        self.ranking_attractions_flag = False
+        self.ranking_restaurants_flag = False
+
+        self.llm_rec_format_error = 0
+        self.llm_rec_count = 0
+        self.search_nodes = 0
+        self.backtrack_count = 0
+
+        self.constraints_validation_count = 0
+        self.commonsense_pass_count = 0
+        self.logical_pass_count = 0
+        self.all_constraints_pass = 0
+
+        self.least_plan_schema, self.least_plan_comm, self.least_plan_logic = None, None, None
+        self.least_plan_logical_pass = -1
+
     def translate_nl2sl(self, query, load_cache=False):
 
         llm_method = "translation_{}_reflect".format(self.backbone_llm.name)
-        if not os.path.exists(os.path.join(self.cache_dir, llm_method)):
-            os.makedirs(os.path.join(self.cache_dir, llm_method))
+        os.makedirs(os.path.join(self.cache_dir, llm_method), exist_ok=True)
 
         file_path = os.path.join(
             self.cache_dir, llm_method, "{}.json".format(query["uid"])
         )
 
-        print(file_path)
+        self.log(file_path)
 
         if load_cache and os.path.exists(file_path):
             query = load_json_file(file_path)
@@ -119,79 +261,68 @@ class NesyAgent(BaseAgent):
         if preference_search:
             method_name = method_name + "_preferencesearch"
         self.log_dir = os.path.join(self.cache_dir, method_name)
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
-
-        sys.stdout = Logger(
-            "{}/{}.log".format(
-                self.log_dir, query["uid"]
-            ),
-            sys.stdout,
-            self.debug,
-        )
-        sys.stderr = Logger(
-            "{}/{}.error".format(
-                self.log_dir, query["uid"]
-            ),
-            sys.stderr,
-            self.debug,
-        )
+        os.makedirs(self.log_dir, exist_ok=True)
 
-
-        self.backbone_llm.input_token_count = 0
-        self.backbone_llm.output_token_count = 0
-        self.backbone_llm.input_token_maxx = 0
+        # 搜索过程的输出写入本次请求的 logger，不替换全局的 sys.stdout / sys.stderr，并发的请求互不影响
+        self.log_files = (
+            "{}/{}.log".format(self.log_dir, query["uid"]),
+            "{}/{}.error".format(self.log_dir, query["uid"]),
+        )
+        with request_log(query["uid"], *self.log_files, self.debug) as self.logger:
+            self.backbone_llm.input_token_count = 0
+            self.backbone_llm.output_token_count = 0
+            self.backbone_llm.input_token_maxx = 0
 
 
-        # natural language -> symoblic language -> plan
+            # natural language -> symoblic language -> plan
 
-        if not oralce_translation:
-            query = self.translate_nl2sl(query, load_cache=load_cache)
+            if not oralce_translation:
+                query = self.translate_nl2sl(query, load_cache=load_cache)
 
 
-        succ, plan = self.symbolic_search(query)
+            succ, plan = self.symbolic_search(query)
 
-        print(succ, plan)
+            self.log(succ, plan)
 
-        if succ:
-            plan_out = plan
-        else:
-            if self.least_plan_logic is not None:
-                plan_out = self.least_plan_logic
+            if succ:
+                plan_out = plan
+            else:
+                if self.least_plan_logic is not None:
+                    plan_out = self.least_plan_logic
 
-                if preference_search:
-                    plan_out["preference_value"] = self.least_plan_logic_pvalue
+                    if preference_search:
+                        plan_out["preference_value"] = self.least_plan_logic_pvalue
 
-                print("The least plan with logic constraints: ", plan_out)
-                succ = True
+                    self.log("The least plan with logic constraints: ", plan_out)
+                    succ = True
 
-            elif self.least_plan_comm is not None:
-                plan_out = self.least_plan_comm
-            elif self.least_plan_schema is not None:
-                plan_out = self.least_plan_schema
-            else:
-                plan_out = {}
+                elif self.least_plan_comm is not None:
+                    plan_out = self.least_plan_comm
+                elif self.least_plan_schema is not None:
+                    plan_out = self.least_plan_schema
+                else:
+                    plan_out = {}
 
-            plan_out["search_time_sec"] = time.time() - self.time_before_search
-            plan_out["llm_inference_time_sec"] = self.llm_inference_time_count
-            if plan_out["search_time_sec"] > self.TIME_CUT:
-                plan_out["time_out_flag"] = True
+                plan_out["search_time_sec"] = time.time() - self.time_before_search
+                plan_out["llm_inference_time_sec"] = self.llm_inference_time_count
+                if plan_out["search_time_sec"] > self.TIME_CUT:
+                    plan_out["time_out_flag"] = True
 
 
-        plan_out["input_token_count"] = self.backbone_llm.input_token_count
-        plan_out["output_token_count"] = self.backbone_llm.output_token_count
-        plan_out["input_token_maxx"] = self.backbone_llm.input_token_maxx
+            plan_out["input_token_count"] = self.backbone_llm.input_token_count
+            plan_out["output_token_count"] = self.backbone_llm.output_token_count
+            plan_out["input_token_maxx"] = self.backbone_llm.input_token_maxx
 
-        plan_out["llm_rec_count"] = self.llm_rec_count
-        plan_out["llm_rec_format_error_count"] = self.llm_rec_format_error
+            plan_out["llm_rec_count"] = self.llm_rec_count
+            plan_out["llm_rec_format_error_count"] = self.llm_rec_format_error
 
-        plan_out["search_nodes"] = self.search_nodes
-        plan_out["backtrack_count"] = self.backtrack_count
-        plan_out["constraints_validation_count"] = self.constraints_validation_count
-        plan_out["commonsense_pass_count"] = self.commonsense_pass_count
-        plan_out["logical_pass_count"] = self.logical_pass_count
-        plan_out["all_constraints_pass"] = self.all_constraints_pass
-        return succ, plan_out
+            plan_out["search_nodes"] = self.search_nodes
+            plan_out["backtrack_count"] = self.backtrack_count
+            plan_out["constraints_validation_count"] = self.constraints_validation_count
+            plan_out["commonsense_pass_count"] = self.commonsense_pass_count
+            plan_out["logical_pass_count"] = self.logical_pass_count
+            plan_out["all_constraints_pass"] = self.all_constraints_pass
+            return succ, plan_out
 
     def constraints_validation(self, query, plan, poi_plan):
 
@@ -203,8 +334,8 @@ class NesyAgent(BaseAgent):
             "target_city": query["target_city"],
             "itinerary": plan,
         }
-        print("validate the plan [for query {}]: ".format(query["uid"]))
-        print(res_plan)
+        self.log("validate the plan [for query {}]: ".format(query["uid"]))
+        self.log(res_plan)
 
         self.least_plan_schema = deepcopy(res_plan)
 
@@ -222,21 +353,21 @@ class NesyAgent(BaseAgent):
         except:
             extracted_vars = None
 
-        print(extracted_vars)
+        self.log(extracted_vars)
 
         logical_result = evaluate_constraints_py(query["hard_logic_py"], res_plan, verbose=True)
 
-        print(logical_result)
+        self.log(logical_result)
 
         logical_pass = True
         for idx, item in enumerate(logical_result):
             logical_pass = logical_pass and item
 
             if item:
-                print(query["hard_logic_py"][idx], "passed!")
+                self.log(query["hard_logic_py"][idx], "passed!")
             else:
 
-                print(query["hard_logic_py"][idx], "failed...")
+                self.log(query["hard_logic_py"][idx], "failed...")
         if bool_result and np.sum(logical_result) > self.least_plan_logical_pass:
             self.least_plan_comm = deepcopy(res_plan)
             self.least_plan_logical_pass = np.sum(logical_result)
@@ -249,7 +380,7 @@ class NesyAgent(BaseAgent):
         bool_result = bool_result and logical_pass
 
         if bool_result:
-            print("\n Pass! \n")
+            self.log("\n Pass! \n")
             self.all_constraints_pass += 1
 
             if self.least_plan_logic is None:
@@ -261,33 +392,33 @@ class NesyAgent(BaseAgent):
                     if self.query["preference_opt"] == "maximize":
                         
                         res = evaluate_preference_py([(self.query["preference_opt"], self.query["preference_concept"], self.query["preference_code"])], res_plan)[0]
-                        print(self.query["preference_concept"], res)
+                        self.log(self.query["preference_concept"], res)
 
                         # print(res, self.least_plan_logic_pvalue)
                         if res != -1 and res > self.least_plan_logic_pvalue:
-                            print("preference value [{}]: {} -> {} \n update plan".format(self.query["preference_concept"], self.least_plan_logic_pvalue, res))
+                            self.log("preference value [{}]: {} -> {} \n update plan".format(self.query["preference_concept"], self.least_plan_logic_pvalue, res))
                             self.least_plan_logic_pvalue = res
                             self.least_plan_logic = deepcopy(res_plan)
 
 
                     elif self.query["preference_opt"] == "minimize":
                         res = evaluate_preference_py([(self.query["preference_opt"], self.query["preference_concept"], self.query["preference_code"])] , res_plan)[0]
-                        print(self.query["preference_concept"], res)
+                        self.log(self.query["preference_concept"], res)
 
                         # print(res, self.least_plan_logic_pvalue)
                         if res != -1 and res < self.least_plan_logic_pvalue:
-                            print("preference value [{}]: {} -> {} \n update plan".format(self.query["preference_concept"], self.least_plan_logic_pvalue, res))
+                            self.log("preference value [{}]: {} -> {} \n update plan".format(self.query["preference_concept"], self.least_plan_logic_pvalue, res))
                             self.least_plan_logic_pvalue = res
                             self.least_plan_logic = deepcopy(res_plan)
 
                     else:
                         raise ValueError("Invalid preference_opt")
-                    print(self.least_plan_logic)
+                    self.log(self.least_plan_logic)
                 except Exception as e:
-                    print(e)
-                    print(self.query["preference_code"])
+                    self.log(e)
+                    self.log(self.query["preference_code"])
         else:
-            print("\n Failed \n")
+            self.log("\n Failed \n")
 
         # plan = res_plan
 
@@ -484,7 +615,7 @@ class NesyAgent(BaseAgent):
     ):
 
         if current_time != "" and time_compare_if_earlier_equal("23:00", current_time):
-            print("too late, after 23:00")
+            self.log("too late, after 23:00")
             return True
 
         if current_time != "" and current_day == query["days"] - 1:
@@ -506,7 +637,7 @@ class NesyAgent(BaseAgent):
                     )
                     if not isinstance(transports_sel, list):
                         self.backtrack_count += 1
-                        print("inner-city transport error, backtrack...")
+                        self.log("inner-city transport error, backtrack...")
                         continue
 
                     if len(transports_sel) > 0:
@@ -519,7 +650,7 @@ class NesyAgent(BaseAgent):
                     ):
                         flag = False
                 if flag:
-                    print(
+                    self.log(
                         "Can not go back source-city in time, current POI {}, station arrived time: {}".format(
                             current_position, arrived_time
                         )
@@ -544,7 +675,7 @@ class NesyAgent(BaseAgent):
                         )
                         if not isinstance(transports_sel, list):
                             self.backtrack_count += 1
-                            print("inner-city transport error, backtrack...")
+                            self.log("inner-city transport error, backtrack...")
                             continue
 
                         flag = True
@@ -558,7 +689,7 @@ class NesyAgent(BaseAgent):
                         if not time_compare_if_earlier_equal("24:00", arrived_time):
                             flag = False
                     if flag:
-                        print(
+                        self.log(
                             "Can not go back to hotel, current POI {}, hotel arrived time: {}".format(
                                 current_position, arrived_time
                             )
@@ -787,7 +918,7 @@ class NesyAgent(BaseAgent):
                 )
                 if not isinstance(transports_sel, list):
                     self.backtrack_count += 1
-                    print("inner-city transport error, backtrack...")
+                    self.log("inner-city transport error, backtrack...")
                     continue
 
                 if len(transports_sel) == 0:
@@ -873,7 +1004,7 @@ class NesyAgent(BaseAgent):
                 )
                 if not isinstance(transports_sel, list):
                     self.backtrack_count += 1
-                    print("inner-city transport error, backtrack...")
+                    self.log("inner-city transport error, backtrack...")
                     continue
 
                 if len(transports_sel) == 0:
@@ -928,30 +1059,22 @@ class NesyAgent(BaseAgent):
 
             raise TimeOutError
 
+        if self.search_cancelled is not None and self.search_cancelled.is_set():
+            raise SearchCancelled
+
+        # budget is checked on the running total before the (expensive) too-late check
+        if self.plan_state.exceeds_budget():
+            self.backtrack_count += 1
+            self.log("budget exceeded, backtrack...")
+            return False, plan
+
         if self.check_if_too_late(
             query, current_day, current_time, current_position, poi_plan
         ):
             self.backtrack_count += 1
-            print("The current time is too late to go hotel or back-transport, backtrack...")
+            self.log("The current time is too late to go hotel or back-transport, backtrack...")
             return False, plan
 
-        if self.required_budget != None:
-            total_cost = 0
-            for day_activities in plan:
-                for activity in day_activities["activities"]:
-                    if activity["type"] in [
-                        "breakfast",
-                        "lunch",
-                        "dinner",
-                        "attraction",
-                    ]:
-                        total_cost += activity["cost"]
-
-            if total_cost + self.intercity_with_hotel_cost > self.required_budget:
-                self.backtrack_count += 1
-                print("budget exceeded, backtrack...")
-                return False, plan
-
         # intercity_transport - go
         if current_day == 0 and current_time == "":
             plan = [{"day": current_day + 1, "activities": []}]
@@ -961,6 +1084,7 @@ class NesyAgent(BaseAgent):
                 innercity_transports=[],
                 tickets=self.query["people_number"],
             )
+            self.plan_state.push(current_day, plan[current_day]["activities"][-1])
             new_time = poi_plan["go_transport"]["EndTime"]
             new_position = poi_plan["go_transport"]["To"]
             success, plan = self.dfs_poi(
@@ -969,8 +1093,9 @@ class NesyAgent(BaseAgent):
             if success:
                 return True, plan
             else:
+                self.plan_state.pop()
                 self.backtrack_count += 1
-                print("No solution for the given Go Transport, backtrack...")
+                self.log("No solution for the given Go Transport, backtrack...")
                 return False, plan
 
         # breakfast
@@ -983,6 +1108,7 @@ class NesyAgent(BaseAgent):
             plan = self.select_and_add_breakfast(
                 plan, poi_plan, current_day, current_time, current_position
             )
+            self.plan_state.push(current_day, plan[current_day]["activities"][-1])
 
             new_time = plan[current_day]["activities"][-1]["end_time"]
             new_position = current_position
@@ -993,6 +1119,7 @@ class NesyAgent(BaseAgent):
                 return True, plan
             
             plan[current_day]["activities"].pop()
+            self.plan_state.pop()
 
             candidates_type = []
             if current_day == query["days"] - 1 and current_time != "":
@@ -1000,18 +1127,13 @@ class NesyAgent(BaseAgent):
             else:
 
                 self.backtrack_count += 1
-                print("No solution for the given Breakfast, backtrack...")
+                self.log("No solution for the given Breakfast, backtrack...")
 
                 return False, plan
 
         else:
-            haved_lunch_today, haved_dinner_today = False, False
-
-            for act_i in plan[current_day]["activities"]:
-                if act_i["type"] == "lunch":
-                    haved_lunch_today = True
-                if act_i["type"] == "dinner":
-                    haved_dinner_today = True
+            haved_lunch_today = self.plan_state.count(current_day, "lunch") > 0
+            haved_dinner_today = self.plan_state.count(current_day, "dinner") > 0
 
             candidates_type = ["attraction"]
             if not haved_lunch_today:
@@ -1023,7 +1145,7 @@ class NesyAgent(BaseAgent):
             if current_day == query["days"] - 1 and current_time != "":
                 candidates_type.append("back-intercity-transport")
 
-        print("candidates_type: ", candidates_type)
+        self.log("candidates_type: ", candidates_type)
 
         while len(candidates_type) > 0:
 
@@ -1036,7 +1158,7 @@ class NesyAgent(BaseAgent):
                 current_position,
             )
 
-            print(
+            self.log(
                 "POI planning, day {} {}, {}, next-poi type: {}".format(
                     current_day, current_time, current_position, poi_type
                 )
@@ -1060,7 +1182,7 @@ class NesyAgent(BaseAgent):
                     )
                     if not isinstance(transports_sel, list):
                         self.backtrack_count += 1
-                        print("inner-city transport error, backtrack...")
+                        self.log("inner-city transport error, backtrack...")
                         continue
 
                     plan[current_day]["activities"] = self.add_intercity_transport(
@@ -1069,6 +1191,7 @@ class NesyAgent(BaseAgent):
                         innercity_transports=transports_sel,
                         tickets=self.query["people_number"],
                     )
+                    self.plan_state.push(current_day, plan[current_day]["activities"][-1])
 
                     res_bool, res_plan = self.constraints_validation(
                         query, plan, poi_plan
@@ -1078,9 +1201,10 @@ class NesyAgent(BaseAgent):
                         return True, res_plan
                     else:
                         plan[current_day]["activities"].pop()
+                        self.plan_state.pop()
                         self.backtrack_count += 1
 
-                        print(
+                        self.log(
                             "Back-transport, but constraints_validation failed, backtrack..."
                         )
                         return False, plan
@@ -1106,7 +1230,7 @@ class NesyAgent(BaseAgent):
                         )
                         if not isinstance(transports_sel, list):
                             self.backtrack_count += 1
-                            print("inner-city transport error, backtrack...")
+                            self.log("inner-city transport error, backtrack...")
                             continue
 
                         if len(transports_sel) == 0:
@@ -1123,6 +1247,7 @@ class NesyAgent(BaseAgent):
                         required_rooms=self.required_rooms,
                         transports_sel=transports_sel,
                     )
+                    self.plan_state.push(current_day, plan[current_day]["activities"][-1])
 
                     new_time = "00:00"
                     new_position = hotel_sel["name"]
@@ -1135,9 +1260,10 @@ class NesyAgent(BaseAgent):
                         return True, plan
 
                     self.backtrack_count += 1
-                    print("Fail with the given accommodation activity, backtrack...")
+                    self.log("Fail with the given accommodation activity, backtrack...")
 
                     plan[current_day]["activities"].pop()
+                    self.plan_state.pop()
             elif poi_type in ["lunch", "dinner", "attraction"]:
 
                 if poi_type in ["lunch", "dinner"]:
@@ -1165,7 +1291,7 @@ class NesyAgent(BaseAgent):
                     for sea_i, r_i in enumerate(ranking_idx):
 
                         if self.search_width != None and sea_i >= self.search_width:
-                            print(
+                            self.log(
                                 "Out of search_width [{}], break".format(
                                     self.search_width
                                 )
@@ -1174,15 +1300,27 @@ class NesyAgent(BaseAgent):
 
                         res_idx = r_i
 
-                        if not (res_idx in self.restaurants_visiting):
+                        if not self.plan_state.is_restaurant_visited(index=res_idx):
 
                             if res_idx < 0 or res_idx >= len(
                                 self.memory["restaurants"]
                             ):
-                                print("index error: ", res_idx, len(self.memory["restaurants"]))
+                                self.log("index error: ", res_idx, len(self.memory["restaurants"]))
 
                             poi_sel = self.memory["restaurants"].iloc[res_idx]
 
+                            # monotone constraints: prune before querying inner-city transports
+                            if self.plan_state.is_restaurant_visited(name=poi_sel["name"]):
+                                self.backtrack_count += 1
+                                self.log("restaurant {} already visited, backtrack...".format(poi_sel["name"]))
+                                continue
+                            if self.plan_state.exceeds_budget(
+                                int(poi_sel["price"]) * self.query["people_number"]
+                            ):
+                                self.backtrack_count += 1
+                                self.log("budget exceeded, backtrack...")
+                                continue
+
                             # transports_ranking = self.ranking_innercity_transport(current_position, poi_sel["name"], current_day, current_time)
                             transports_ranking = (
                                 self.innercity_transports_ranking_from_query
@@ -1199,7 +1337,7 @@ class NesyAgent(BaseAgent):
                                 )
                                 if not isinstance(transports_sel, list):
                                     self.backtrack_count += 1
-                                    print("inner-city transport error, backtrack...")
+                                    self.log("inner-city transport error, backtrack...")
                                     continue
 
                                 if len(transports_sel) == 0:
@@ -1219,7 +1357,7 @@ class NesyAgent(BaseAgent):
                                     )
                                 except:
                                     self.backtrack_count += 1
-                                    print("add_restaurant failed, backtrack...")
+                                    self.log("add_restaurant failed, backtrack...")
                                     continue
 
                                 new_time = plan[current_day]["activities"][-1][
@@ -1228,6 +1366,9 @@ class NesyAgent(BaseAgent):
                                 new_position = poi_sel["name"]
                                 self.restaurants_visiting.append(res_idx)
                                 self.food_type_visiting.append(poi_sel["cuisine"])
+                                self.plan_state.push(
+                                    current_day, plan[current_day]["activities"][-1], res_idx
+                                )
                                 success, plan = self.dfs_poi(
                                     query,
                                     poi_plan,
@@ -1240,11 +1381,12 @@ class NesyAgent(BaseAgent):
                                     return True, plan
 
                                 self.backtrack_count += 1
-                                print("add_restaurant failed, backtrack...")
+                                self.log("add_restaurant failed, backtrack...")
 
                                 plan[current_day]["activities"].pop()
                                 self.restaurants_visiting.pop()
                                 self.food_type_visiting.pop()
+                                self.plan_state.pop()
 
                                 # print("res {} fail...".format(poi_sel["name"]))
 
@@ -1272,7 +1414,7 @@ class NesyAgent(BaseAgent):
                     for sea_i, r_i in enumerate(ranking_idx):
 
                         if self.search_width != None and sea_i >= self.search_width:
-                            print(
+                            self.log(
                                 "Out of search_width [{}], break".format(
                                     self.search_width
                                 )
@@ -1280,14 +1422,26 @@ class NesyAgent(BaseAgent):
                             break
                         self.search_nodes += 1
                         attr_idx = r_i
-                        if not (attr_idx in self.attractions_visiting):
+                        if not self.plan_state.is_attraction_visited(index=attr_idx):
 
                             if attr_idx < 0 or attr_idx >= len(
                                 self.memory["attractions"]
                             ):
-                                print(attr_idx, len(self.memory["attractions"]))
+                                self.log(attr_idx, len(self.memory["attractions"]))
 
                             poi_sel = self.memory["attractions"].iloc[attr_idx]
+
+                            # monotone constraints: prune before querying inner-city transports
+                            if self.plan_state.is_attraction_visited(name=poi_sel["name"]):
+                                self.backtrack_count += 1
+                                self.log("attraction {} already visited, backtrack...".format(poi_sel["name"]))
+                                continue
+                            if self.plan_state.exceeds_budget(
+                                int(poi_sel["price"]) * self.query["people_number"]
+                            ):
+                                self.backtrack_count += 1
+                                self.log("budget exceeded, backtrack...")
+                                continue
                             # print(current_position, poi_sel["name"])
 
                             # transports_ranking = self.ranking_innercity_transport(current_position, poi_sel["name"], current_day, current_time)
@@ -1305,7 +1459,7 @@ class NesyAgent(BaseAgent):
                                 )
                                 if not isinstance(transports_sel, list):
                                     self.backtrack_count += 1
-                                    print("inner-city transport error, backtrack...")
+                                    self.log("inner-city transport error, backtrack...")
                                     continue
                                 if len(transports_sel) == 0:
                                     arrived_time = current_time
@@ -1319,13 +1473,13 @@ class NesyAgent(BaseAgent):
                                 # too late
                                 if time_compare_if_earlier_equal("21:00", arrived_time):
                                     self.backtrack_count += 1
-                                    print("The current time is too late...")
+                                    self.log("The current time is too late...")
                                     continue
 
                                 # it is closed ...
                                 if time_compare_if_earlier_equal(endtime, arrived_time):
                                     self.backtrack_count += 1
-                                    print("The attraction is closed now...")
+                                    self.log("The attraction is closed now...")
                                     continue
 
                                 if time_compare_if_earlier_equal(
@@ -1370,6 +1524,9 @@ class NesyAgent(BaseAgent):
                                 self.attractions_visiting.append(attr_idx)
                                 self.spot_type_visiting.append(poi_sel["type"])
                                 self.attraction_names_visiting.append(poi_sel["name"])
+                                self.plan_state.push(
+                                    current_day, plan[current_day]["activities"][-1], attr_idx
+                                )
 
                                 success, plan = self.dfs_poi(
                                     query,
@@ -1384,12 +1541,13 @@ class NesyAgent(BaseAgent):
                                     return True, plan
 
                                 self.backtrack_count += 1
-                                print("add_attraction failed, backtrack...")
+                                self.log("add_attraction failed, backtrack...")
 
                                 plan[current_day]["activities"].pop()
                                 self.attractions_visiting.pop()
                                 self.spot_type_visiting.pop()
                                 self.attraction_names_visiting.pop()
+                                self.plan_state.pop()
 
                 # The last event in a day: hotel or go-back
 
@@ -1413,7 +1571,7 @@ class NesyAgent(BaseAgent):
                         )
                         if not isinstance(transports_sel, list):
                             self.backtrack_count += 1
-                            print("inner-city transport error, backtrack...")
+                            self.log("inner-city transport error, backtrack...")
                             continue
 
                         plan[current_day]["activities"] = self.add_intercity_transport(
@@ -1422,6 +1580,7 @@ class NesyAgent(BaseAgent):
                             innercity_transports=transports_sel,
                             tickets=self.query["people_number"],
                         )
+                        self.plan_state.push(current_day, plan[current_day]["activities"][-1])
 
                         res_bool, res_plan = self.constraints_validation(
                             query, plan, poi_plan
@@ -1431,10 +1590,11 @@ class NesyAgent(BaseAgent):
                             return True, res_plan
                         else:
                             plan[current_day]["activities"].pop()
+                            self.plan_state.pop()
                             
                             self.backtrack_count += 1
 
-                            print(
+                            self.log(
                                 "Back-transport, but constraints_validation failed, backtrack..."
                             )
                             # return False, plan
@@ -1456,7 +1616,7 @@ class NesyAgent(BaseAgent):
                         )
                         if not isinstance(transports_sel, list):
                             self.backtrack_count += 1
-                            print("inner-city transport error, backtrack...")
+                            self.log("inner-city transport error, backtrack...")
                             continue
 
                         if len(transports_sel) == 0:
@@ -1473,6 +1633,7 @@ class NesyAgent(BaseAgent):
                             required_rooms=self.required_rooms,
                             transports_sel=transports_sel,
                         )
+                        self.plan_state.push(current_day, plan[current_day]["activities"][-1])
 
                         new_time = "00:00"
                         new_position = hotel_sel["name"]
@@ -1490,18 +1651,19 @@ class NesyAgent(BaseAgent):
                             return True, plan
                         else:
                             self.backtrack_count += 1
-                            print("Try the go back hotel, failed, backtrack...")
+                            self.log("Try the go back hotel, failed, backtrack...")
 
                             plan[current_day]["activities"].pop()
+                            self.plan_state.pop()
 
                             # return False, plan
             else:
                 # raise Exception("Not Implemented.")
-                print("incorrect poi type: {}".format(poi_type))
+                self.log("incorrect poi type: {}".format(poi_type))
                 continue
 
             candidates_type.remove(poi_type)
-            print("try another poi type, backtrack...")
+            self.log("try another poi type, backtrack...")
 
         return False, plan
 
@@ -1515,7 +1677,7 @@ class NesyAgent(BaseAgent):
         source_city = query["start_city"]
         target_city = query["target_city"]
 
-        print(source_city, "->", target_city)
+        self.log(source_city, "->", target_city)
 
         train_go = self.collect_intercity_transport(source_city, target_city, "train")
         train_back = self.collect_intercity_transport(target_city, source_city, "train")
@@ -1541,46 +1703,21 @@ class NesyAgent(BaseAgent):
         back_info = pd.concat([train_back, flight_back], axis=0)
 
         if self.debug:
-            print(
+            self.log(
                 "from {} to {}: {} flights, {} trains".format(
                     source_city, target_city, flight_go_num, train_go_num
                 )
             )
-            print(
+            self.log(
                 "from {} to {}: {} flights, {} trains".format(
                     target_city, source_city, flight_back_num, train_back_num
                 )
             )
 
-            print(go_info.head())
-            print(back_info.head())
-
-        self.time_before_search = time.time()
-        self.llm_inference_time_count = 0
-
-        # reset the cache before searching
-        poi_plan = {}
-        self.restaurants_visiting = []
-        self.attractions_visiting = []
-        self.food_type_visiting = []
-        self.spot_type_visiting = []
-        self.attraction_names_visiting = []
-        self.restaurant_names_visiting = []
-        self.ranking_attractions_flag = False
-        self.ranking_restaurants_flag = False
-
-        self.llm_rec_format_error = 0
-        self.llm_rec_count = 0
-        self.search_nodes = 0
-        self.backtrack_count = 0
-
-        self.constraints_validation_count = 0 
-        self.commonsense_pass_count = 0
-        self.logical_pass_count = 0
-        self.all_constraints_pass = 0
+            self.log(go_info.head())
+            self.log(back_info.head())
 
-        self.least_plan_schema, self.least_plan_comm, self.least_plan_logic = None, None, None
-        self.least_plan_logical_pass = -1
+        self._reset_search_state()
 
         ranking_go = self.ranking_intercity_transport_go(go_info, query)
         ranking_go = self.reranking_intercity_transport_go_with_constraints(
@@ -1597,6 +1734,28 @@ class NesyAgent(BaseAgent):
 
         self.innercity_transports_ranking_from_query = self.ranking_innercity_transport_from_query(query)
 
+        branches = self._iter_search_branches(
+            query, go_info, back_info, ranking_go, ranking_hotel, query_room_number, query_room_type
+        )
+        if self.parallel_search_workers and not self.preference_search:
+            return self._parallel_search(branches)
+
+        for branch in branches:
+            status, plan = self._search_branch(query, branch)
+            result = self._resolve_branch(status, plan)
+            if result is not None:
+                return result
+
+        return False, {"error_info": "No solution found."}
+
+    def _iter_search_branches(
+        self, query, go_info, back_info, ranking_go, ranking_hotel, query_room_number, query_room_type
+    ):
+        """
+        按顺序枚举 去程 × 返程 × 酒店 的顶层搜索分支，跳过不满足房型、时间和预算前提的组合
+        :return: 生成器，每项为 {"poi_plan", "intercity_with_hotel_cost", ["required_rooms"]}
+        """
+        poi_plan = {}
         for go_i in ranking_go:
             go_info_i = go_info.iloc[go_i]
             poi_plan["go_transport"] = go_info_i
@@ -1625,7 +1784,7 @@ class NesyAgent(BaseAgent):
 
                         if query_room_type != None and query_room_type != room_type:
                             self.backtrack_count += 1
-                            print("room_type not match, backtrack...")
+                            self.log("room_type not match, backtrack...")
                             continue
 
                         if query_room_number != None:
@@ -1645,11 +1804,10 @@ class NesyAgent(BaseAgent):
                                     pass
                                 else:
                                     self.backtrack_count += 1
-                                    print("room_number * room_type not match, backtrack...")
+                                    self.log("room_number * room_type not match, backtrack...")
                                 continue
-                        self.required_rooms = required_rooms
 
-                        self.intercity_with_hotel_cost = (
+                        intercity_with_hotel_cost = (
                             poi_plan["go_transport"]["Cost"]
                             + poi_plan["back_transport"]["Cost"]
                         ) * query["people_number"] + poi_plan["accommodation"][
@@ -1659,39 +1817,20 @@ class NesyAgent(BaseAgent):
                         )
                         if (
                             self.required_budget != None
-                            and self.required_budget - self.intercity_with_hotel_cost
+                            and self.required_budget - intercity_with_hotel_cost
                             <= self.query["people_number"]
                             * (self.query["days"] - 1)
                             * 100
                         ):
                             self.backtrack_count += 1
-                            print("required_budget - intercity_with_hotel_cost <= 100 * people_number * (days-1), backtrack...")
+                            self.log("required_budget - intercity_with_hotel_cost <= 100 * people_number * (days-1), backtrack...")
                             continue
 
-                        print("search: ...")
-                        try:
-                            success, plan = self.dfs_poi(
-                                query,
-                                poi_plan,
-                                plan=[],
-                                current_time="",
-                                current_position="",
-                            )
-                        except TimeOutError as e:
-                            print("TimeOutError")
-                            return False, {"error_info": "TimeOutError"}
-                        # exit(0)
-
-                        print(success, plan)
-                        if success:
-                            return True, plan
-                        else:
-                            if time.time() > self.time_before_search + self.TIME_CUT:
-                                print("Searching TIME OUT !!!")
-                                return False, {"error_info": "TimeOutError"}
-
-                            self.backtrack_count += 1
-                            print("search failed given the intercity-transport and hotels, backtrack...")
+                        yield {
+                            "poi_plan": dict(poi_plan),
+                            "intercity_with_hotel_cost": intercity_with_hotel_cost,
+                            "required_rooms": required_rooms,
+                        }
 
                 else:
                     if time_compare_if_earlier_equal(
@@ -1699,38 +1838,261 @@ class NesyAgent(BaseAgent):
                         poi_plan["go_transport"]["EndTime"],
                     ):
                         self.backtrack_count += 1
-                        print("back_transport BeginTime earlier than go_transport EndTime, backtrack...")
+                        self.log("back_transport BeginTime earlier than go_transport EndTime, backtrack...")
                         continue
 
-                    self.intercity_with_hotel_cost = (
-                        poi_plan["go_transport"]["Cost"]
-                        + poi_plan["back_transport"]["Cost"]
-                    ) * query["people_number"]
-                    print("search: ...")
-                    try:
-                        success, plan = self.dfs_poi(
-                            query,
-                            poi_plan,
-                            plan=[],
-                            current_time="",
-                            current_position="",
-                        )
-                    except TimeOutError as e:
-                        print("TimeOutError")
-                        return False, {"error_info": "TimeOutError"}
+                    yield {
+                        "poi_plan": dict(poi_plan),
+                        "intercity_with_hotel_cost": (
+                            poi_plan["go_transport"]["Cost"]
+                            + poi_plan["back_transport"]["Cost"]
+                        ) * query["people_number"],
+                    }
+
+    def _search_branch(self, query, branch):
+        """
+        在一个顶层分支（确定的城际交通与酒店）下搜索 POI
+        :return: (status, plan)，status 为 "success" / "failed" / "timeout" / "cancelled"
+        """
+        if "required_rooms" in branch:
+            self.required_rooms = branch["required_rooms"]
+        self.intercity_with_hotel_cost = branch["intercity_with_hotel_cost"]
+
+        self.log("search: ...")
+        self.plan_state = PlanSearchState(
+            self.intercity_with_hotel_cost, self.required_budget
+        )
+        try:
+            success, plan = self.dfs_poi(
+                query,
+                branch["poi_plan"],
+                plan=[],
+                current_time="",
+                current_position="",
+            )
+        except TimeOutError as e:
+            self.log("TimeOutError")
+            return "timeout", None
+        except SearchCancelled as e:
+            return "cancelled", None
+
+        self.log(success, plan)
+        return ("success" if success else "failed"), plan
+
+    def _resolve_branch(self, status, plan):
+        """
+        按顺序搜索时处理一个分支的结果
+        :return: 搜索结束时返回 (succ, plan)，否则返回 None 继续下一个分支
+        """
+        if status == "success":
+            return True, plan
+        if status == "timeout":
+            return False, {"error_info": "TimeOutError"}
+
+        if time.time() > self.time_before_search + self.TIME_CUT:
+            self.log("Searching TIME OUT !!!")
+            return False, {"error_info": "TimeOutError"}
+
+        self.backtrack_count += 1
+        self.log("search failed given the intercity-transport and hotels, backtrack...")
+        return None
+
+    def _prepare_parallel_search(self, branch):
+        """
+        并行搜索前在 self 上计算各分支共享、整次搜索只需计算一次的内容，子进程 fork 时继承
+        :param branch: 第一个顶层分支，即顺序搜索时最先搜索的分支
+        """
+        pass
 
-                    print(success, plan)
-                    if success:
+    def _branch_agent(self, cancel_flag):
+        """
+        为并行搜索的一个分支创建 agent 副本：共享 memory、query、LLM 推荐与截止时间，
+        独立维护 dfs_poi 中会修改的访问列表、计数器、least_plan_* 和 LLM token 计数
+        """
+        agent = copy.copy(self)
+        agent.search_cancelled = cancel_flag
+        agent.backbone_llm = self.backbone_llm.for_request()
+        agent.restaurants_visiting, agent.food_type_visiting = [], []
+        agent.attractions_visiting, agent.spot_type_visiting = [], []
+        agent.attraction_names_visiting, agent.restaurant_names_visiting = [], []
+        for name in self.BRANCH_COUNTERS:
+            setattr(agent, name, 0)
+        agent.llm_inference_time_count = 0
+        agent.least_plan_schema, agent.least_plan_comm, agent.least_plan_logic = None, None, None
+        agent.least_plan_logical_pass = -1
+        return agent
+
+    def _branch_stats(self):
+        """
+        分支 agent 搜索结束后需要合并回父进程的统计与 least_plan_*
+        """
+        stats = {name: getattr(self, name) for name in self.BRANCH_COUNTERS}
+        stats["llm_inference_time_count"] = self.llm_inference_time_count
+        stats["input_token_count"] = self.backbone_llm.input_token_count
+        stats["output_token_count"] = self.backbone_llm.output_token_count
+        stats["input_token_maxx"] = self.backbone_llm.input_token_maxx
+        stats["least_plan_schema"] = self.least_plan_schema
+        stats["least_plan_comm"] = self.least_plan_comm
+        stats["least_plan_logic"] = self.least_plan_logic
+        stats["least_plan_logical_pass"] = self.least_plan_logical_pass
+        return stats
+
+    def _merge_branch(self, stats):
+        """
+        把分支的统计与 least_plan_* 合并回来；按分支顺序调用时结果与顺序搜索一致
+        """
+        for name in self.BRANCH_COUNTERS:
+            setattr(self, name, getattr(self, name) + stats[name])
+        self.llm_inference_time_count += stats["llm_inference_time_count"]
+        self.backbone_llm.input_token_count += stats["input_token_count"]
+        self.backbone_llm.output_token_count += stats["output_token_count"]
+        self.backbone_llm.input_token_maxx = max(self.backbone_llm.input_token_maxx, stats["input_token_maxx"])
+
+        if stats["least_plan_schema"] is not None:
+            self.least_plan_schema = stats["least_plan_schema"]
+        if stats["least_plan_logical_pass"] > self.least_plan_logical_pass:
+            self.least_plan_comm = stats["least_plan_comm"]
+            self.least_plan_logical_pass = stats["least_plan_logical_pass"]
+        if self.least_plan_logic is None:
+            self.least_plan_logic = stats["least_plan_logic"]
+
+    def _for_search_worker(self):
+        """
+        并行搜索子进程使用的可 pickle 副本：memory、query、LLM 推荐等按值传递；
+        env 只传类型，在子进程中重新创建并自行加载 TravelDataStore；LLM 客户端在子进程中重新构造
+        """
+        agent = copy.copy(self)
+        if getattr(self, "env", None) is not None:
+            agent.env = type(self.env)
+        agent.__dict__.pop("logger", None)
+        agent.search_cancelled = None
+        return agent
+
+    def _init_search_worker(self):
+        # 在子进程中由 _for_search_worker 的副本恢复：创建 env，并把输出追加到本次请求的日志文件
+        if isinstance(getattr(self, "env", None), type):
+            self.env = self.env()
+        if self.log_files is not None:
+            self.logger = request_logger(self.query["uid"], *self.log_files, self.debug)
+
+    def _parallel_search(self, branches):
+        """
+        用 parallel_search_workers 个子进程同时搜索多个顶层分支，所有分支共享 TIME_CUT 截止时间。
+        dfs_poi 中的 pandas 查表与交通计算受 GIL 限制，因此用进程而不是线程；子进程由 forkserver 创建，
+        不继承服务进程中其它线程持有的锁，agent 与分支通过 pickle 传递（见 _for_search_worker）。
+
+        - parallel_search_ordered=True（默认）：按分支顺序确定结果，某个分支成功后取消其后的分支，
+          并等待其前面的分支结束，返回的是顺序搜索会得到的第一个方案；
+        - parallel_search_ordered=False（best-of-N）：返回最先完成搜索的可行方案，并取消其余分支。
+
+        返回前等待所有子进程结束；进程池不可用（无法创建、pickle 失败或子进程异常退出）时，
+        未确定结果的分支回到顺序搜索。
+        """
+        first = next(branches, None)
+        if first is None:
+            return False, {"error_info": "No solution found."}
+        # LLM 推荐等只算一次的内容在创建子进程之前算好，与顺序搜索使用同一份结果
+        self._prepare_parallel_search(first)
+        branches = itertools.chain([first], branches)
+
+        workers = self.parallel_search_workers
+        ordered = self.parallel_search_ordered
+        deadline = self.time_before_search + self.TIME_CUT
+        pending = {}  # 分支序号 -> 已提交、结果尚未合并的分支
+        running = {}  # future -> 分支序号
+        finished = {}  # 分支序号 -> (status, plan, stats)
+        submitted = 0
+        next_index = 0  # 下一个待确定结果的分支（ordered）
+        found = None  # 已成功的最靠前的分支序号
+        exhausted = False
+        timed_out = False
+        fallback = False
+
+        context = _search_context([__name__, type(self).__module__])
+        # 序号大于 cancel_after 的分支被取消
+        cancel_after = context.RawValue("q", sys.maxsize)
+        pool = None
+        try:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_search_worker,
+                initargs=(self._for_search_worker(), cancel_after),
+            )
+            while True:
+                # 每个进程多排队一个分支，进程空闲时立即开始下一个分支
+                while not exhausted and found is None and len(running) < 2 * workers:
+                    branch = next(branches, None)
+                    if branch is None:
+                        exhausted = True
+                        break
+                    pending[submitted] = branch
+                    running[pool.submit(_search_branch_in_worker, submitted, branch)] = submitted
+                    submitted += 1
+
+                if ordered:
+                    while next_index in finished:
+                        status, plan, stats = finished.pop(next_index)
+                        del pending[next_index]
+                        self._merge_branch(stats)
+                        result = self._resolve_branch(status, plan)
+                        if result is not None:
+                            return result
+                        next_index += 1
+
+                if not running:
+                    if exhausted:
+                        break
+                    continue
+
+                done, _ = wait(
+                    running,
+                    timeout=max(deadline - time.time(), 0) + self.PARALLEL_SEARCH_GRACE,
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    # 子进程未能在截止时间内自行超时（如卡在 LLM 请求上），结束这些进程后返回
+                    self.log("Searching TIME OUT !!!")
+                    _kill_search_workers(pool)
+                    return False, {"error_info": "TimeOutError"}
+                for future in done:
+                    index = running.pop(future)
+                    status, plan, stats = future.result()
+                    if ordered:
+                        finished[index] = (status, plan, stats)
+                        if status == "success" and (found is None or index < found):
+                            found = index
+                            cancel_after.value = index
+                        continue
+
+                    del pending[index]
+                    self._merge_branch(stats)
+                    if status == "success":
                         return True, plan
+                    if status == "timeout":
+                        timed_out = True
                     else:
-                        if time.time() > self.time_before_search + self.TIME_CUT:
-                            print("Searching TIME OUT !!!")
-                            return False, {"error_info": "TimeOutError"}
-                        
                         self.backtrack_count += 1
-                        print("search failed given the intercity-transport and hotels, backtrack...")
-
-
+                        self.log("search failed given the intercity-transport and hotels, backtrack...")
+        except Exception:
+            self.logger.warning("parallel search failed, falling back to sequential search", exc_info=True)
+            fallback = True
+        finally:
+            cancel_after.value = -1
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        if fallback:
+            # 进程池不可用：已合并的分支不再重复，其余分支按顺序搜索（真正的搜索错误会在这里重新抛出）
+            for branch in itertools.chain([pending[index] for index in sorted(pending)], branches):
+                status, plan = self._search_branch(self.query, branch)
+                result = self._resolve_branch(status, plan)
+                if result is not None:
+                    return result
+            return False, {"error_info": "No solution found."}
+
+        if timed_out:
+            return False, {"error_info": "TimeOutError"}
         return False, {"error_info": "No solution found."}
 
     def symbolic_search(self, symoblic_query):
@@ -1742,7 +2104,7 @@ class NesyAgent(BaseAgent):
         ):
             pass
         else:
-            print("GO HERE!")
+            self.log("GO HERE!")
             return False, {"error_info": f"Unsupported cities {symoblic_query['start_city']} -> {symoblic_query['target_city']}."}
 
         if self.preference_search:
@@ -1759,7 +2121,7 @@ class NesyAgent(BaseAgent):
             symoblic_query["preference_opt"] = concept.split(" ")[0]
             symoblic_query["preference_concept"] = concept.split(" ")[1]
             symoblic_query["preference_code"] = code
-            print(symoblic_query["preference_opt"], "\n", symoblic_query["preference_concept"], "\n", symoblic_query["preference_code"])
+            self.log(symoblic_query["preference_opt"], "\n", symoblic_query["preference_concept"], "\n", symoblic_query["preference_code"])
 
             if symoblic_query["preference_opt"] == "maximize":
                 self.least_plan_logic_pvalue = -19260817
@@ -1788,7 +2150,7 @@ class NesyAgent(BaseAgent):
 
         success, plan = self.generate_plan_with_search(symoblic_query)
 
-        print(success, plan)
+        self.log(success, plan)
 
         return success, plan
 
@@ -1831,49 +2193,12 @@ class NesyAgent(BaseAgent):
         return info
 
     def collect_intercity_transport(self, source_city, target_city, trans_type):
-
-        info_return = self.env(
-            "intercity_transport_select('{source_city}', '{target_city}', '{trans_type}')".format(
-                source_city=source_city, target_city=target_city, trans_type=trans_type
-            )
+        return self.env.intercity_transport_select_all(
+            source_city, target_city, trans_type
         )
-        if not info_return["success"]:
-            return pd.DataFrame([])
-        trans_info = info_return["data"]
-        # print(poi_info)
-        while True:
-            info_i = self.env("next_page()")["data"]
-            if len(info_i) == 0:
-                break
-            else:
-                trans_info = pd.concat([trans_info, info_i], axis=0, ignore_index=True)
-        # print(poi_info)
-        return trans_info
 
     def collect_poi_info_all(self, city, poi_type):
-
-        if poi_type == "accommodation":
-            func_name = "accommodations_select"
-        elif poi_type == "attraction":
-            func_name = "attractions_select"
-        elif poi_type == "restaurant":
-            func_name = "restaurants_select"
-        else:
-            raise NotImplementedError
-
-        poi_info = self.env(
-            "{func}('{city}', 'name', lambda x: True)".format(func=func_name, city=city)
-        )["data"]
-        # print(poi_info)
-        while True:
-            info_i = self.env("next_page()")["data"]
-            if len(info_i) == 0:
-                break
-            else:
-                poi_info = pd.concat([poi_info, info_i], axis=0, ignore_index=True)
-
-        # print(poi_info)
-        return poi_info
+        return self.env.poi_select_all(city, poi_type)
 
 
 if __name__ == "__main__":
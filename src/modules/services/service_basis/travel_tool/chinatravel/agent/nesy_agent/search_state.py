@@ -0,0 +1,88 @@
+from collections import Counter
+
+
+# 计入预算检查的活动类型（城际交通与住宿已包含在 fixed_cost 中）
+POI_COST_TYPES = ("breakfast", "lunch", "dinner", "attraction")
+
+
+class PlanSearchState:
+    """
+    dfs_poi 搜索过程中部分行程的增量状态：与 plan 中活动的追加 / 回溯一一对应地 push / pop，
+    维护 POI 花费总和、已访问的餐厅 / 景点（下标与名称）、每天各类型活动的数量和当前时间，
+    使预算、重复 POI 等单调约束在 O(1) 内检查，无需每个节点遍历整个 plan。
+
+    这些检查只用于提前剪枝；完整的 constraints_validation 仍在完整候选行程上执行。
+    """
+
+    def __init__(self, fixed_cost: float = 0, budget: float | None = None):
+        """
+        :param fixed_cost: 已确定的城际交通与住宿费用（intercity_with_hotel_cost）
+        :param budget: 预算上限，None 表示不限
+        """
+        self.fixed_cost = fixed_cost
+        self.budget = budget
+        self.poi_cost = 0
+        self.current_time = ""
+        self._stack = []
+        self._day_counts = Counter()
+        self._visited = Counter()
+
+    def push(self, day: int, activity: dict, poi_index=None) -> None:
+        """
+        记录刚追加到 plan[day]["activities"] 末尾的活动
+        :param day: 活动所在的天（从 0 开始）
+        :param activity: 活动
+        :param poi_index: 餐厅 / 景点在 memory 表中的下标
+        """
+        activity_type = activity.get("type")
+        cost = activity.get("cost", 0) if activity_type in POI_COST_TYPES else 0
+        keys = []
+        if activity_type in ("lunch", "dinner", "attraction"):
+            kind = "attraction" if activity_type == "attraction" else "restaurant"
+            keys.append((kind, "name", activity["position"]))
+            if poi_index is not None:
+                keys.append((kind, "index", poi_index))
+        self._stack.append((day, activity_type, cost, keys, self.current_time))
+        self.poi_cost += cost
+        self._day_counts[day, activity_type] += 1
+        self._visited.update(keys)
+        self.current_time = activity.get("end_time", self.current_time)
+
+    def pop(self) -> None:
+        """
+        撤销最近一次 push（对应 plan[day]["activities"].pop()）
+        """
+        day, activity_type, cost, keys, previous_time = self._stack.pop()
+        self.poi_cost -= cost
+        self._day_counts[day, activity_type] -= 1
+        self._visited.subtract(keys)
+        self.current_time = previous_time
+
+    def __len__(self) -> int:
+        return len(self._stack)
+
+    @property
+    def total_cost(self) -> float:
+        return self.fixed_cost + self.poi_cost
+
+    def exceeds_budget(self, extra_cost: float = 0) -> bool:
+        """
+        :param extra_cost: 即将加入的活动的花费
+        :return: 加入后是否超出预算（花费只增不减，超出后该分支不可能满足预算）
+        """
+        return self.budget is not None and self.total_cost + extra_cost > self.budget
+
+    def count(self, day: int, activity_type: str) -> int:
+        return self._day_counts[day, activity_type]
+
+    def is_restaurant_visited(self, index=None, name=None) -> bool:
+        return self._is_visited("restaurant", index, name)
+
+    def is_attraction_visited(self, index=None, name=None) -> bool:
+        return self._is_visited("attraction", index, name)
+
+    def _is_visited(self, kind: str, index, name) -> bool:
+        return (
+            (index is not None and self._visited[kind, "index", index] > 0)
+            or (name is not None and self._visited[kind, "name", name] > 0)
+        )
@@ -10,6 +10,12 @@ class TimeOutError(Exception):
         super().__init__(self.message)
 
 
+class SearchCancelled(Exception):
+    def __init__(self, message="Search branch cancelled"):
+        self.message = message
+        super().__init__(self.message)
+
+
 def time_compare_if_earlier_equal(time_1, time_2):
 
     time1 = float(time_1.split(":")[0])*60 + float(time_1.split(":")[1])
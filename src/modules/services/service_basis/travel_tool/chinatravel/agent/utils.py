@@ -1,4 +1,6 @@
 import sys
+import logging
+from contextlib import contextmanager
 from numpy import ndarray, integer, floating
 import numpy as np
 import json
@@ -41,6 +43,49 @@ class Logger(object):
         self.log.close()
 
 
+def request_logger(name, log_file, error_file, debug_mode=False):
+    """
+    创建一次请求专用的 logger：INFO 及以上写入 log_file，WARNING 及以上同时写入 error_file，
+    debug_mode 时同时输出到终端。logger 不注册到 logging 的全局表中，也不修改 sys.stdout / sys.stderr
+    :param name: logger 名称（请求的 uid）
+    """
+    logger = logging.Logger("chinatravel.request.{}".format(name), logging.INFO)
+    formatter = logging.Formatter("%(message)s")
+    handlers = [
+        (logging.FileHandler(log_file, encoding="utf-8"), logging.INFO),
+        (logging.FileHandler(error_file, encoding="utf-8"), logging.WARNING),
+    ]
+    if debug_mode:
+        handlers.append((logging.StreamHandler(sys.stdout), logging.INFO))
+    for handler, level in handlers:
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    return logger
+
+
+def close_logger(logger):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+@contextmanager
+def request_log(name, log_file, error_file, debug_mode=False):
+    """
+    在 with 块内使用 request_logger 创建的 logger，块内抛出的异常记录到 error_file，退出时关闭日志文件
+    :return: logging.Logger
+    """
+    logger = request_logger(name, log_file, error_file, debug_mode)
+    try:
+        yield logger
+    except Exception:
+        logger.exception("request failed")
+        raise
+    finally:
+        close_logger(logger)
+
+
 class NpEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, np.integer):
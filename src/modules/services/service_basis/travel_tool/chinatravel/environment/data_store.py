@@ -0,0 +1,119 @@
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+
+city_list = [
+    "beijing",
+    "shanghai",
+    "nanjing",
+    "suzhou",
+    "hangzhou",
+    "shenzhen",
+    "chengdu",
+    "wuhan",
+    "guangzhou",
+    "chongqing",
+]
+city_cn_list = [
+    "北京",
+    "上海",
+    "南京",
+    "苏州",
+    "杭州",
+    "深圳",
+    "成都",
+    "武汉",
+    "广州",
+    "重庆",
+]
+
+
+def first_value_by_name(table, column: str, key: str = "name") -> Mapping:
+    """
+    Map every `key` of `table` to `column` of its first row, i.e. the value
+    `select(city, key, lambda x: x == name).iloc[0][column]` would return.
+    """
+    index = {}
+    for name, value in zip(table[key], table[column]):
+        index.setdefault(name, value)
+    return MappingProxyType(index)
+
+
+def first_row_by_name(table, key: str = "name") -> Mapping:
+    """
+    Map every `key` of `table` to its first row as a read-only dict, i.e. the
+    row `select(city, key, lambda x: x == name).iloc[0]` would return.
+    """
+    index = {}
+    for row in table.to_dict("records"):
+        index.setdefault(row[key], MappingProxyType(row))
+    return MappingProxyType(index)
+
+
+def lookup(index: Mapping, name):
+    """
+    `index.get(name)`, except that unhashable names (which can never equal a
+    table value) give None instead of raising.
+    """
+    try:
+        return index.get(name)
+    except TypeError:
+        return None
+
+
+class TravelDataStore:
+    """
+    Process-wide cache of the sandbox tables.
+
+    Every table is loaded lazily, on first access, and exactly once per
+    (kind, path). The returned objects are shared by all API instances and
+    must be treated as read-only: callers that need to modify a DataFrame
+    have to copy it first.
+    """
+
+    def __init__(self):
+        self._tables: Dict[Tuple[str, str], Any] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        # (kind, path as given) -> (kind, real path); resolving the path is
+        # far more expensive than the lookup itself
+        self._keys: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, path: str, loader: Callable[[str], Any]) -> Any:
+        """
+        Return the cached table of `kind` stored under `path`, loading it
+        with `loader(path)` on first access.
+        """
+        key = self._keys.get((kind, path))
+        if key is None:
+            key = self._keys.setdefault((kind, path), (kind, os.path.realpath(path)))
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        # one lock per table, so loading one table never blocks readers of another
+        with lock:
+            if key not in self._tables:
+                self._tables[key] = loader(key[1])
+        return self._tables[key]
+
+    def is_loaded(self, kind: str, path: str) -> bool:
+        return (kind, os.path.realpath(path)) in self._tables
+
+    def clear(self):
+        """
+        Drop every cached table. Only meant for tests and reloading the sandbox.
+        """
+        with self._lock:
+            self._tables.clear()
+            self._locks.clear()
+
+
+_data_store = TravelDataStore()
+
+
+def get_data_store() -> TravelDataStore:
+    return _data_store
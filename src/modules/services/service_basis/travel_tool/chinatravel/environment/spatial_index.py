@@ -0,0 +1,73 @@
+import numpy as np
+
+
+# WGS-84, the ellipsoid geopy.geodesic uses by default
+_WGS84_A = 6378.137
+_WGS84_F = 1 / 298.257223563
+_WGS84_E2 = _WGS84_F * (2 - _WGS84_F)
+
+# Relative error of `distances` against geopy.geodesic(...).km for points less
+# than ~100 km apart (i.e. anything inside one city): below 2e-5, e.g. under
+# 2 m at 100 km and under 1 mm at 2 km. Radius and top-k queries therefore only
+# differ from the geodesic loop for points within that margin of the boundary.
+DISTANCE_TOLERANCE = 1e-4
+
+
+class SpatialIndex:
+    """
+    Vectorized distance queries over a fixed set of (lat, lon) points.
+
+    Distances use the local ellipsoidal (WGS-84) approximation
+    sqrt((M * dlat) ** 2 + (N * cos(lat_m) * dlon) ** 2), with M and N the
+    meridional and prime-vertical radii of curvature at the mean latitude,
+    which matches geodesic within DISTANCE_TOLERANCE at city scale while
+    costing a few NumPy passes instead of one geodesic call per point.
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = np.radians(np.ascontiguousarray(lat, dtype=np.float64))
+        self.lon = np.radians(np.ascontiguousarray(lon, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def distances(self, lat: float, lon: float) -> np.ndarray:
+        """
+        Distances in km from (lat, lon) to every indexed point.
+        """
+        lat, lon = np.radians(lat), np.radians(lon)
+        lat_m = (self.lat + lat) / 2
+        sin_m = np.sin(lat_m)
+        w = 1 - _WGS84_E2 * sin_m * sin_m
+        m = _WGS84_A * (1 - _WGS84_E2) / (w * np.sqrt(w))
+        n = _WGS84_A / np.sqrt(w)
+        return np.hypot(m * (self.lat - lat), n * np.cos(lat_m) * (self.lon - lon))
+
+    def query(self, lat: float, lon: float, topk=None, dist=None, strict=False):
+        """
+        Positions and distances of the indexed points within `dist` km of
+        (lat, lon) (`< dist` if `strict`, else `<= dist`; no limit if None),
+        nearest first, cut to the first `topk` if given. Ties keep index order.
+        """
+        distance = self.distances(lat, lon)
+        if dist is None:
+            idx = np.arange(len(distance))
+        elif strict:
+            idx = np.flatnonzero(distance < dist)
+        else:
+            idx = np.flatnonzero(distance <= dist)
+        idx = idx[np.argsort(distance[idx], kind="stable")]
+        if topk is not None:
+            idx = idx[:topk]
+        return idx, distance[idx]
+
+    def nearest(self, lat: float, lon: float):
+        """
+        Position of and distance to the nearest indexed point, (None, inf) if
+        the index is empty.
+        """
+        if len(self) == 0:
+            return None, float("inf")
+        distance = self.distances(lat, lon)
+        i = int(np.nanargmin(distance))
+        return i, float(distance[i])
@@ -7,7 +7,11 @@ from chinatravel.environment.tools.attractions.apis import Attractions
 from chinatravel.environment.tools.intercity_transport.apis import IntercityTransport
 from chinatravel.environment.tools.transportation.apis import Transportation
 
-from chinatravel.symbol_verification.concept_func import func_dict
+from chinatravel.symbol_verification.concept_func import (
+    func_dict,
+    compile_concept_code,
+    plan_namespace,
+)
 from chinatravel.evaluation.utils import load_json_file
 
 import pandas as pd
@@ -52,15 +56,15 @@ def evaluate_preference_py(preference_list, plan, verbose=False):
 
     results = []
     # hard_logic_py.append(debug_logic_py)
+    namespace = plan_namespace(plan)
     for _, preference_concept, preference_code in preference_list:
-        vars_dict = deepcopy(func_dict)
-        vars_dict["plan"] = plan
+        vars_dict = dict(namespace)
         # exec(constraint, {"__builtins__": {"set": set, "print": print}}, vars_dict)
         # results.append(vars_dict.get("result", False))
         try:
             # Evaluate the constraint in a safe manner
             exec(
-                preference_code,
+                compile_concept_code(preference_code, "<preference_py>"),
                 {
                     "__builtins__": {
                         "set": set,
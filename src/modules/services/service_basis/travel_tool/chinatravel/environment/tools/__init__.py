@@ -4,6 +4,7 @@ from .restaurants.apis import Restaurants
 from .intercity_transport.apis import IntercityTransport
 from .transportation.apis import Transportation
 from .poi.apis import Poi
+from chinatravel.environment.data_store import TravelDataStore, get_data_store
 
 __all__ = [
     "Attractions",
@@ -12,4 +13,6 @@ __all__ = [
     "IntercityTransport",
     "Transportation",
     "Poi",
+    "TravelDataStore",
+    "get_data_store",
 ]
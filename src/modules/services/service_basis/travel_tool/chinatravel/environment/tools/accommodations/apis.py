@@ -1,13 +1,50 @@
 import pandas as pd
 from pandas import DataFrame
 from typing import Callable
-from geopy.distance import geodesic
 import os
+from types import MappingProxyType
 
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from poi.apis import Poi
+from chinatravel.environment.data_store import (
+    get_data_store,
+    first_value_by_name,
+    first_row_by_name,
+    lookup,
+    city_list,
+    city_cn_list,
+)
+from chinatravel.environment.spatial_index import SpatialIndex
+
+
+def _load_accommodations(data_dir: str):
+    data = {}
+    key_type_tuple_list = {}
+    name_hotel_type_map = {}
+    name_row_map = {}
+    spatial_index = {}
+    for city, city_cn in zip(city_list, city_cn_list):
+        city_data = pd.read_csv(
+            os.path.join(data_dir, city, "accommodations.csv")
+        ).dropna()
+        data[city_cn] = city_data
+        key_type_tuple_list[city_cn] = [
+            (key, type(city_data.iloc[0][key])) for key in city_data.keys()
+        ]
+        name_hotel_type_map[city_cn] = first_value_by_name(
+            city_data, "featurehoteltype"
+        )
+        name_row_map[city_cn] = first_row_by_name(city_data)
+        spatial_index[city_cn] = SpatialIndex(city_data["lat"], city_data["lon"])
+    return {
+        "data": MappingProxyType(data),
+        "key_type_tuple_list": MappingProxyType(key_type_tuple_list),
+        "name_hotel_type_map": MappingProxyType(name_hotel_type_map),
+        "name_row_map": MappingProxyType(name_row_map),
+        "spatial_index": MappingProxyType(spatial_index),
+    }
 
 
 class Accommodations:
@@ -16,56 +53,45 @@ class Accommodations:
         self, base_path: str = "../../database/accommodations/", en_version=False
     ):
         curdir = os.path.dirname(os.path.realpath(__file__))
-        city_list = [
-            "beijing",
-            "shanghai",
-            "nanjing",
-            "suzhou",
-            "hangzhou",
-            "shenzhen",
-            "chengdu",
-            "wuhan",
-            "guangzhou",
-            "chongqing",
-        ]
-        data_path_list = [
-            os.path.join(curdir, f"{base_path}/{city}/accommodations.csv")
-            for city in city_list
-        ]
-        self.data = {}
-        for i, city in enumerate(city_list):
-            self.data[city] = pd.read_csv(data_path_list[i]).dropna()
-        self.key_type_tuple_list = {}
-        for city in city_list:
-            self.key_type_tuple_list[city] = []
-            for key in self.data[city].keys():
-                self.key_type_tuple_list[city].append(
-                    (key, type(self.data[city].iloc[0][key]))
-                )
-        city_cn_list = [
-            "北京",
-            "上海",
-            "南京",
-            "苏州",
-            "杭州",
-            "深圳",
-            "成都",
-            "武汉",
-            "广州",
-            "重庆",
-        ]
+        self.data_path = os.path.join(curdir, base_path)
+        self.poi = Poi(en_version=en_version)
 
-        for i, city in enumerate(city_list):
-            self.data[city_cn_list[i]] = self.data.pop(city)
-            self.key_type_tuple_list[city_cn_list[i]] = self.key_type_tuple_list.pop(
-                city
-            )
+    @property
+    def _tables(self):
+        return get_data_store().get(
+            "accommodations", self.data_path, _load_accommodations
+        )
 
-        self.poi = Poi(en_version=en_version)
+    @property
+    def data(self):
+        return self._tables["data"]
+
+    @property
+    def key_type_tuple_list(self):
+        return self._tables["key_type_tuple_list"]
+
+    @property
+    def name_hotel_type_map(self):
+        return self._tables["name_hotel_type_map"]
+
+    @property
+    def name_row_map(self):
+        return self._tables["name_row_map"]
+
+    @property
+    def spatial_index(self):
+        return self._tables["spatial_index"]
 
     def keys(self, city):
         return self.key_type_tuple_list[city]
 
+    def get_by_name(self, city: str, name):
+        """
+        The first row of `city` named `name` (as a read-only dict), or None.
+        Same row as `select(city, "name", lambda x: x == name).iloc[0]`.
+        """
+        return lookup(self.name_row_map[city], name)
+
     def select(self, city, key, func: Callable) -> DataFrame:
         if key not in self.data[city].keys():
             return "Key not found."
@@ -77,17 +103,11 @@ class Accommodations:
         if isinstance(lat_lon, str):
             return lat_lon
         lat, lon = lat_lon
-        distance = [
-            geodesic((lat, lon), (x, y)).km
-            for x, y in zip(self.data[city]["lat"], self.data[city]["lon"])
-        ]
-        tmp = self.data[city].copy()
+        idx, distance = self.spatial_index[city].query(
+            lat, lon, topk=topk, dist=dist, strict=True
+        )
+        tmp = self.data[city].iloc[idx].copy()
         tmp["distance"] = distance
-        if dist is not None:
-            tmp = tmp[tmp["distance"] < dist]
-        tmp = tmp.sort_values(by=["distance"])
-        if topk is not None:
-            return tmp.head(topk)
         return tmp
 
 
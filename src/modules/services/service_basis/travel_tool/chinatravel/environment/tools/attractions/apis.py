@@ -2,12 +2,53 @@ import pandas as pd
 from pandas import DataFrame
 from typing import Callable
 import os
-from geopy.distance import geodesic
+from types import MappingProxyType
 
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from poi.apis import Poi
+from chinatravel.environment.data_store import (
+    get_data_store,
+    first_value_by_name,
+    first_row_by_name,
+    lookup,
+    city_list,
+    city_cn_list,
+)
+from chinatravel.environment.spatial_index import SpatialIndex
+
+
+def _load_attractions(data_dir: str):
+    data = {}
+    key_type_tuple_list_map = {}
+    type_list_map = {}
+    name_type_map = {}
+    name_recommend_time_map = {}
+    name_row_map = {}
+    spatial_index = {}
+    for city, city_cn in zip(city_list, city_cn_list):
+        city_data = pd.read_csv(os.path.join(data_dir, city, "attractions.csv"))
+        data[city_cn] = city_data
+        key_type_tuple_list_map[city_cn] = [
+            (key, type(city_data[key][0])) for key in city_data.keys()
+        ]
+        type_list_map[city_cn] = city_data["type"].unique()
+        name_type_map[city_cn] = first_value_by_name(city_data, "type")
+        name_recommend_time_map[city_cn] = first_value_by_name(
+            city_data, "recommendmintime"
+        )
+        name_row_map[city_cn] = first_row_by_name(city_data)
+        spatial_index[city_cn] = SpatialIndex(city_data["lat"], city_data["lon"])
+    return {
+        "data": MappingProxyType(data),
+        "key_type_tuple_list_map": MappingProxyType(key_type_tuple_list_map),
+        "type_list_map": MappingProxyType(type_list_map),
+        "name_type_map": MappingProxyType(name_type_map),
+        "name_recommend_time_map": MappingProxyType(name_recommend_time_map),
+        "name_row_map": MappingProxyType(name_row_map),
+        "spatial_index": MappingProxyType(spatial_index),
+    }
 
 
 class Attractions:
@@ -16,62 +57,52 @@ class Attractions:
         base_path: str = "../../database/attractions",
         en_version=False,
     ):
-        city_list = [
-            "beijing",
-            "shanghai",
-            "nanjing",
-            "suzhou",
-            "hangzhou",
-            "shenzhen",
-            "chengdu",
-            "wuhan",
-            "guangzhou",
-            "chongqing",
-        ]
         curdir = os.path.dirname(os.path.realpath(__file__))
-        data_path_list = [
-            os.path.join(curdir, f"{base_path}/{city}/attractions.csv")
-            for city in city_list
-        ]
+        self.data_path = os.path.join(curdir, base_path)
+        self.poi = Poi()
 
-        self.data = {}
-        for i, city in enumerate(city_list):
-            self.data[city] = pd.read_csv(data_path_list[i])
-        self.key_type_tuple_list_map = {}
-        for city in city_list:
-            self.key_type_tuple_list_map[city] = []
-            for key in self.data[city].keys():
-                self.key_type_tuple_list_map[city].append(
-                    (key, type(self.data[city][key][0]))
-                )
-        self.type_list_map = {}
-        for city in city_list:
-            self.type_list_map[city] = self.data[city]["type"].unique()
-        city_cn_list = [
-            "北京",
-            "上海",
-            "南京",
-            "苏州",
-            "杭州",
-            "深圳",
-            "成都",
-            "武汉",
-            "广州",
-            "重庆",
-        ]
+    @property
+    def _tables(self):
+        return get_data_store().get("attractions", self.data_path, _load_attractions)
 
-        for i, city in enumerate(city_list):
-            self.data[city_cn_list[i]] = self.data.pop(city)
-            self.key_type_tuple_list_map[city_cn_list[i]] = (
-                self.key_type_tuple_list_map.pop(city)
-            )
-            self.type_list_map[city_cn_list[i]] = self.type_list_map.pop(city)
+    @property
+    def data(self):
+        return self._tables["data"]
 
-        self.poi = Poi()
+    @property
+    def key_type_tuple_list_map(self):
+        return self._tables["key_type_tuple_list_map"]
+
+    @property
+    def type_list_map(self):
+        return self._tables["type_list_map"]
+
+    @property
+    def name_type_map(self):
+        return self._tables["name_type_map"]
+
+    @property
+    def name_recommend_time_map(self):
+        return self._tables["name_recommend_time_map"]
+
+    @property
+    def name_row_map(self):
+        return self._tables["name_row_map"]
+
+    @property
+    def spatial_index(self):
+        return self._tables["spatial_index"]
 
     def keys(self, city: str):
         return self.key_type_tuple_list_map[city]
 
+    def get_by_name(self, city: str, name):
+        """
+        The first row of `city` named `name` (as a read-only dict), or None.
+        Same row as `select(city, "name", lambda x: x == name).iloc[0]`.
+        """
+        return lookup(self.name_row_map[city], name)
+
     def select(self, city: str, key, func: Callable) -> DataFrame:
         if key not in self.data[city].keys():
             return "Key not found."
@@ -99,16 +130,10 @@ class Attractions:
         if isinstance(lat_lon, str):
             return lat_lon
         lat, lon = lat_lon
-        distance = [
-            geodesic((lat, lon), (x, y)).km
-            for x, y in zip(self.data[city]["lat"], self.data[city]["lon"])
-        ]
-        tmp = self.data[city].copy()
+        idx, distance = self.spatial_index[city].query(lat, lon, topk=topk, dist=dist)
+        tmp = self.data[city].iloc[idx].copy()
         tmp["distance"] = distance
-        tmp = tmp.sort_values(by=["distance"])
-        if topk is None:
-            return tmp[tmp["distance"] <= dist]
-        return tmp[tmp["distance"] <= dist].head(topk)
+        return tmp
 
     def get_type_list(self, city: str):
         return self.type_list_map[city]
@@ -1,46 +1,100 @@
 import os
+from types import MappingProxyType
+from typing import Mapping
 import pandas as pd
 from pandas import DataFrame
 
+from chinatravel.environment.data_store import get_data_store, lookup
+
 
 def time2float(time_str):
     h, m = time_str.split(":")
     return int(h) + int(m) / 60
 
 
+def _load_intercity_transport(base_path: str):
+    airplane_df = pd.read_json(
+        os.path.join(base_path, "airplane.jsonl"), lines=True, keep_default_dates=False
+    )
+    city_list = [
+        "上海",
+        "北京",
+        "深圳",
+        "广州",
+        "重庆",
+        "苏州",
+        "成都",
+        "杭州",
+        "武汉",
+        "南京",
+    ]
+    train_df_dict = {}
+    for start_city in city_list:
+        for end_city in city_list:
+            if start_city == end_city:
+                continue
+            train_path = os.path.join(
+                base_path, "train", "from_{}_to_{}.json".format(start_city, end_city)
+            )
+            train_df_dict[(start_city, end_city)] = pd.read_json(train_path)
+    return {
+        "airplane_df": airplane_df,
+        "train_df_dict": MappingProxyType(train_df_dict),
+        # (start_city, end_city, intercity_type) -> route index, filled on first use
+        "route_index": {},
+    }
+
+
 class IntercityTransport:
     def __init__(self, path: str = "../../database/intercity_transport/"):
         curdir = os.path.dirname(os.path.realpath(__file__))
         self.base_path = os.path.join(curdir, path)
         self.airplane_path = self.base_path + "airplane.jsonl"
-        self.airplane_df = pd.read_json(
-            self.airplane_path, lines=True, keep_default_dates=False
+
+    @property
+    def _tables(self):
+        return get_data_store().get(
+            "intercity_transport", self.base_path, _load_intercity_transport
+        )
+
+    @property
+    def airplane_df(self):
+        return self._tables["airplane_df"]
+
+    @property
+    def train_df_dict(self):
+        return self._tables["train_df_dict"]
+
+    def route_index(self, start_city, end_city, intercity_type) -> Mapping:
+        """
+        (TrainID / FlightID, From, To) -> the first row (read-only dict) of
+        `select(start_city, end_city, intercity_type)` with that number and
+        stations. Built once per route and shared.
+        """
+        key = (start_city, end_city, intercity_type)
+        cache = self._tables["route_index"]
+        index = cache.get(key)
+        if index is None:
+            id_key = "FlightID" if intercity_type == "airplane" else "TrainID"
+            routes = self._select(start_city, end_city, intercity_type)
+            index = {}
+            if routes is not None:
+                for row in routes.to_dict("records"):
+                    index.setdefault(
+                        (row[id_key], row["From"], row["To"]), MappingProxyType(row)
+                    )
+            index = cache.setdefault(key, MappingProxyType(index))
+        return index
+
+    def get_by_id(self, start_city, end_city, intercity_type, transport_id, start, end):
+        """
+        The train / flight `transport_id` from station `start` to `end` on the
+        route, or None.
+        """
+        return lookup(
+            self.route_index(start_city, end_city, intercity_type),
+            (transport_id, start, end),
         )
-        city_list = [
-            "上海",
-            "北京",
-            "深圳",
-            "广州",
-            "重庆",
-            "苏州",
-            "成都",
-            "杭州",
-            "武汉",
-            "南京",
-        ]
-        self.train_df_dict = {}
-
-        for start_city in city_list:
-            for end_city in city_list:
-                if start_city == end_city:
-                    continue
-                train_path = (
-                    self.base_path
-                    + "train/"
-                    + "from_{}_to_{}.json".format(start_city, end_city)
-                )
-                train_df = pd.read_json(train_path)
-                self.train_df_dict[(start_city, end_city)] = train_df
 
     def select(
         self, start_city, end_city, intercity_type, earliest_leave_time="00:00"
@@ -1,55 +1,36 @@
 import os
 import json
+from types import MappingProxyType
+
+from chinatravel.environment.data_store import (
+    get_data_store,
+    city_list,
+    city_cn_list,
+)
+
+
+def _load_poi(data_dir: str):
+    data = {}
+    for city, city_cn in zip(city_list, city_cn_list):
+        with open(os.path.join(data_dir, city, "poi.json"), "r", encoding="utf-8") as f:
+            city_data = {}
+            for name_pos in json.load(f):
+                city_data[name_pos["name"]] = tuple(name_pos["position"])
+        data[city_cn] = city_data
+    return MappingProxyType(data)
 
 
 class Poi:
     def __init__(self, base_path: str = "../../database/poi/", en_version=False):
-
-        city_list = [
-            "beijing",
-            "shanghai",
-            "nanjing",
-            "suzhou",
-            "hangzhou",
-            "shenzhen",
-            "chengdu",
-            "wuhan",
-            "guangzhou",
-            "chongqing",
-        ]
         curdir = os.path.dirname(os.path.realpath(__file__))
-        data_path_list = [
-            os.path.join(curdir, f"{base_path}/{city}/poi.json") for city in city_list
-        ]
-        self.data = {}
-        for i, city in enumerate(city_list):
-            self.data[city] = json.load(open(data_path_list[i], "r", encoding="utf-8"))
-            city_data = {}
-            for name_pos in self.data[city]:
-                name = name_pos["name"]
-                pos = name_pos["position"]
-                city_data[name] = tuple(pos)
-            self.data[city] = city_data
-            # self.data[city] = [
-            #     (x["name"], tuple(x["position"])) for x in self.data[city]
-            # ]
-        city_cn_list = [
-            "北京",
-            "上海",
-            "南京",
-            "苏州",
-            "杭州",
-            "深圳",
-            "成都",
-            "武汉",
-            "广州",
-            "重庆",
-        ]
-        for i, city in enumerate(city_list):
-            self.data[city_cn_list[i]] = self.data.pop(city)
+        self.data_path = os.path.join(curdir, base_path)
         self.city_cn_list = city_cn_list
         self.city_list = city_list
 
+    @property
+    def data(self):
+        return get_data_store().get("poi", self.data_path, _load_poi)
+
     def search(self, city: str, name: str):
         if city in self.city_list:
             city = self.city_cn_list[self.city_list.index(city)]
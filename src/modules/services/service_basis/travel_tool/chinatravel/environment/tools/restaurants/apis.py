@@ -2,69 +2,96 @@ import pandas as pd
 from pandas import DataFrame
 from typing import Callable
 import os
-from geopy.distance import geodesic
+from types import MappingProxyType
 
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from poi.apis import Poi
+from chinatravel.environment.data_store import (
+    get_data_store,
+    first_value_by_name,
+    first_row_by_name,
+    lookup,
+    city_list,
+    city_cn_list,
+)
+from chinatravel.environment.spatial_index import SpatialIndex
+
+
+def _load_restaurants(data_dir: str):
+    data = {}
+    key_type_tuple_list_map = {}
+    cuisine_list_map = {}
+    name_cuisine_map = {}
+    name_row_map = {}
+    spatial_index = {}
+    for city, city_cn in zip(city_list, city_cn_list):
+        city_data = pd.read_csv(
+            os.path.join(data_dir, city, "restaurants_" + city + ".csv")
+        )
+        data[city_cn] = city_data
+        key_type_tuple_list_map[city_cn] = [
+            (key, type(city_data[key][0])) for key in city_data.keys()
+        ]
+        cuisine_list_map[city_cn] = city_data["cuisine"].unique()
+        name_cuisine_map[city_cn] = first_value_by_name(city_data, "cuisine")
+        name_row_map[city_cn] = first_row_by_name(city_data)
+        spatial_index[city_cn] = SpatialIndex(city_data["lat"], city_data["lon"])
+    return {
+        "data": MappingProxyType(data),
+        "key_type_tuple_list_map": MappingProxyType(key_type_tuple_list_map),
+        "cuisine_list_map": MappingProxyType(cuisine_list_map),
+        "name_cuisine_map": MappingProxyType(name_cuisine_map),
+        "name_row_map": MappingProxyType(name_row_map),
+        "spatial_index": MappingProxyType(spatial_index),
+    }
 
 
 class Restaurants:
     def __init__(self, base_path: str = "../../database/restaurants"):
-        city_list = [
-            "beijing",
-            "shanghai",
-            "nanjing",
-            "suzhou",
-            "hangzhou",
-            "shenzhen",
-            "chengdu",
-            "wuhan",
-            "guangzhou",
-            "chongqing",
-        ]
-        self.data = {}
         curdir = os.path.dirname(os.path.realpath(__file__))
-        for city in city_list:
-            path = os.path.join(curdir, base_path, city, "restaurants_" + city + ".csv")
-            self.data[city] = pd.read_csv(path)
-
-        self.key_type_tuple_list_map = {}
-        for city in city_list:
-            self.key_type_tuple_list_map[city] = []
-            for key in self.data[city].keys():
-                self.key_type_tuple_list_map[city].append(
-                    (key, type(self.data[city][key][0]))
-                )
-        self.cuisine_list_map = {}
-        for city in city_list:
-            self.cuisine_list_map[city] = self.data[city]["cuisine"].unique()
-        city_cn_list = [
-            "北京",
-            "上海",
-            "南京",
-            "苏州",
-            "杭州",
-            "深圳",
-            "成都",
-            "武汉",
-            "广州",
-            "重庆",
-        ]
+        self.data_path = os.path.join(curdir, base_path)
+        self.poi = Poi()
 
-        for i, city in enumerate(city_list):
-            self.data[city_cn_list[i]] = self.data.pop(city)
-            self.key_type_tuple_list_map[city_cn_list[i]] = (
-                self.key_type_tuple_list_map.pop(city)
-            )
-            self.cuisine_list_map[city_cn_list[i]] = self.cuisine_list_map.pop(city)
+    @property
+    def _tables(self):
+        return get_data_store().get("restaurants", self.data_path, _load_restaurants)
 
-        self.poi = Poi()
+    @property
+    def data(self):
+        return self._tables["data"]
+
+    @property
+    def key_type_tuple_list_map(self):
+        return self._tables["key_type_tuple_list_map"]
+
+    @property
+    def cuisine_list_map(self):
+        return self._tables["cuisine_list_map"]
+
+    @property
+    def name_cuisine_map(self):
+        return self._tables["name_cuisine_map"]
+
+    @property
+    def name_row_map(self):
+        return self._tables["name_row_map"]
+
+    @property
+    def spatial_index(self):
+        return self._tables["spatial_index"]
 
     def keys(self, city: str):
         return self.key_type_tuple_list_map[city]
 
+    def get_by_name(self, city: str, name):
+        """
+        The first row of `city` named `name` (as a read-only dict), or None.
+        Same row as `select(city, "name", lambda x: x == name).iloc[0]`.
+        """
+        return lookup(self.name_row_map[city], name)
+
     def select(self, city: str, key, func: Callable) -> DataFrame:
         if key not in self.data[city].keys():
             return "Key not found."
@@ -98,16 +125,10 @@ class Restaurants:
         if isinstance(lat_lon, str):
             return lat_lon
         lat, lon = lat_lon
-        distance = [
-            geodesic((lat, lon), (x, y)).km
-            for x, y in zip(self.data[city]["lat"], self.data[city]["lon"])
-        ]
-        tmp = self.data[city].copy()
+        idx, distance = self.spatial_index[city].query(lat, lon, topk=topk, dist=dist)
+        tmp = self.data[city].iloc[idx].copy()
         tmp["distance"] = distance
-        tmp = tmp.sort_values(by=["distance"])
-        if topk is None:
-            return tmp[tmp["distance"] <= dist]
-        return tmp[tmp["distance"] <= dist].head(topk)
+        return tmp
 
     def restaurants_with_recommended_food(self, city: str, food: str):
         return self.data[city][self.data[city]["recommendedfood"].str.contains(food)]
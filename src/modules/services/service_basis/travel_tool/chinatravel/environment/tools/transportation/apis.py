@@ -1,17 +1,27 @@
 import os
 import json
 import heapq
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+import numpy as np
 from geopy.distance import geodesic
 
 from chinatravel.environment.tools.poi.apis import Poi
+from chinatravel.environment.data_store import get_data_store, city_list
+from chinatravel.environment.spatial_index import SpatialIndex
 
 
 def get_lines_and_stations(city, SUBWAY_PATH):
-    stations_all = []
-    metro_lines = {}
     with open(SUBWAY_PATH, "r", encoding="utf-8") as file:
         subway_data = json.load(file)
-    for line in subway_data[city]:
+    return _lines_and_stations_from(subway_data[city])
+
+
+def _lines_and_stations_from(city_lines):
+    stations_all = []
+    metro_lines = {}
+    for line in city_lines:
         metro_lines[line["name"]] = []
         for station in line["stations"]:
             lat, lon = map(float, station["position"].split(","))
@@ -92,7 +102,95 @@ def find_shortest_path(graph, start, end):
     return dijkstra(graph, start, end)
 
 
-def find_nearest_station(location, stations):
+class MetroRouteTable:
+    """
+    Station-to-station shortest paths (in hops) of one city's metro graph,
+    precomputed from every station with a layered BFS.
+
+    `path(start, end)` returns exactly what `dijkstra(graph, start, end)`
+    returns: among the paths with the fewest hops, the lexicographically
+    smallest list of station names (that is how the heap breaks ties).
+    Only the BFS parent of each (source, station) pair is stored, as an
+    n x n int32 matrix, so a lookup costs O(path length).
+    """
+
+    def __init__(self, graph):
+        self.names = sorted(graph)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        adj = [[self.ids[v] for v in graph[u] if v in self.ids] for u in self.names]
+        n = len(self.names)
+        self.parent = np.full((n, n), -1, dtype=np.int32)
+        self.hops = np.full((n, n), -1, dtype=np.int32)
+        for src in range(n):
+            self._bfs(adj, src)
+
+    def _bfs(self, adj, src):
+        n = len(adj)
+        parent, hops = [-1] * n, [-1] * n
+        hops[src] = 0
+        # each layer is kept sorted by the paths leading to it, so the first
+        # parent that reaches a station is the one on its smallest path
+        layer, depth = [src], 0
+        while layer:
+            depth += 1
+            found = {}
+            for rank, u in enumerate(layer):
+                for v in adj[u]:
+                    if hops[v] == -1 and v not in found:
+                        found[v] = rank
+                        parent[v] = u
+            for v in found:
+                hops[v] = depth
+            layer = sorted(found, key=lambda v: (found[v], self.names[v]))
+        self.parent[src] = parent
+        self.hops[src] = hops
+
+    def path(self, start, end):
+        if start == end:
+            return [start]
+        if start not in self.ids or end not in self.ids:
+            return []
+        src, node = self.ids[start], self.ids[end]
+        if self.hops[src, node] == -1:
+            return []
+        path = [end]
+        while node != src:
+            node = self.parent[src, node]
+            path.append(self.names[node])
+        return path[::-1]
+
+
+def apply_start_time(route, start_time):
+    """
+    Turn a route of (start, end, mode, hours, cost, distance) legs into the
+    list of transports `goto` returns, departing at `start_time`.
+    """
+    transports = []
+    for start, end, mode, hours, cost, distance in route:
+        end_time = add_time(start_time, hours)
+        transports.append(
+            {
+                "start": start,
+                "end": end,
+                "mode": mode,
+                "start_time": start_time,
+                "end_time": end_time,
+                "cost": cost,
+                "distance": distance,
+            }
+        )
+        start_time = end_time
+    return transports
+
+
+def find_nearest_station(location, stations, station_index=None):
+    """
+    `station_index` is an optional SpatialIndex over `stations`' positions, in
+    which case the lookup is vectorized (see spatial_index.DISTANCE_TOLERANCE).
+    """
+    if station_index is not None:
+        i, min_distance = station_index.nearest(*location)
+        return (None if i is None else stations[i]), min_distance
     nearest_station = None
     min_distance = float("inf")
     for station in stations:
@@ -135,7 +233,38 @@ def calculate_cost(distance):
         return 9 + extra_cost
 
 
+def _load_subways(subway_path: str):
+    with open(subway_path, "r", encoding="utf-8") as file:
+        subway_data = json.load(file)
+    city_stations_dict = {}
+    city_lines_dict = {}
+    city_station_to_line = {}
+    graphs = {}
+    station_index = {}
+    for city in city_list:
+        stations_all, metro_lines, station_to_line = _lines_and_stations_from(
+            subway_data[city]
+        )
+        city_stations_dict[city] = stations_all
+        city_lines_dict[city] = metro_lines
+        city_station_to_line[city] = station_to_line
+        graphs[city] = build_graph(metro_lines)
+        station_index[city] = SpatialIndex(
+            [station["position"][0] for station in stations_all],
+            [station["position"][1] for station in stations_all],
+        )
+    return {
+        "city_stations_dict": MappingProxyType(city_stations_dict),
+        "city_lines_dict": MappingProxyType(city_lines_dict),
+        "city_station_to_line": MappingProxyType(city_station_to_line),
+        "graphs": MappingProxyType(graphs),
+        "station_index": MappingProxyType(station_index),
+    }
+
+
 class Transportation:
+    route_memo_size = 100000
+
     def __init__(
         self, base_path: str = "../../database/transportation/", en_version=False
     ):
@@ -165,108 +294,134 @@ class Transportation:
         ]
 
         curdir = os.path.dirname(os.path.realpath(__file__))
-        SUBWAY_PATH = os.path.join(curdir, base_path + "subways.json")
-        self.city_stations_dict = {}
-        self.city_lines_dict = {}
-        self.city_station_to_line = {}
-        for city in self.city_list:
-            stations_all, metro_lines, station_to_line = get_lines_and_stations(
-                city, SUBWAY_PATH
-            )
-            self.city_stations_dict[city] = stations_all
-            self.city_lines_dict[city] = metro_lines
-            self.city_station_to_line[city] = station_to_line
+        self.subway_path = os.path.join(curdir, base_path + "subways.json")
+        self.poi_search = Poi()
 
-        self.graphs = {}
-        for city in self.city_list:
-            self.graphs[city] = build_graph(self.city_lines_dict[city])
+        # goto() results without the departure time, keyed by
+        # (city, start, end, transport_type); see apply_start_time
+        self._route_memo = OrderedDict()
+        self._route_memo_lock = threading.Lock()
 
-        self.poi_search = Poi()
+    @property
+    def _tables(self):
+        return get_data_store().get("subways", self.subway_path, _load_subways)
+
+    @property
+    def city_stations_dict(self):
+        return self._tables["city_stations_dict"]
+
+    @property
+    def city_lines_dict(self):
+        return self._tables["city_lines_dict"]
+
+    @property
+    def city_station_to_line(self):
+        return self._tables["city_station_to_line"]
+
+    @property
+    def graphs(self):
+        return self._tables["graphs"]
+
+    @property
+    def station_index(self):
+        return self._tables["station_index"]
+
+    def route_table(self, city) -> MetroRouteTable:
+        """
+        The MetroRouteTable of `city`, built on first use and shared.
+        """
+        if city in self.city_list_chinese:
+            city = self.city_list[self.city_list_chinese.index(city)]
+        return get_data_store().get(
+            "metro_routes/" + city,
+            self.subway_path,
+            lambda _: MetroRouteTable(self.graphs[city]),
+        )
+
+    def find_shortest_path(self, city, start, end):
+        return self.route_table(city).path(start, end)
 
     def goto(self, city, start, end, start_time, transport_type, verbose=False):
         if transport_type not in ["walk", "metro", "taxi"]:
             return "only support transport_type in ['walk','metro','taxi']"
+        if verbose:
+            route = self._route(city, start, end, transport_type, verbose=True)
+        else:
+            key = (city, start, end, transport_type)
+            with self._route_memo_lock:
+                route = self._route_memo.get(key)
+                if route is not None:
+                    self._route_memo.move_to_end(key)
+            if route is None:
+                route = self._route(city, start, end, transport_type)
+                with self._route_memo_lock:
+                    self._route_memo[key] = route
+                    if len(self._route_memo) > self.route_memo_size:
+                        self._route_memo.popitem(last=False)
+        if isinstance(route, str):
+            return route
+        return apply_start_time(route, start_time)
+
+    def _route(self, city, start, end, transport_type, verbose=False):
+        """
+        Legs of the trip from `start` to `end` as
+        (start, end, mode, hours, cost, distance) tuples, independent of the
+        departure time, or "No solution".
+        """
         locationA = start
         locationB = end
         coordinate_A = self.poi_search.search(city, locationA)
         coordinate_B = self.poi_search.search(city, locationB)
-        city_cn = city
         if city in self.city_list_chinese:
             city = self.city_list[self.city_list_chinese.index(city)]
         locationA_name, locationB_name = locationA, locationB
         locationA, locationB = coordinate_A, coordinate_B
-        transports = []
         if transport_type == "walk":
             distance = geodesic(locationA, locationB).kilometers
             walking_speed = 5.0
             time = distance / walking_speed
             cost = 0.0
-            end_time = add_time(start_time, time)
-            transport = {
-                "start": locationA_name,
-                "end": locationB_name,
-                "mode": "walk",
-                "start_time": start_time,
-                "end_time": end_time,
-                "cost": cost,
-                "distance": distance,
-            }
-            transports.append(transport)
             if verbose:
                 print(
                     "Walk Distance {:.3} kilometers, Time {:.3} hour, Cost {}¥".format(
                         distance, time, int(cost)
                     )
                 )
-            return transports
+            return ((locationA_name, locationB_name, "walk", time, cost, distance),)
 
         elif transport_type == "taxi":
             distance = geodesic(locationA, locationB).kilometers
             taxi_speed = 40.0
             time = distance / taxi_speed
             cost = calculate_cost_taxi(distance)
-            end_time = add_time(start_time, time)
-            transport = {
-                "start": locationA_name,
-                "end": locationB_name,
-                "mode": "taxi",
-                "start_time": start_time,
-                "end_time": end_time,
-                "cost": round(cost, 2),
-                "distance": round(distance, 2),
-            }
-            transports.append(transport)
             if verbose:
                 print(
                     "Taxi Distance {:.3} kilometers, Time {:.2} hour, Cost {}¥".format(
                         distance, time, int(cost)
                     )
                 )
-            return transports
+            return (
+                (
+                    locationA_name,
+                    locationB_name,
+                    "taxi",
+                    time,
+                    round(cost, 2),
+                    round(distance, 2),
+                ),
+            )
 
         elif transport_type == "metro":
-            graph = self.graphs[city]
             stationA, distanceA = find_nearest_station(
-                locationA, self.city_stations_dict[city]
+                locationA, self.city_stations_dict[city], self.station_index[city]
             )
             stationB, distanceB = find_nearest_station(
-                locationB, self.city_stations_dict[city]
+                locationB, self.city_stations_dict[city], self.station_index[city]
             )
             if stationA == stationB:
                 if verbose:
                     print("Too near. Walk.")
                 return "No solution"
-                return self.goto(
-                    city_cn,
-                    locationA_name,
-                    locationB_name,
-                    start_time,
-                    transport_type="walk",
-                    verbose=verbose,
-                )
-            shortest_path = find_shortest_path(
-                graph, stationA["name"], stationB["name"]
-            )
             if stationA and stationB:
                 distance_between_stations = geodesic(
                     stationA["position"], stationB["position"]
@@ -276,47 +431,12 @@ class Transportation:
                 walking_speed = 5.0
                 timeA = distanceA / walking_speed
                 timeB = distanceB / walking_speed
-                total_time = timeA + time_between_stations + timeB
                 cost = calculate_cost(distance_between_stations)
-                distance = distanceA + distance_between_stations + distanceB
-                end_timeA = add_time(start_time, timeA)
-                end_timeB = add_time(end_timeA, time_between_stations)
-                end_time_final = add_time(end_timeB, timeB)
-                end_time = end_time_final
-                transports.append(
-                    {
-                        "start": locationA_name,
-                        "end": stationA["name"] + "-地铁站",
-                        "mode": "walk",
-                        "start_time": start_time,
-                        "end_time": end_timeA,
-                        "cost": 0,
-                        "distance": round(distanceA, 2),
-                    }
-                )
-                transports.append(
-                    {
-                        "start": stationA["name"] + "-地铁站",
-                        "end": stationB["name"] + "-地铁站",
-                        "mode": "metro",
-                        "start_time": end_timeA,
-                        "end_time": end_timeB,
-                        "cost": cost,
-                        "distance": round(distance_between_stations, 2),
-                    }
-                )
-                transports.append(
-                    {
-                        "start": stationB["name"] + "-地铁站",
-                        "end": locationB_name,
-                        "mode": "walk",
-                        "start_time": end_timeB,
-                        "end_time": end_time,
-                        "cost": 0,
-                        "distance": round(distanceB, 2),
-                    }
-                )
                 if verbose:
+                    # the station path is only reported, it does not change the plan
+                    shortest_path = self.find_shortest_path(
+                        city, stationA["name"], stationB["name"]
+                    )
                     print(
                         "Walk: From starting point to metro {}, Distance: {}.".format(
                             stationA["name"] + "-地铁站", distanceA
@@ -331,6 +451,31 @@ class Transportation:
                             stationB["name"] + "-地铁站", distanceB
                         )
                     )
-                return transports
+                return (
+                    (
+                        locationA_name,
+                        stationA["name"] + "-地铁站",
+                        "walk",
+                        timeA,
+                        0,
+                        round(distanceA, 2),
+                    ),
+                    (
+                        stationA["name"] + "-地铁站",
+                        stationB["name"] + "-地铁站",
+                        "metro",
+                        time_between_stations,
+                        cost,
+                        round(distance_between_stations, 2),
+                    ),
+                    (
+                        stationB["name"] + "-地铁站",
+                        locationB_name,
+                        "walk",
+                        timeB,
+                        0,
+                        round(distanceB, 2),
+                    ),
+                )
             else:
                 raise NotImplementedError
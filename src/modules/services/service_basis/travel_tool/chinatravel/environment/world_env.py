@@ -1,9 +1,12 @@
 import os
 import sys
+import copy
+import threading
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append("../..")
 from environment.tools import *
+import pandas as pd
 from pandas import DataFrame
 from typing import Any
 
@@ -112,6 +115,10 @@ class WorldEnv:
 
         self.results = []
 
+        # memo of the bulk (non-paginated) queries, keyed by the query arguments
+        self._bulk_cache = {}
+        self._bulk_lock = threading.Lock()
+
     def __call__(self, cmd_str: str):
         """
         Call the API by command string in the format of python function call.
@@ -166,6 +173,67 @@ class WorldEnv:
         """
         self.results = []
 
+    def for_request(self):
+        """
+        Return a view of the environment for one request: the APIs, data tables
+        and bulk memo are shared, the `results` history (used by next_page) is not.
+        """
+        env = copy.copy(self)
+        env.results = []
+        return env
+
+    def _bulk(self, key, compute):
+        res = self._bulk_cache.get(key)
+        if res is None:
+            res = compute()
+            with self._bulk_lock:
+                res = self._bulk_cache.setdefault(key, res)
+        return res
+
+    def poi_select_all(self, city: str, poi_type: str) -> DataFrame:
+        """
+        Return every accommodation / attraction / restaurant of `city` in one
+        DataFrame, i.e. `{poi_type}s_select(city, 'name', lambda x: True)` with
+        all of its pages concatenated. The result is memoized per city and
+        shared, do not modify it in place.
+        """
+        if poi_type == "accommodation":
+            api = self.accommodations
+        elif poi_type == "attraction":
+            api = self.attractions
+        elif poi_type == "restaurant":
+            api = self.restaurants
+        else:
+            raise NotImplementedError
+        return self._bulk(
+            ("poi", city, poi_type),
+            lambda: api.data[city].reset_index(drop=True),
+        )
+
+    def intercity_transport_select_all(
+        self, start_city: str, end_city: str, intercity_type: str
+    ) -> DataFrame:
+        """
+        Return every result of `intercity_transport_select` in one DataFrame,
+        or an empty DataFrame if the query fails. Memoized like
+        `poi_select_all`.
+        """
+
+        def compute():
+            try:
+                res = self.intercitytransport.select(
+                    start_city, end_city, intercity_type
+                )
+            except Exception:
+                return pd.DataFrame([])
+            if not isinstance(res, DataFrame):
+                return pd.DataFrame([])
+            return res.reset_index(drop=True)
+
+        return self._bulk(
+            ("intercity_transport", start_city, end_city, intercity_type), compute
+        )
+
 
 __doc__ = """
 
@@ -277,6 +345,13 @@ earliest_leave_time: The earliest leave time in the format 'HH:MM'.
 
 (17) Results[index] Results[index].next_page()
 Description: Get the result of the index or go to the next page of the result.
+
+Bulk APIs (called on the WorldEnv instance directly, not through the command string):
+WorldEnv.poi_select_all(city: str, poi_type: str)
+Description: Returns the whole accommodation / attraction / restaurant table of the city in one DataFrame.
+WorldEnv.intercity_transport_select_all(start_city: str, end_city: str, intercity_type: str)
+Description: Returns all the intercity transportation between two cities in one DataFrame.
+Both results are memoized per city and shared, so they must be treated as read-only.
 """
 
 
@@ -1,6 +1,16 @@
+from functools import lru_cache
+
 from chinatravel.environment.tools.accommodations.apis import Accommodations
 from chinatravel.environment.tools.restaurants.apis import Restaurants
 from chinatravel.environment.tools.attractions.apis import Attractions
+from chinatravel.environment.tools.transportation.apis import Transportation
+
+# the tables behind these instances are shared and loaded on first use, so the
+# lookups below are dict hits on the precomputed name indexes
+_accommodations = Accommodations()
+_restaurants = Restaurants()
+_attractions = Attractions()
+_transportation = Transportation()
 
 
 def day_count(plan):
@@ -85,16 +95,12 @@ def activity_time(activity):
 
 
 def poi_recommend_time(city, poi):
-    select = Attractions().select
-    attrction_info = select(city, key="name", func=lambda x: x == poi).iloc[0]
-    recommend_time = (attrction_info["recommendmintime"]) * 60
+    recommend_time = _attractions.name_recommend_time_map[city][poi] * 60
     return recommend_time
 
 
 def poi_distance(city, poi1, poi2, start_time="00:00", transport_type="walk"):
-    from chinatravel.environment.tools.transportation.apis import Transportation
-
-    goto = Transportation().goto
+    goto = _transportation.goto
     return goto(city, poi1, poi2, start_time, transport_type)[0]["distance"]
 
 
@@ -170,39 +176,17 @@ def room_type(activity):
 
 
 def restaurant_type(activity, target_city):
-    from chinatravel.environment.tools.restaurants.apis import Restaurants
-
-    restaurants = Restaurants()
-    select_food_type = restaurants.select(
-        target_city, key="name", func=lambda x: x == activity["position"]
-    )["cuisine"]
-    if not select_food_type.empty:
-        return select_food_type.iloc[0]
-    return "empty"
+    return _restaurants.name_cuisine_map[target_city].get(activity["position"], "empty")
 
 
 def attraction_type(activity, target_city):
-    from chinatravel.environment.tools.attractions.apis import Attractions
-
-    attractions = Attractions()
-    select_attr_type = attractions.select(
-        target_city, key="name", func=lambda x: x == activity["position"]
-    )["type"]
-    if not select_attr_type.empty:
-        return select_attr_type.iloc[0]
-    return ""
+    return _attractions.name_type_map[target_city].get(activity["position"], "")
 
 
 def accommodation_type(activity, target_city):
-    from chinatravel.environment.tools.accommodations.apis import Accommodations
-
-    accommodations = Accommodations()
-    select_hotel_type = accommodations.select(
-        target_city, key="name", func=lambda x: x == activity["position"]
-    )["featurehoteltype"]
-    if not select_hotel_type.empty:
-        return select_hotel_type.iloc[0]
-    return ""
+    return _accommodations.name_hotel_type_map[target_city].get(
+        activity["position"], ""
+    )
 
 
 def innercity_transport_type(transports):
@@ -277,3 +261,52 @@ func_dict = {
     "intercity_transport_destination": intercity_transport_destination, 
     "innercity_transport_time": innercity_transport_time,
 }
+
+
+# 按 plan 派生、在同一 plan 的所有约束之间共享的概念
+_PLAN_CONCEPTS = (
+    "day_count",
+    "people_count",
+    "start_city",
+    "target_city",
+    "allactivities",
+    "allactivities_count",
+    "dayactivities",
+)
+
+
+@lru_cache(maxsize=4096)
+def compile_concept_code(source, filename="<hard_logic_py>"):
+    """
+    编译 hard_logic_py / preference 代码，相同源码只编译一次
+    :raises SyntaxError: 源码无法编译
+    """
+    return compile(source, filename, "exec")
+
+
+def plan_namespace(plan):
+    """
+    构建对 plan 执行约束代码的命名空间：func_dict 的浅拷贝加上 "plan"。
+    _PLAN_CONCEPTS 中的函数以 plan 为参数时只计算一次，结果在由该命名空间复制出的所有命名空间之间共享；
+    列表结果返回副本，约束代码修改返回值不会影响其它约束。
+    每条约束执行前应再浅拷贝一次（dict(namespace)），避免约束之间共享局部变量。
+    """
+    namespace = dict(func_dict)
+    cache = {}
+
+    def shared(name, func):
+        def concept(p, *args):
+            if p is not plan:
+                return func(p, *args)
+            key = (name,) + args
+            if key not in cache:
+                cache[key] = func(p, *args)
+            value = cache[key]
+            return list(value) if isinstance(value, list) else value
+
+        return concept
+
+    for name in _PLAN_CONCEPTS:
+        namespace[name] = shared(name, func_dict[name])
+    namespace["plan"] = plan
+    return namespace
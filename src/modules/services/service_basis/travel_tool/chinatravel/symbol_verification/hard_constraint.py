@@ -7,7 +7,11 @@ from chinatravel.environment.tools.attractions.apis import Attractions
 from chinatravel.environment.tools.intercity_transport.apis import IntercityTransport
 from chinatravel.environment.tools.transportation.apis import Transportation
 
-from chinatravel.symbol_verification.concept_func import func_dict
+from chinatravel.symbol_verification.concept_func import (
+    func_dict,
+    compile_concept_code,
+    plan_namespace,
+)
 from chinatravel.evaluation.utils import load_json_file
 
 import pandas as pd
@@ -416,15 +420,16 @@ for activity in allactivities(plan):
         print(innercity_transport_type(activity_transports(activity)), metro_tickets(activity_transports(activity)))
 """
     # hard_logic_py.append(debug_logic_py)
+    # concepts derived from the plan are computed once and shared by all constraints
+    namespace = plan_namespace(plan)
     for constraint in hard_logic_py:
-        vars_dict = deepcopy(func_dict)
-        vars_dict["plan"] = plan
+        vars_dict = dict(namespace)
         # exec(constraint, {"__builtins__": {"set": set, "print": print}}, vars_dict)
         # results.append(vars_dict.get("result", False))
         try:
             # Evaluate the constraint in a safe manner
             exec(
-                constraint,
+                compile_concept_code(constraint),
                 {
                     "__builtins__": {
                         "set": set,
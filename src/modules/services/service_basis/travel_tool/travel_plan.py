@@ -1,6 +1,7 @@
 import sys
 import time
 import os
+import uuid
 
 if __name__ == "__main__":
     import sys, os
@@ -44,10 +45,10 @@ travelplan_desc = '''
 # travelplan_desc = '''旅行规划：本接口为用户定制个性化的旅游方案，其囊括旅行途中每一天的交通、景点、餐馆和酒店。本接口无需输入，因此Action_Input填None即可。'''
 
 class TravelPlan(Tool):
-    def __init__(self, name="旅行规划", description=travelplan_desc, llm="deepseek"):
+    def __init__(self, name="旅行规划", description=travelplan_desc, llm="deepseek", parallel_search_workers=None):
         super().__init__(name, description)
 
-        env = WorldEnv()    # Question: 这个WorldEnv()是用来干嘛的？
+        # WorldEnv 只是共享数据表（TravelDataStore）之上的一层轻量封装，直接复用模块级实例即可
 
         if llm == "deepseek":
             llm = Deepseek()
@@ -58,19 +59,26 @@ class TravelPlan(Tool):
 
         cache_dir = "cache"
 
-        self.agent = NesyAgent(env=env, backbone_llm=llm, cache_dir=cache_dir, search_width=30, debug=True, method="NeSy")
+        # parallel_search_workers: 并行搜索顶层分支的进程数，None 表示顺序搜索
+        self.agent = NesyAgent(
+            env=env, backbone_llm=llm, cache_dir=cache_dir, search_width=30, debug=True, method="NeSy",
+            parallel_search_workers=parallel_search_workers,
+        )
 
     def __call__(self, parameter: dict, user_info: UserInfo, history: list) -> dict:
         beg_time = time.time()
         query = {
-            "uid": f"test_{len(history)-1}t", 
+            # uid 决定日志与翻译缓存的文件名：每次调用唯一，并发的请求（包括同一用户的多个对话）不会写同一个文件，
+            # 也不把用户输入的 id 拼进文件路径
+            "uid": uuid.uuid4().hex,
             "nature_language": parameter.get('用户需求'),
             "start_city": parameter.get('出发城市'),
             "target_city": parameter.get('目标城市'),
             "days": parameter.get('游玩天数'),
             "people_number": parameter.get('人数')
         }
-        succ, plan = self.agent.run(query, load_cache=False, oralce_translation=False)
+        # self.agent 只作为原型，每次调用在独立的上下文中搜索，可并发调用
+        succ, plan = self.agent.for_request().run(query, load_cache=False, oralce_translation=False)
         end_time = time.time()
         print(f"本次规划耗时：{end_time-beg_time:.3f}s")
 
@@ -1,29 +1,67 @@
 import os, sys
-import numpy as np
+import time
+import threading
+import concurrent.futures
 import Levenshtein
 from src.utils.root_path import get_root_path
 if str(get_root_path()) not in sys.path:
     sys.path.append(str(get_root_path()))
 PATH_TO_ROOT = get_root_path()
 import requests, re, json
+from requests.adapters import HTTPAdapter
 from src.modules.services.service_basis.basis.tool import Tool
 from src.modules.services.service_basis.user_info import UserInfo
+from src.modules.services.service_basis.fuzzy_index import FuzzyIndex
 
 city_file_path = PATH_TO_ROOT / 'dataset' / 'public' / 'citycode.json'
 
 weatherquery_desc = '''天气查询：本接口用于查询天气。接口输入格式：{"城市名":<用户想要查询的城市名>, "日期":<用户希望查询的日期>}，其中<日期>格式应该形如："2025-06-07"（月和日均为两位数）'''
 
+# 高德天气预报一天更新数次，默认缓存 30 分钟
+DEFAULT_FORECAST_TTL = 30 * 60
+# (连接超时, 读取超时)，单位秒
+DEFAULT_TIMEOUT = (3.05, 10)
+
+
 class WeatherQuery(Tool):
-    def __init__(self, name="天气查询", description=weatherquery_desc):
+    def __init__(self, name="天气查询", description=weatherquery_desc,
+                 url: str = "https://restapi.amap.com/v3/weather/weatherInfo",
+                 cache_ttl: float = DEFAULT_FORECAST_TTL, timeout=DEFAULT_TIMEOUT,
+                 session: requests.Session | None = None):
+        """
+        :param url: 天气预报接口地址
+        :param cache_ttl: 每个城市（adcode）预报结果的缓存时间（秒），0 表示不缓存
+        :param timeout: requests 的超时参数
+        :param session: 复用连接的 requests.Session，默认新建一个，所有请求共享
+        """
         super().__init__(name, description)
 
-        self.url = "https://restapi.amap.com/v3/weather/weatherInfo"
+        self.url = url
         self.key = "0239a191dae57fa5074ddf229bd93510" # os.environ.get('amapKey', '')
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        # adcode -> (过期时间, 预报列表)
+        self._forecasts: dict[str, tuple[float, list]] = {}
+        # adcode -> 正在进行的上游请求，同一城市的并发查询共用一次请求
+        self._inflight: dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
 
         with open(city_file_path, 'r', encoding="utf-8") as f:
             self.urlCity = json.load(f)
         self.city_list = self._getCity()
         self.city_names = [city['name'] for city in self.city_list]
+        self.city_index = FuzzyIndex(self.city_names)
+        # 城市名 -> adcode，同名城市取第一个
+        self.adcode_by_name = {}
+        for city in self.city_list:
+            self.adcode_by_name.setdefault(city['name'], city['adcode'])
 
     def _getCity(self):
         city = []
@@ -41,70 +79,112 @@ class WeatherQuery(Tool):
         return 1 - (distance / max_len)
 
     def fuzzy_search(self, query_city: str):
-        scores = []
-        for city_name in self.city_names:
-            score = self.normalized_similarity(query_city, city_name)
-            scores.append(score)
-        sorted_idx = np.array(scores).argsort().tolist()[::-1]
-        return [self.city_names[idx] for idx in sorted_idx[:5]]
+        """
+        按归一化相似度（normalized_similarity）返回最接近的 5 个城市名
+        """
+        return self.city_index.nearest_names(query_city, k=5, normalized=True)
+
+    def fuzzy_search_many(self, query_cities: list[str]) -> list[list[str]]:
+        """
+        fuzzy_search 的批量版本
+        """
+        return [
+            [self.city_names[idx] for idx, _ in matches]
+            for matches in self.city_index.nearest_many(query_cities, k=5, normalized=True)
+        ]
+
+
+    def get_forecasts(self, adcode: str) -> list | None:
+        """
+        查询某个城市的预报列表（带缓存），同一 adcode 的并发查询只向上游发送一次请求
+        :param adcode: 城市编码
+        :return: 高德接口返回的 casts 列表；接口返回失败状态时为 None（不缓存）
+        :raises requests.RequestException: 网络错误或超时
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._forecasts.get(adcode)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            future = self._inflight.get(adcode)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[adcode] = future
+        if not leader:
+            return future.result()
 
+        try:
+            forecasts = self._fetch_forecasts(adcode)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[adcode]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if forecasts is not None and self.cache_ttl > 0:
+                self._forecasts[adcode] = (time.monotonic() + self.cache_ttl, forecasts)
+            del self._inflight[adcode]
+        future.set_result(forecasts)
+        return forecasts
+
+    def _fetch_forecasts(self, adcode: str) -> list | None:
+        response = self.session.get(
+            self.url, params={"key": self.key, "city": adcode, "extensions": "all"}, timeout=self.timeout
+        )
+        data = response.json()
+        if data['status'] == '1' and 'forecasts' in data:
+            return data['forecasts'][0]['casts']
+        return None
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._forecasts.clear()
+
+    @staticmethod
+    def _format_forecast(forecast: dict) -> dict:
+        return {
+            "日期": forecast['date'],
+            "星期": forecast['week'],
+            "白天天气": forecast['dayweather'],
+            "夜间天气": forecast['nightweather'],
+            "白天温度": forecast['daytemp'] + "°C",
+            "夜间温度": forecast['nighttemp'] + "°C",
+            "白天风向": forecast['daywind'],
+            "夜间风向": forecast['nightwind'],
+            "白天风力": forecast['daypower'],
+            "夜间风力": forecast['nightpower'],
+        }
 
     def __call__(self, parameter: dict, user_info: UserInfo, history: list) -> dict:
         info = {}
 
-        adcode = list(filter(lambda d: d["name"] == parameter['城市名'], self.city_list))
-        if len(adcode) == 0:
+        adcode = self.adcode_by_name.get(parameter['城市名'])
+        if adcode is None:
             info["错误"] = f"查询失败，{parameter['城市名']}不是一个合法的城市名！你可能想查询的是：{'、'.join(self.fuzzy_search(parameter['城市名']))}。"
         else:
-            adcode = adcode[0]['adcode']
-            
-            # 构建API请求URL
-            url = f"{self.url}?key={self.key}&city={adcode}&extensions=all"
-            
             try:
-                response = requests.get(url)
-                data = response.json()
-                
-                if data['status'] == '1' and 'forecasts' in data:
-                    forecasts = data['forecasts'][0]['casts']
-                    
+                forecasts = self.get_forecasts(adcode)
+
+                if forecasts is not None:
                     # 获取请求的日期，如果没有指定日期则返回今天的天气
                     target_date = parameter.get('日期', None)
-                    
+
                     if target_date:
                         # 查找指定日期的天气
                         for forecast in forecasts:
                             if forecast['date'] == target_date:
-                                info["日期"] = forecast['date']
-                                info["星期"] = forecast['week']
-                                info["白天天气"] = forecast['dayweather']
-                                info["夜间天气"] = forecast['nightweather']
-                                info["白天温度"] = forecast['daytemp'] + "°C"
-                                info["夜间温度"] = forecast['nighttemp'] + "°C"
-                                info["白天风向"] = forecast['daywind']
-                                info["夜间风向"] = forecast['nightwind']
-                                info["白天风力"] = forecast['daypower']
-                                info["夜间风力"] = forecast['nightpower']
+                                info.update(self._format_forecast(forecast))
                                 break
                         else:
                             info["错误"] = f"未找到{target_date}的天气预报数据"
                     else:
                         # 返回今天的天气
                         if forecasts:
-                            forecast = forecasts[0]
-                            info["日期"] = forecast['date']
-                            info["星期"] = forecast['week']
-                            info["白天天气"] = forecast['dayweather']
-                            info["夜间天气"] = forecast['nightweather']
-                            info["白天温度"] = forecast['daytemp'] + "°C"
-                            info["夜间温度"] = forecast['nighttemp'] + "°C"
-                            info["白天风向"] = forecast['daywind']
-                            info["夜间风向"] = forecast['nightwind']
-                            info["白天风力"] = forecast['daypower']
-                            info["夜间风力"] = forecast['nightpower']
+                            info.update(self._format_forecast(forecasts[0]))
                 else:
                     info["错误"] = f"获取{parameter['城市名']}天气信息失败"
-                    
+
             except Exception as e:
                 info["错误"] = f"天气查询服务异常：{str(e)}"
 
@@ -1,5 +1,6 @@
 from .root_path import *
 from .response import *
 from .chatgpt import *
+from .ttl_cache import *
 from .auth_dependency import *
 
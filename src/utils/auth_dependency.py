@@ -1,6 +1,9 @@
 from fastapi import Header, HTTPException, status
 from typing import Optional
+import hashlib
+import time
 import jwt
+from .ttl_cache import TTLLRUCache
 
 #todo： 替换为更安全的密钥管理方式
 SECRET_KEY = "your_secret_key"
@@ -15,18 +18,79 @@ def encode_user_id(user_id: str) -> str:
     payload = {"user_id": user_id}
     token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     return token
-def decode_user_id(token: str) -> str:
+
+
+class VerifiedTokenCache:
+    """
+    已通过签名校验的 token 缓存（LRU），以 token 的 SHA-256 为键，命中时跳过 jwt.decode。
+
+    只缓存校验成功的 token；带 exp 的 token 在过期时间之后不再命中。
+    更换 SECRET_KEY 后需调用 clear()。
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: 最多缓存的 token 数
+        :raises ValueError: 参数非法
+        """
+        self._cache = TTLLRUCache(max_size)
+        self.max_size = max_size
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> str | None:
+        """
+        :return: 缓存的 user_id；未命中或已过期时返回 None
+        """
+        return self._cache.get(self._key(token))
+
+    def put(self, token: str, user_id: str, expires_at: float | None = None) -> None:
+        """
+        :param expires_at: token 的过期时间戳（exp），None 表示不过期
+        """
+        ttl = None
+        if expires_at is not None:
+            ttl = expires_at - time.time()
+            if ttl <= 0:
+                return
+        self._cache.put(self._key(token), user_id, ttl)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: {"hits", "misses", "size", "hit_rate"}
+        """
+        return self._cache.stats()
+
+
+verified_token_cache = VerifiedTokenCache()
+
+
+def decode_user_id(token: str, cache: VerifiedTokenCache | None = verified_token_cache) -> str:
     """
     解码 JWT token 获取用户 ID
     :param token: JWT token 字符串
+    :param cache: 已校验 token 的缓存，None 表示每次都校验签名
     :return: 用户 ID
     :raises HTTPException: 如果 token 无效或解码失败
     """
+    if cache is not None:
+        user_id = cache.get(token)
+        if user_id is not None:
+            return user_id
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("user_id")
     except jwt.PyJWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user_id = payload.get("user_id")
+    if cache is not None and user_id:
+        exp = payload.get("exp")
+        cache.put(token, user_id, float(exp) if exp is not None else None)
+    return user_id
     
 
 def get_current_user(Authorization: Optional[str] = Header(None)) -> str:
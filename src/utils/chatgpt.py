@@ -1,6 +1,10 @@
-from openai import OpenAI
+import asyncio
+import threading
+import weakref
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
 from openai.types.chat import ChatCompletionUserMessageParam
-from typing import Iterable, Callable, Any
+from typing import Iterable, AsyncIterable, Callable, Any
 from src.utils.root_path import get_root_path
 from config.loadConfig import ConfigLoader
 
@@ -22,17 +26,114 @@ def get_llm_config() -> dict:
     return _llm_config_cache
 
 
-def feed_LLM_full(history: list) -> Iterable:
+# 连接池 / 超时的默认值，可在 config.yaml 的 llm 段中覆盖：
+# llm:
+#   timeout: 60                    # 单次请求总超时（秒）
+#   connect_timeout: 10            # 建立连接超时（秒）
+#   max_connections: 100           # 连接池最大连接数
+#   max_keepalive_connections: 20  # 保持 keep-alive 的空闲连接数
+#   keepalive_expiry: 30           # 空闲连接保留时间（秒）
+#   max_retries: 2                 # SDK 自动重试次数
+_default_client_config = {
+    "timeout": 60.0,
+    "connect_timeout": 10.0,
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "max_retries": 2,
+}
+
+# 共享的 LLM 客户端：同步客户端进程内唯一；异步客户端的连接池绑定事件循环，按事件循环各建一个
+_client_lock = threading.Lock()
+_sync_client = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _get_client_config() -> dict:
     """
-    根据历史记录生成回复
-    :param history: 历史记录列表
-    :return: 返回一个生成器对象，迭代获取每个流式响应块（chunk），每个chunk为OpenAI API的响应对象
+    合并默认值与 llm 配置中的连接池 / 超时参数
+    :return: 返回完整的客户端配置字典
     """
     llm_config = get_llm_config()
-    client = OpenAI(
-        api_key=llm_config.get("api_key"),
-        base_url=llm_config.get("base_url"),
+    return {k: llm_config.get(k, v) for k, v in _default_client_config.items()}
+
+
+def _client_kwargs() -> dict:
+    """
+    构造 OpenAI / AsyncOpenAI 的公共参数（不含 http_client）
+    """
+    llm_config = get_llm_config()
+    client_config = _get_client_config()
+    return {
+        "api_key": llm_config.get("api_key"),
+        "base_url": llm_config.get("base_url"),
+        "timeout": httpx.Timeout(client_config["timeout"], connect=client_config["connect_timeout"]),
+        "max_retries": client_config["max_retries"],
+    }
+
+
+def _http_limits() -> httpx.Limits:
+    client_config = _get_client_config()
+    return httpx.Limits(
+        max_connections=client_config["max_connections"],
+        max_keepalive_connections=client_config["max_keepalive_connections"],
+        keepalive_expiry=client_config["keepalive_expiry"],
     )
+
+
+def get_llm_client() -> OpenAI:
+    """
+    获取共享的同步 LLM 客户端（首次调用时创建），复用连接池与 TLS 连接
+    :return: OpenAI 客户端
+    """
+    global _sync_client
+    if _sync_client is None:
+        with _client_lock:
+            if _sync_client is None:
+                kwargs = _client_kwargs()
+                _sync_client = OpenAI(
+                    http_client=DefaultHttpxClient(limits=_http_limits(), timeout=kwargs["timeout"]),
+                    **kwargs,
+                )
+    return _sync_client
+
+
+def get_async_llm_client() -> AsyncOpenAI:
+    """
+    获取当前事件循环共享的异步 LLM 客户端（首次调用时创建）
+    :return: AsyncOpenAI 客户端
+    :raises RuntimeError: 如果不在事件循环中调用
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _client_lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                kwargs = _client_kwargs()
+                client = AsyncOpenAI(
+                    http_client=DefaultAsyncHttpxClient(limits=_http_limits(), timeout=kwargs["timeout"]),
+                    **kwargs,
+                )
+                _async_clients[loop] = client
+    return client
+
+
+def reset_llm_clients():
+    """
+    丢弃已创建的共享客户端与配置缓存（配置变更或测试时使用），下次调用时重新创建
+    """
+    global _sync_client, _llm_config_cache
+    with _client_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+        _sync_client = None
+        _async_clients.clear()
+        _llm_config_cache = None
+
+
+def _chat_create_kwargs(history: list) -> dict:
+    llm_config = get_llm_config()
     messages = [ChatCompletionUserMessageParam(role=msg["role"], content=msg["content"]) for msg in history]
     model = llm_config.get("model") or "qwen3-235b-a22b-instruct-2507"
     stop = llm_config.get("stop")
@@ -44,9 +145,31 @@ def feed_LLM_full(history: list) -> Iterable:
     }
     if stop is not None:
         create_kwargs["stop"] = stop
-    completion = client.chat.completions.create(**create_kwargs)
+    return create_kwargs
+
+
+def feed_LLM_full(history: list) -> Iterable:
+    """
+    根据历史记录生成回复
+    :param history: 历史记录列表
+    :return: 返回一个生成器对象，迭代获取每个流式响应块（chunk），每个chunk为OpenAI API的响应对象
+    """
+    client = get_llm_client()
+    completion = client.chat.completions.create(**_chat_create_kwargs(history))
+    return completion
+
+
+async def afeed_LLM_full(history: list) -> AsyncIterable:
+    """
+    feed_LLM_full 的异步版本，等待模型输出时不阻塞事件循环
+    :param history: 历史记录列表
+    :return: 返回一个异步迭代器，逐个产出流式响应块（chunk）
+    """
+    client = get_async_llm_client()
+    completion = await client.chat.completions.create(**_chat_create_kwargs(history))
     return completion
 
+
 def feed_LLM(prompt: str) -> Iterable:
         """
         根据提示词生成回复
@@ -54,10 +177,7 @@ def feed_LLM(prompt: str) -> Iterable:
         :return: 返回一个生成器对象，迭代获取每个流式响应块（chunk），每个chunk为OpenAI API的响应对象
         """
         llm_config = get_llm_config()
-        client = OpenAI(
-            api_key=llm_config.get("api_key"),
-            base_url=llm_config.get("base_url"),
-        )
+        client = get_llm_client()
         messages = [ChatCompletionUserMessageParam(role="user", content=prompt)]
         completion = client.chat.completions.create(
             model=llm_config.get("model") or "qwen3-235b-a22b-instruct-2507",
@@ -80,3 +200,15 @@ def gather_llm_output(fn):
         return completion
     return wrapper
 
+
+def agather_llm_output(fn):
+    """
+    装饰器：gather_llm_output 的异步版本，fn 为返回异步流的协程函数（如 afeed_LLM_full）
+    """
+    async def wrapper(*args, **kwargs):
+        completion = ''
+        async for chunk in await fn(*args, **kwargs):
+            completion += chunk.choices[0].delta.content or ''
+        return completion
+    return wrapper
+
@@ -0,0 +1,95 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLLRUCache:
+    """
+    线程安全的进程内缓存（LRU + TTL），并统计命中率。
+
+    条目过期后在下次读取时删除；超出 max_size 时淘汰最久未使用的条目。
+    on_remove 在条目因过期、淘汰、覆盖或 pop 被删除时调用（持有 lock），
+    供调用方维护自己的二级索引；需要把多次操作作为一个整体时可以直接持有 lock（可重入）。
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None,
+                 on_remove: Callable[[Hashable, Any], None] | None = None):
+        """
+        :param max_size: 最多缓存的条目数
+        :param ttl: 默认有效期（秒），None 表示不过期
+        :param on_remove: 条目被删除时的回调 (key, value)
+        :raises ValueError: 参数非法
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_remove = on_remove
+        self.hits = 0
+        self.misses = 0
+        # key -> (过期时间（time.monotonic），value)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.lock = threading.RLock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        :return: 缓存的值；未命中或已过期时返回 None
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        :param ttl: 本条目的有效期（秒），None 表示使用默认的 ttl
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = float("inf") if ttl is None else time.monotonic() + ttl
+        with self.lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def pop(self, key: Hashable) -> None:
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and self.on_remove is not None:
+            self.on_remove(key, entry[1])
+
+    def clear(self) -> None:
+        """
+        清空缓存，不调用 on_remove
+        """
+        with self.lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: {"hits", "misses", "size", "hit_rate"}
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import MagicMock, patch
 from src.modules.services.agent.agent import Agent
@@ -75,6 +76,149 @@ def test_agent_tool_call(monkeypatch):
     assert hasattr(echo_tool, "last_call")
     assert echo_tool.last_call[0] == {"msg": "hi"}
 
+def test_agent_acall(monkeypatch):
+    import asyncio
+    import src.modules.services.service_basis.user_info as user_info_mod
+    monkeypatch.setattr(user_info_mod.UserInfo, "parse_user_info", lambda self: [{"mock": "data"}])
+    registry = Registry()
+    echo_tool = EchoTool()
+    registry.register(echo_tool)
+    mock_record_business = MagicMock()
+    mock_record_business.list_records_by_conversation.return_value = []
+    agent = Agent(
+        user_id="test_user",
+        conversation_id="conv_1",
+        record_business=mock_record_business,
+        tools=registry,
+        prompt_template="Prompt: {str_tool_description} {date} {tool_names}"
+    )
+    llm_outputs = [
+        "Thought: think\nAction: echo\nAction Input: {\"msg\": \"hi\"}",
+        "Thought: t\nFinal Answer: {\"answer\": \"ok\", \"picture\": []}"
+    ]
+    async def fake_allm(messages):
+        return llm_outputs.pop(0)
+    monkeypatch.setattr(agent, "allm", fake_allm)
+    result = asyncio.run(agent.acall("你好"))
+    assert result["system_response"] == "ok"
+    assert echo_tool.last_call[0] == {"msg": "hi"}
+    mock_record_business.create_record.assert_called_once()
+
+def test_agent_astream_call(monkeypatch):
+    import asyncio
+    import src.modules.services.service_basis.user_info as user_info_mod
+    monkeypatch.setattr(user_info_mod.UserInfo, "parse_user_info", lambda self: [{"mock": "data"}])
+    registry = Registry()
+    echo_tool = EchoTool()
+    registry.register(echo_tool)
+    mock_record_business = MagicMock()
+    mock_record_business.list_records_by_conversation.return_value = []
+    agent = Agent(
+        user_id="test_user",
+        conversation_id="conv_1",
+        record_business=mock_record_business,
+        tools=registry,
+        prompt_template="Prompt: {str_tool_description} {date} {tool_names}"
+    )
+    llm_outputs = [
+        ["Thought: think\nAction: echo\n", "Action Input: {\"msg\": \"hi\"}"],
+        ["Thought: t\nFinal Answer: {\"answer\": \"ok\", \"picture\": []}"]
+    ]
+    def make_chunk(content):
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = content
+        return chunk
+    async def fake_afeed(messages):
+        async def stream():
+            for piece in llm_outputs.pop(0):
+                yield make_chunk(piece)
+        return stream()
+    monkeypatch.setattr("src.modules.services.agent.agent.afeed_LLM_full", fake_afeed)
+
+    async def collect():
+        return [event async for event in agent.astream_call("你好")]
+    events = asyncio.run(collect())
+    types = [event["type"] for event in events]
+    assert types == ["token", "token", "tool_start", "tool_result", "token", "final_answer"]
+    assert events[2]["input"] == {"msg": "hi"}
+    assert events[3]["result"] == json.dumps("tool_output")
+    assert events[-1]["content"]["answer"] == "ok"
+
+class SlowEchoTool(Tool):
+    def __init__(self, name, seconds):
+        super().__init__(name=name, description="Slow echo tool for test")
+        self.seconds = seconds
+    def __call__(self, parameter, user_info, history):
+        import time
+        time.sleep(self.seconds)
+        return {"tool": self.name, "parameter": parameter}
+
+def _multi_action_agent(monkeypatch):
+    import src.modules.services.service_basis.user_info as user_info_mod
+    from src.modules.services.agent.tool_executor import ToolExecutor
+    monkeypatch.setattr(user_info_mod.UserInfo, "parse_user_info", lambda self: [{"mock": "data"}])
+    registry = Registry()
+    registry.register(SlowEchoTool("weather", 0.3))
+    registry.register(SlowEchoTool("ticket", 0.3))
+    registry.register(SlowEchoTool("stuck", 2))
+    mock_record_business = MagicMock()
+    mock_record_business.list_records_by_conversation.return_value = []
+    return Agent(
+        user_id="test_user",
+        conversation_id="conv_1",
+        record_business=mock_record_business,
+        tools=registry,
+        prompt_template="Prompt: {str_tool_description} {date} {tool_names}",
+        tool_executor=ToolExecutor(max_workers=4, timeouts={"stuck": 0.2})
+    )
+
+MULTI_ACTION = (
+    "Thought: think\n"
+    "Action: weather\nAction Input: {\"city\": \"北京\"}\n"
+    "Action: ticket\nAction Input: {\"from\": \"北京\"}\n"
+    "Action: stuck\nAction Input: {}"
+)
+
+def test_agent_parallel_actions(monkeypatch):
+    import time
+    agent = _multi_action_agent(monkeypatch)
+    llm_outputs = [MULTI_ACTION, "Thought: t\nFinal Answer: {\"answer\": \"ok\", \"picture\": []}"]
+    monkeypatch.setattr(agent, "llm", lambda x: llm_outputs.pop(0))
+    started = time.monotonic()
+    result = agent("你好")
+    assert time.monotonic() - started < 0.9
+    assert result["system_response"] == "ok"
+    observation = agent.state.get_context()[0]["observation"].split("\n")
+    assert observation[0].startswith("[1] weather: ") and "北京" in observation[0]
+    assert observation[1].startswith("[2] ticket: ")
+    assert observation[2].startswith("[3] stuck: ") and "timed out" in observation[2]
+
+def test_agent_astream_parallel_actions(monkeypatch):
+    import asyncio
+    agent = _multi_action_agent(monkeypatch)
+    llm_outputs = [[MULTI_ACTION], ["Thought: t\nFinal Answer: {\"answer\": \"ok\", \"picture\": []}"]]
+    def make_chunk(content):
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = content
+        return chunk
+    async def fake_afeed(messages):
+        async def stream():
+            for piece in llm_outputs.pop(0):
+                yield make_chunk(piece)
+        return stream()
+    monkeypatch.setattr("src.modules.services.agent.agent.afeed_LLM_full", fake_afeed)
+
+    async def collect():
+        return [event async for event in agent.astream_call("你好")]
+    events = asyncio.run(collect())
+    assert [event["type"] for event in events] == [
+        "token", "tool_start", "tool_start", "tool_start",
+        "tool_result", "tool_result", "tool_error", "token", "final_answer"
+    ]
+    assert [event["tool"] for event in events[4:7]] == ["weather", "ticket", "stuck"]
+
 if __name__ == "__main__":
     pytest.main([__file__])
 
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import MagicMock
+from src.modules.services.agent.state import State
+from src.modules.services.agent.history_cache import HistoryCache
+from src.modules.services.dto.dto import DialogueRecordDTO
+
+
+def _record(i: int) -> DialogueRecordDTO:
+    return DialogueRecordDTO(
+        id=f"r{i}", conversation_id="conv_1", user_id="u1",
+        user_query=f"q{i}", system_response=f"a{i}",
+    )
+
+
+@pytest.fixture
+def record_business():
+    business = MagicMock()
+    business.list_records_by_conversation.return_value = [_record(0), _record(1)]
+    return business
+
+
+def test_history_loaded_once_per_turn(record_business):
+    state = State("u1", "conv_1", record_business)
+    state.init_query("hello")
+    first = state.get_history()
+    second = state.get_history()
+    assert first == second
+    assert [m["content"] for m in first] == ["q0", "a0", "q1", "a1"]
+    assert record_business.list_records_by_conversation.call_count == 1
+    assert (state.history_hits, state.history_misses) == (1, 1)
+
+    # 新一轮对话重新加载
+    state.init_query("again")
+    state.get_history()
+    assert record_business.list_records_by_conversation.call_count == 2
+
+
+def test_history_lookup_error(record_business):
+    record_business.list_records_by_conversation.side_effect = LookupError
+    state = State("u1", "conv_1", record_business)
+    state.init_query("hello")
+    assert state.get_history() == []
+    assert state.get_history() == []
+    assert record_business.list_records_by_conversation.call_count == 1
+
+
+def test_shared_cache_across_requests(record_business):
+    cache = HistoryCache(max_size=8, ttl=60)
+    for _ in range(3):
+        state = State("u1", "conv_1", record_business, history_cache=cache)
+        state.init_query("hello")
+        state.get_history()
+    assert record_business.list_records_by_conversation.call_count == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_save_to_db_invalidates(record_business):
+    cache = HistoryCache()
+    state = State("u1", "conv_1", record_business, history_cache=cache)
+    state.init_query("hello")
+    state.get_history()
+    state.set_final_answer({"thought": "t", "answer": "ok", "picture": []})
+    state.save_to_db()
+    record_business.create_record.assert_called_once()
+    assert cache.get("conv_1") is None
+
+    state.get_history()
+    assert record_business.list_records_by_conversation.call_count == 2
+
+
+def test_returned_history_is_a_copy(record_business):
+    cache = HistoryCache()
+    state = State("u1", "conv_1", record_business, history_cache=cache)
+    state.init_query("hello")
+    history = state.get_history()
+    history.append({"role": "user", "content": "x"})
+    history[0]["content"] = "changed"
+    assert len(state.get_history()) == 4
+    assert cache.get("conv_1")[0]["content"] == "q0"
+
+
+def test_cache_lru_and_ttl(monkeypatch):
+    import src.utils.ttl_cache as mod
+    now = [100.0]
+    monkeypatch.setattr(mod.time, "monotonic", lambda: now[0])
+    cache = HistoryCache(max_size=2, ttl=10)
+    cache.put("a", [{"role": "user", "content": "a"}])
+    cache.put("b", [])
+    assert cache.get("a") is not None
+    cache.put("c", [])
+    # b 最久未使用，被淘汰
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert len(cache) == 0
+
+
+def test_cache_rejects_bad_config():
+    with pytest.raises(ValueError):
+        HistoryCache(max_size=0)
+    with pytest.raises(ValueError):
+        HistoryCache(ttl=0)
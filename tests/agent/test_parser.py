@@ -0,0 +1,41 @@
+from src.modules.services.agent.parser import LLMOutputParser
+
+
+def test_single_action():
+    parsed = LLMOutputParser.parse_thought_action('Thought: t\nAction: echo\nAction Input: {"msg": "hi"}')
+    assert parsed["action"] == "echo"
+    assert parsed["action_input"] == {"msg": "hi"}
+    assert parsed["actions"] == [{"action": "echo", "action_input": {"msg": "hi"}}]
+
+
+def test_multiple_actions():
+    text = (
+        "Thought: 需要两个城市的天气和车票\n"
+        'Action: WeatherQuery\nAction Input: {"city": "北京"}\n'
+        'Action: WeatherQuery\nAction Input: {"city": "上海"}\n'
+        "Action: TicketQuery\nAction Input: {}"
+    )
+    parsed = LLMOutputParser.parse_thought_action(text)
+    assert [(a["action"], a["action_input"]) for a in parsed["actions"]] == [
+        ("WeatherQuery", {"city": "北京"}),
+        ("WeatherQuery", {"city": "上海"}),
+        ("TicketQuery", {}),
+    ]
+    assert parsed["action"] == "WeatherQuery"
+    assert parsed["action_input"] == {"city": "北京"}
+
+
+def test_hallucinated_observation_keeps_first_action():
+    text = (
+        'Thought: t\nAction: echo\nAction Input: {"msg": "hi"}\n'
+        'Observation: made up\nThought: t2\nAction: echo\nAction Input: {"msg": "again"}'
+    )
+    parsed = LLMOutputParser.parse_thought_action(text)
+    assert len(parsed["actions"]) == 1
+    assert parsed["action"] == "echo"
+
+
+def test_malformed_action_is_error():
+    parsed = LLMOutputParser.parse_thought_action('Thought: t\nAction: a\nAction Input: {}\nAction: b')
+    assert parsed["action"] == "ERROR"
+    assert LLMOutputParser.parse_thought_action("no format")["actions"] == [{"action": "ERROR", "action_input": {}}]
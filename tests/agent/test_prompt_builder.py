@@ -0,0 +1,62 @@
+import json
+from unittest.mock import patch
+from src.modules.services.agent import prompt_builder as prompt_builder_mod
+from src.modules.services.agent.prompt_builder import PromptBuilder
+
+TEMPLATE = "Tools: {str_tool_description} | date: {date} | names: {tool_names}"
+
+
+def _builder(**kwargs) -> PromptBuilder:
+    return PromptBuilder(TEMPLATE, "desc", ["a", "b"], **kwargs)
+
+
+def test_build_layout():
+    builder = _builder()
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    context = [{"raw": "Thought: t1"}, {"thought": "no raw"}, {"raw": "Thought: t2"}]
+    messages = builder.build("q", history, context)
+    system = messages[0]["content"]
+    assert messages[0]["role"] == "system"
+    assert system.startswith("Tools: desc | date: ") and system.endswith("names: a, b")
+    assert messages[1:3] == history
+    user = messages[-1]["content"]
+    assert user.startswith(system)
+    assert user.endswith("q\n" + json.dumps("Thought: t1") + "\n" + json.dumps("Thought: t2"))
+
+    no_system = builder.build("q", history, context, include_system_prompt=False)
+    assert no_system == messages[1:]
+
+
+def test_without_duplicated_system_prompt():
+    builder = _builder(duplicate_system_prompt=False)
+    messages = builder.build("q", [], [{"raw": "r"}])
+    assert messages[0]["content"] not in messages[-1]["content"]
+    assert messages[-1]["content"].strip().startswith("Begin!")
+    assert messages[-1]["content"].endswith('q\n"r"')
+
+
+def test_prefix_formatted_once_per_bucket():
+    prompt_builder_mod._format_prefix.cache_clear()
+    builder = _builder(date_bucket_seconds=3600)
+    first = builder.build("q", [], [])[0]["content"]
+    # 新请求的 PromptBuilder 共用同一份前缀
+    second = _builder(date_bucket_seconds=3600).build("q", [], [])[0]["content"]
+    assert first == second
+    info = prompt_builder_mod._format_prefix.cache_info()
+    assert info.misses <= 2 and info.hits >= 1
+
+
+def test_context_serialized_incrementally():
+    builder = _builder()
+    context = []
+    with patch.object(prompt_builder_mod.json, "dumps", wraps=json.dumps) as dumps:
+        for i in range(5):
+            context.append({"raw": f"step {i}"})
+            builder.build("q", [], context)
+            builder.build("q", [], context, include_system_prompt=False)
+        assert dumps.call_count == 5
+
+    # context 被替换（新一轮对话）时重新序列化
+    messages = builder.build("q2", [], [{"raw": "other"}])
+    assert messages[-1]["content"].endswith('q2\n"other"')
+    assert builder.build("q", [], [])[-1]["content"].endswith("q\n")
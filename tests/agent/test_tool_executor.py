@@ -0,0 +1,68 @@
+import time
+import asyncio
+import threading
+from src.modules.services.agent.tool_executor import ToolExecutor, ToolTimeoutError
+
+
+def _sleepy(value, seconds):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_map_runs_concurrently_in_order():
+    executor = ToolExecutor(max_workers=4)
+    started = time.monotonic()
+    results = executor.map([("a", _sleepy("A", 0.3)), ("b", _sleepy("B", 0.1)), ("c", _sleepy("C", 0.2))])
+    assert results == ["A", "B", "C"]
+    assert time.monotonic() - started < 0.55
+    executor.shutdown()
+
+
+def test_no_timeout_by_default():
+    # 与只有一个工具调用时一致：默认不限时，长耗时工具需要在 timeouts 中单独配置
+    executor = ToolExecutor(timeouts={"旅行规划": 310})
+    assert executor.timeout_for("车票查询") is None
+    assert executor.timeout_for("旅行规划") == 310
+
+
+def test_map_returns_exceptions_and_timeouts():
+    def boom():
+        raise ValueError("bad")
+    executor = ToolExecutor(max_workers=2, timeout=5, timeouts={"slow": 0.1})
+    results = executor.map([("slow", _sleepy("late", 0.5)), ("boom", boom), ("ok", lambda: 1)])
+    assert isinstance(results[0], ToolTimeoutError)
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 1
+    executor.shutdown()
+
+
+def test_pool_is_bounded():
+    executor = ToolExecutor(max_workers=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    executor.map([(str(i), call) for i in range(6)])
+    assert peak[0] == 2
+    executor.shutdown()
+
+
+def test_aimap():
+    executor = ToolExecutor(max_workers=4, timeouts={"slow": 0.1})
+
+    async def collect():
+        return [r async for r in executor.aimap([("slow", _sleepy("late", 0.5)), ("b", _sleepy("B", 0.05))])]
+
+    results = asyncio.run(collect())
+    assert isinstance(results[0], ToolTimeoutError)
+    assert results[1] == "B"
+    executor.shutdown()
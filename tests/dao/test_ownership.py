@@ -0,0 +1,94 @@
+import os, sys
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+sys.path.insert(0, PATH_TO_ROOT)
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from src.modules.dbController.basis.dbSession import DatabaseSessionManager
+from src.modules.dbController.models.base import Base
+from src.modules.dbController.models.user import User
+from src.modules.dbController.models.conversation import Conversation
+from src.modules.services.business import UserBusiness, ConversationBusiness, LocalOwnershipCache
+from src.utils import ttl_cache as ttl_cache_mod
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    database = tmp_path / "users.db"
+    engine = create_engine(f"sqlite:///{database}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id="u1", username="u1", password_hash="x", is_active=True, is_removed=False))
+        session.add(User(id="u2", username="u2", password_hash="x", is_active=True, is_removed=False))
+        session.add(User(id="u3", username="u3", password_hash="x", is_active=True, is_removed=True))
+        session.add(Conversation(id="c1", user_id="u1", is_removed=False))
+        session.add(Conversation(id="c2", user_id="u1", is_removed=True))
+        session.add(Conversation(id="c3", user_id="u2", is_removed=False))
+        session.commit()
+    monkeypatch.setattr(DatabaseSessionManager, "_instance", None)
+    yield {"db_type": "sqlite", "sqlite": {"database": str(database)}}
+    engine.dispose()
+    monkeypatch.setattr(DatabaseSessionManager, "_instance", None)
+
+
+def _statements(business):
+    statements = []
+    engine = business.user_dao._UserDAO__db_session_manager._db_session._DataBaseSession__engine
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    return statements
+
+
+def test_single_query_keeps_contract(db):
+    business = UserBusiness(db)
+    statements = _statements(business)
+    assert business.check_conversation_ownership("u1", "c1") is True
+    assert len(statements) == 1
+    assert business.check_conversation_ownership("u1", "c2") is False
+    assert business.check_conversation_ownership("u1", "c3") is False
+    assert business.check_conversation_ownership("u1", "missing") is False
+    with pytest.raises(LookupError):
+        business.check_conversation_ownership("nobody", "c1")
+    with pytest.raises(ValueError):
+        business.check_conversation_ownership("u3", "c1")
+
+
+def test_cache_hit_and_invalidation(db):
+    cache = LocalOwnershipCache()
+    users = UserBusiness(db, ownership_cache=cache)
+    conversations = ConversationBusiness(db, ownership_cache=cache)
+    statements = _statements(users)
+
+    assert users.check_conversation_ownership("u1", "c1") is True
+    assert users.check_conversation_ownership("u1", "c1") is True
+    assert users.check_conversation_ownership("u2", "c1") is False
+    assert cache.stats()["hits"] == 2
+    queries = len(statements)
+
+    conversations.delete_conversation("c1")
+    assert users.check_conversation_ownership("u1", "c1") is False
+    assert len(statements) > queries
+
+    assert users.check_conversation_ownership("u2", "c3") is True
+    users.delete_user("u2")
+    with pytest.raises(ValueError):
+        users.check_conversation_ownership("u2", "c3")
+
+
+def test_local_cache_lru_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ttl_cache_mod.time, "monotonic", lambda: now[0])
+    cache = LocalOwnershipCache(max_size=2, ttl=10)
+    cache.set("c1", "u1")
+    cache.set("c2", "u1")
+    assert cache.is_owner("u1", "c1")
+    cache.set("c3", "u2")
+    # c2 最久未使用，被淘汰
+    assert cache.get("c2") is None
+    cache.invalidate_user("u1")
+    assert cache.get("c1") is None
+    assert cache.get("c3") == "u2"
+    now[0] += 11
+    assert cache.get("c3") is None
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        LocalOwnershipCache(max_size=0)
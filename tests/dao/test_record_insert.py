@@ -0,0 +1,90 @@
+import os, sys
+import time
+from datetime import datetime
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+sys.path.insert(0, PATH_TO_ROOT)
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from src.modules.dbController.basis.dbSession import DatabaseSessionManager
+from src.modules.dbController.models.base import Base
+from src.modules.dbController.models.user import User
+from src.modules.dbController.models.conversation import Conversation
+from src.modules.dbController.models.record import DialogueRecord
+from src.modules.services.business.record_bussiness import DialogueRecordBusiness
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    database = tmp_path / "records.db"
+    engine = create_engine(f"sqlite:///{database}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id="u1", username="u1", password_hash="x", is_active=True, is_removed=False))
+        session.add(Conversation(id="c1", user_id="u1", session_name="s", is_removed=False))
+        session.add(Conversation(id="c2", user_id="u1", session_name="s", is_removed=False))
+        session.commit()
+    monkeypatch.setattr(DatabaseSessionManager, "_instance", None)
+    yield {"db_type": "sqlite", "sqlite": {"database": str(database)}}
+    engine.dispose()
+    monkeypatch.setattr(DatabaseSessionManager, "_instance", None)
+
+
+def _count_statements(business):
+    statements = []
+    engine = business.dialogue_record_dao._DialogueRecordDAO__db_session_manager._db_session._DataBaseSession__engine
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql.split()[0]))
+    return statements
+
+
+def test_create_is_single_insert(db):
+    business = DialogueRecordBusiness(db)
+    statements = _count_statements(business)
+    dto = business.create_record("c1", "u1", "q", "a")
+    assert statements == ["INSERT"]
+    assert dto.created_at is not None
+    assert [r.id for r in business.list_records_by_conversation("c1")] == [dto.id]
+
+
+def test_integrity_errors_keep_contract(db):
+    business = DialogueRecordBusiness(db)
+    with pytest.raises(ValueError, match="Conversation"):
+        business.create_record("missing", "u1", "q", "a")
+    with pytest.raises(ValueError, match="User"):
+        business.create_record("c1", "missing", "q", "a")
+
+    dao = business.dialogue_record_dao
+    dao.create_dialogue_record(DialogueRecord(id="r1", conversation_id="c1", user_id="u1", user_query="q",
+                                              system_response="a", query_sent_at=datetime.utcnow()))
+    duplicate = dict(id="r1", conversation_id="c1", user_id="u1", user_query="q", system_response="a",
+                     query_sent_at=datetime.utcnow())
+    with pytest.raises(LookupError):
+        dao.create_dialogue_record(DialogueRecord(**duplicate))
+    dao.delete_dialogue_record("r1")
+    with pytest.raises(ValueError, match="soft-deleted"):
+        dao.create_dialogue_record(DialogueRecord(**duplicate))
+
+
+def test_write_buffer_batches_and_flushes_on_read(db):
+    business = DialogueRecordBusiness(db, write_buffer={"max_batch": 100, "flush_interval": 60})
+    statements = _count_statements(business)
+    created = [business.create_record(f"c{i % 2 + 1}", "u1", f"q{i}", f"a{i}") for i in range(6)]
+    assert statements == []
+    # 读取前写入缓冲区，多个会话的记录合并为一条 INSERT
+    records = business.list_records_by_conversation("c1")
+    assert statements[0] == "INSERT" and statements.count("INSERT") == 1
+    assert [r.id for r in records] == [dto.id for dto in created[0::2]]
+    business.write_buffer.close()
+
+
+def test_write_buffer_interval_and_bad_rows(db):
+    business = DialogueRecordBusiness(db, write_buffer={"max_batch": 100, "flush_interval": 0.05})
+    good = business.create_record("c1", "u1", "q", "a")
+    business.create_record("missing", "u1", "q", "a")
+    deadline = time.monotonic() + 5
+    while business.write_buffer.has_unwritten() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not business.write_buffer.has_unwritten()
+    # 整批失败后逐条重试，只丢弃违反约束的记录
+    business.write_buffer.close()
+    assert [r.id for r in business.list_records_by_conversation("c1")] == [good.id]
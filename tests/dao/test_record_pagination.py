@@ -0,0 +1,80 @@
+import os, sys
+from datetime import datetime, timedelta
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+sys.path.insert(0, PATH_TO_ROOT)
+from sqlalchemy import create_engine, inspect
+from src.modules.dbController.basis.dbSession import DatabaseSessionManager
+from src.modules.dbController.models.base import Base
+from src.modules.dbController.models.user import User
+from src.modules.dbController.models.conversation import Conversation
+from src.modules.dbController.models.record import DialogueRecord
+from src.modules.services.business.record_bussiness import DialogueRecordBusiness, decode_history_cursor, encode_history_cursor
+
+START = datetime(2025, 7, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def business(tmp_path, monkeypatch):
+    database = tmp_path / "records.db"
+    engine = create_engine(f"sqlite:///{database}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(DatabaseSessionManager, "_instance", None)
+    business = DialogueRecordBusiness({"db_type": "sqlite", "sqlite": {"database": str(database)}})
+
+    from sqlalchemy.orm import Session
+    with Session(engine) as session:
+        session.add(User(id="u1", username="u1", password_hash="x", is_active=True, is_removed=False))
+        session.add(Conversation(id="c1", user_id="u1", session_name="s", is_removed=False))
+        session.add(Conversation(id="c2", user_id="u1", session_name="s", is_removed=False))
+        for i in range(7):
+            # 第 3、4 条时间相同，按 id 区分先后
+            created_at = START + timedelta(minutes=min(i, 3) if i in (3, 4) else i)
+            session.add(DialogueRecord(
+                id=f"r{i}", conversation_id="c1", user_id="u1", user_query=f"q{i}", system_response=f"a{i}",
+                query_sent_at=created_at, created_at=created_at, is_removed=(i == 5)
+            ))
+        session.commit()
+    yield business
+    engine.dispose()
+    monkeypatch.setattr(DatabaseSessionManager, "_instance", None)
+
+
+def test_history_index_declared(business, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'records.db'}")
+    indexes = {ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("dialogue_records")}
+    assert indexes["ix_dialogue_records_conversation_history"] == ["conversation_id", "is_removed", "created_at", "id"]
+
+
+def test_keyset_pages_cover_history_once(business):
+    pages, cursor = [], None
+    while True:
+        records, cursor = business.list_records_page("c1", limit=2, cursor=cursor)
+        pages.append([r.id for r in records])
+        if cursor is None:
+            break
+    # 每页按时间正序，从最新的一页向前翻；软删除的 r5 不出现
+    assert pages == [["r4", "r6"], ["r2", "r3"], ["r0", "r1"]]
+
+
+def test_first_page_matches_last_n(business):
+    records, cursor = business.list_records_page("c1", limit=10)
+    assert cursor is None
+    assert [r.id for r in records] == [r.id for r in business.list_records_by_conversation("c1")]
+
+
+def test_empty_and_invalid(business):
+    with pytest.raises(LookupError):
+        business.list_records_page("c2")
+    with pytest.raises(ValueError):
+        business.list_records_page("c1", cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        business.list_records_page("c1", limit=0)
+    _, cursor = business.list_records_page("c1", limit=6)
+    assert cursor is None
+    _, cursor = business.list_records_page("c1", limit=5)
+    assert decode_history_cursor(cursor) == (START + timedelta(minutes=1), "r1")
+    records, cursor = business.list_records_page("c1", limit=5, cursor=cursor)
+    assert ([r.id for r in records], cursor) == (["r0"], None)
+    # 游标之后没有更早的记录时返回空页而不是 LookupError
+    assert business.list_records_page("c1", cursor=encode_history_cursor(START, "r0")) == ([], None)
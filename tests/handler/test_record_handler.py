@@ -1,13 +1,18 @@
 import pytest
 from fastapi import FastAPI, Depends
 from fastapi.testclient import TestClient
-from src.modules.handler.record_handler import router, ChatRequest
+from src.modules.handler.record_handler import record_router as router, ChatRequest
 
 # 模拟依赖
 class DummyAgentManager:
-    def get_and_use_agent(self, user_id, session_id, query):
+    async def acall_agent(self, user_id, session_id, query):
         return {"reply": f"user {user_id} session {session_id} query {query}"}
 
+    async def astream_agent(self, user_id, session_id, query):
+        yield {"type": "token", "content": "你"}
+        yield {"type": "tool_start", "tool": "echo", "input": {"msg": query}}
+        yield {"type": "final_answer", "content": {"answer": "ok", "picture": []}}
+
 def dummy_get_current_user():
     return "test_user"
 
@@ -45,5 +50,22 @@ def test_chat_ownership_forbidden():
     assert response.status_code == 403
     assert response.json()["detail"] == "没有权限访问该会话"
 
+def test_chat_stream_sse():
+    import json
+    data = {"session_id": "valid_session", "query": "hello"}
+    with client.stream("POST", "/api/v1/chat/stream", json=data) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    events = [block for block in body.split("\n\n") if block]
+    assert [block.split("\n")[0] for block in events] == ["event: token", "event: tool_start", "event: final_answer"]
+    final = json.loads(events[-1].split("\n")[1][len("data: "):])
+    assert final["content"]["answer"] == "ok"
+
+def test_chat_stream_forbidden():
+    data = {"session_id": "invalid_session", "query": "hello"}
+    response = client.post("/api/v1/chat/stream", json=data)
+    assert response.status_code == 403
+
 if __name__ == "__main__":
     pytest.main([__file__])
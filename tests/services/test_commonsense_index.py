@@ -0,0 +1,66 @@
+import os, sys
+import json
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+from chinatravel.environment.data_store import get_data_store
+from chinatravel.environment.tools.intercity_transport.apis import IntercityTransport
+from chinatravel.symbol_verification.commonsense_constraint import CheckResult
+
+CITIES = ["上海", "北京", "深圳", "广州", "重庆", "苏州", "成都", "杭州", "武汉", "南京"]
+
+
+def _write_tables(path):
+    flights = [
+        {"FlightID": "FL2", "From": "重庆机场", "To": "成都机场", "BeginTime": "15:00", "EndTime": "16:00", "Cost": 600.0},
+        {"FlightID": "FL1", "From": "重庆机场", "To": "成都机场", "BeginTime": "08:00", "EndTime": "09:00", "Cost": 500.0},
+        {"FlightID": "FL1", "From": "重庆机场", "To": "成都机场", "BeginTime": "09:00", "EndTime": "10:00", "Cost": 550.0},
+    ]
+    with open(os.path.join(path, "airplane.jsonl"), "w", encoding="utf-8") as f:
+        for flight in flights:
+            f.write(json.dumps(flight, ensure_ascii=False) + "\n")
+    os.makedirs(os.path.join(path, "train"))
+    for start in CITIES:
+        for end in CITIES:
+            if start == end:
+                continue
+            trains = []
+            if (start, end) == ("重庆", "成都"):
+                trains = [
+                    {"TrainID": "G1", "From": "重庆站", "To": "成都东站", "BeginTime": "07:00", "EndTime": "09:00", "Cost": 100.0},
+                    {"TrainID": "G1", "From": "重庆站", "To": "成都南站", "BeginTime": "07:00", "EndTime": "09:10", "Cost": 110.0},
+                ]
+            with open(os.path.join(path, "train", "from_{}_to_{}.json".format(start, end)), "w", encoding="utf-8") as f:
+                json.dump(trains, f, ensure_ascii=False)
+
+
+def test_route_index_matches_select(tmp_path):
+    _write_tables(str(tmp_path))
+    transport = IntercityTransport(path=str(tmp_path) + "/")
+    try:
+        flights = transport.select("重庆", "成都", "airplane")
+        for transport_id, start, end in [("FL1", "重庆机场", "成都机场"), ("FL2", "重庆机场", "成都机场")]:
+            expected = next(row for _, row in flights.iterrows()
+                            if (row["FlightID"], row["From"], row["To"]) == (transport_id, start, end))
+            found = transport.get_by_id("重庆", "成都", "airplane", transport_id, start, end)
+            assert found["BeginTime"] == expected["BeginTime"] and found["Cost"] == expected["Cost"]
+        # the earliest of the two FL1 rows, as the sorted select() returns it first
+        assert transport.get_by_id("重庆", "成都", "airplane", "FL1", "重庆机场", "成都机场")["Cost"] == 500.0
+
+        assert transport.get_by_id("重庆", "成都", "train", "G1", "重庆站", "成都南站")["Cost"] == 110.0
+        assert transport.get_by_id("重庆", "成都", "train", "G1", "重庆站", "成都西站") is None
+        assert transport.get_by_id("重庆", "成都", "train", ["G1"], "重庆站", "成都东站") is None
+        assert len(transport.route_index("成都", "重庆", "train")) == 0
+        assert transport.route_index("重庆", "成都", "train") is transport.route_index("重庆", "成都", "train")
+    finally:
+        get_data_store().clear()
+
+
+def test_check_result():
+    result = CheckResult(["a", "b"])
+    assert result.passed and result.columns == ["a", "b"]
+    result["b"] = 1
+    assert result.sum() == 1 and not result.passed
+    result.set_all([0, 1])
+    assert result.to_dict() == {"a": 0, "b": 1}
+    result["c"] = 1
+    assert result.columns == ["a", "b", "c"] and result.sum() == 2
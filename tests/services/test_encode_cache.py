@@ -0,0 +1,61 @@
+import os, sys
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(PATH_TO_ROOT)
+from src.modules.services.service_basis import encode_cache as encode_cache_mod
+from src.modules.services.service_basis.encode_cache import EncodeCache, normalize_name
+
+FEATURES = {"饮食类型": 1, "菜系": 0, "中西餐": 1, "价格": [100, 500], "北京": 5}
+
+
+def test_normalize_name():
+    assert normalize_name(" 皇 堡 ") == "皇堡"
+    assert normalize_name("ＫＦＣ") == normalize_name("kfc")
+
+
+def test_persistent_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = EncodeCache(path)
+    assert cache.get("皇堡") is None
+    cache.put("皇堡", FEATURES)
+    cache.close()
+
+    reopened = EncodeCache(path)
+    assert reopened.get(" 皇堡") == FEATURES
+    assert "皇堡" in reopened
+    assert reopened.stats() == {"hits": 1, "misses": 0, "size": 1, "hit_rate": 1.0}
+
+
+def test_version_mismatch_is_a_miss(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    EncodeCache(path, version="v1").put("米粉", FEATURES)
+    cache = EncodeCache(path, version="v2")
+    assert "米粉" not in cache
+    assert cache.get("米粉") is None
+    assert len(cache) == 0
+
+
+def test_ttl_and_size_eviction(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(encode_cache_mod.time, "time", lambda: now[0])
+    cache = EncodeCache(":memory:", ttl=10, max_entries=2)
+    cache.put("a", FEATURES)
+    now[0] += 1
+    cache.put("b", FEATURES)
+    now[0] += 1
+    assert cache.get("a") == FEATURES
+    now[0] += 1
+    cache.put("c", FEATURES)
+    # b 最久未访问，被淘汰
+    assert "b" not in cache
+    assert len(cache) == 2
+    now[0] += 10
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_rejects_bad_config():
+    with pytest.raises(ValueError):
+        EncodeCache(":memory:", max_entries=0)
+    with pytest.raises(ValueError):
+        EncodeCache(":memory:", ttl=0)
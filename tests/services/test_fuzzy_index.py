@@ -0,0 +1,53 @@
+import os, sys
+import random
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(PATH_TO_ROOT)
+import Levenshtein
+from src.modules.services.service_basis.fuzzy_index import FuzzyIndex
+
+CHARS = "鸡鸭鱼肉牛羊面饭粉汤锅烤炒炖煎蒸辣麻香甜酸小大红白黄北京上海广州成都重庆"
+
+
+def _names(n=500, seed=0):
+    rnd = random.Random(seed)
+    return ["".join(rnd.choice(CHARS) for _ in range(rnd.randint(1, 8))) for _ in range(n)] + [""]
+
+
+def _brute_force(names, query, k, normalized):
+    def score(name):
+        d = Levenshtein.distance(query, name)
+        if not normalized:
+            return d
+        max_len = max(len(query), len(name))
+        return d / max_len if max_len else 0.0
+    return sorted(range(len(names)), key=lambda i: (score(names[i]), i))[:k]
+
+
+def test_nearest_matches_brute_force():
+    names = _names()
+    index = FuzzyIndex(names)
+    rnd = random.Random(1)
+    queries = [rnd.choice(names) for _ in range(50)] + ["".join(rnd.choice(CHARS) for _ in range(rnd.randint(0, 10))) for _ in range(100)]
+    queries += ["披萨", "xyz", ""]
+    for query in queries:
+        for normalized in (False, True):
+            result = index.nearest(query, k=5, normalized=normalized)
+            assert [idx for idx, _ in result] == _brute_force(names, query, 5, normalized), (query, normalized)
+
+
+def test_scores():
+    index = FuzzyIndex(["北京", "北京南", "南京"])
+    assert index.nearest("北京", k=3) == [(0, 0), (1, 1), (2, 1)]
+    similarity = dict(index.nearest("北京", k=3, normalized=True))
+    assert similarity[0] == 1.0
+    assert abs(similarity[1] - (1 - 1 / 3)) < 1e-12
+    assert index.nearest_names("北京西", k=1) == ["北京"]
+
+
+def test_nearest_many_and_small_index():
+    index = FuzzyIndex(["宫保鸡丁", "麻婆豆腐"])
+    results = index.nearest_many(["鸡丁", "豆腐", "鸡丁"], k=5)
+    assert [idx for idx, _ in results[0]] == [0, 1]
+    assert results[1][0][0] == 1
+    assert results[2] == results[0]
+    assert FuzzyIndex([]).nearest("鸡") == []
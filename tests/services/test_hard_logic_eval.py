@@ -0,0 +1,90 @@
+import os, sys
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+from chinatravel.symbol_verification.concept_func import compile_concept_code, plan_namespace
+from chinatravel.symbol_verification.hard_constraint import evaluate_constraints_py
+from chinatravel.symbol_verification.preference import evaluate_preference_py
+
+
+PLAN = {
+    "people_number": 2,
+    "start_city": "重庆",
+    "target_city": "成都",
+    "itinerary": [
+        {"day": 1, "activities": [
+            {"type": "train", "cost": 200, "start": "重庆北站", "end": "成都东站", "transports": []},
+            {"type": "attraction", "position": "宽窄巷子", "cost": 0, "tickets": 2,
+             "start_time": "10:00", "end_time": "11:30", "transports": []},
+            {"type": "lunch", "position": "面馆", "cost": 60, "start_time": "12:00", "end_time": "13:00",
+             "transports": [{"mode": "walk", "type": "walk", "cost": 0, "distance": 1.2,
+                             "start_time": "11:30", "end_time": "11:50"}]},
+        ]},
+        {"day": 2, "activities": [
+            {"type": "dinner", "position": "火锅", "cost": 300, "start_time": "18:00", "end_time": "19:00",
+             "transports": []},
+            {"type": "train", "cost": 200, "start": "成都东站", "end": "重庆北站", "transports": []},
+        ]},
+    ],
+}
+
+COST = """
+total_cost = 0
+for activity in allactivities(plan):
+    total_cost += activity_cost(activity)
+result = total_cost <= 1000
+"""
+DAYS = "result = day_count(plan) == 2 and allactivities_count(plan) == 5"
+# hard_logic_py only has `set` among the builtins
+MUTATES = """
+acts = allactivities(plan)
+acts.clear()
+result = acts == []
+"""
+SEES_ALL = """
+count = 0
+for activity in allactivities(plan):
+    count += 1
+result = count == 5 and dayactivities(plan, 2)[0]["position"] == "火锅"
+"""
+LEAKS = "result = total_cost > 0"
+SYNTAX = "result = = 1"
+
+
+def test_results_per_constraint():
+    logic = [COST, DAYS, MUTATES, SEES_ALL, SYNTAX, "result = target_city(plan) == '成都'"]
+    assert evaluate_constraints_py(logic, PLAN) == [True, True, True, True, False, True]
+
+
+def test_constraints_do_not_share_locals():
+    assert evaluate_constraints_py([COST, LEAKS], PLAN) == [True, False]
+
+
+def test_shared_concepts_are_computed_once(monkeypatch):
+    from chinatravel.symbol_verification import concept_func
+    calls = []
+    original = concept_func.func_dict["allactivities"]
+
+    def counting(plan):
+        calls.append(plan)
+        return original(plan)
+
+    monkeypatch.setitem(concept_func.func_dict, "allactivities", counting)
+    assert evaluate_constraints_py([COST, SEES_ALL, MUTATES, SEES_ALL], PLAN) == [True] * 4
+    assert len(calls) == 1
+
+
+def test_other_plans_are_not_cached():
+    namespace = plan_namespace(PLAN)
+    other = {"itinerary": [{"activities": [{"type": "lunch"}]}]}
+    assert len(namespace["allactivities"](PLAN)) == 5
+    assert len(namespace["allactivities"](other)) == 1
+
+
+def test_compiled_once():
+    source = "result = True  # compiled once"
+    assert compile_concept_code(source) is compile_concept_code(source)
+
+
+def test_preference():
+    code = COST + "avg = total_cost / allactivities_count(plan)\n"
+    assert evaluate_preference_py([("minimize", "avg", code), ("maximize", "missing", "x = 1")], PLAN) == [152.0, None]
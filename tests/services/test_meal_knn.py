@@ -0,0 +1,155 @@
+import os, sys
+import numpy as np
+import pandas as pd
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(PATH_TO_ROOT)
+from src.modules.services.service_basis import meal_service as meal_service_mod
+from src.modules.services.service_basis.meal_service import MealService, soft_constraints, mapping
+
+SPICY = ['not-spicy', 'slightly-spicy', 'medium-spicy', 'extra-spicy']
+
+
+def _item(food_id, name, is_dinner, cuisine, food_type, price, spicy, features):
+    row = {
+        'city_id': 1, 'restaurant_id': 1, 'food_id': food_id, 'food_name': name,
+        'is_dinner': is_dinner, 'cuisine': cuisine, 'food_type': food_type, 'price': price,
+    }
+    row.update(dict(zip(SPICY, spicy)))
+    row.update(dict(zip(soft_constraints, features)))
+    return row
+
+
+def _query(is_dinner=0, cuisine=0, food_type=0, spicy=(1, 1, 1, 1), price='未加限定', features=None):
+    query = {'饮食类型': is_dinner, '菜系': cuisine, '中西餐': food_type, '价格': price}
+    query.update(dict(zip(['不辣', '微辣', '中辣', '特辣'], spicy)))
+    query.update({mapping[key]: value for key, value in zip(soft_constraints, features or [])})
+    return query
+
+
+HIGH = [5] * len(soft_constraints)
+LOW = [1] * len(soft_constraints)
+MIXED = [5, 1] * (len(soft_constraints) // 2) + [5]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    rows = [
+        _item(1, '烤鸭', 1, 1, 1, 300, (1, 0, 0, 0), HIGH),
+        _item(2, '麻婆豆腐', 1, 1, 1, 30, (0, 0, 1, 0), MIXED),
+        _item(3, '奶茶', 3, 0, 2, 15, (1, 0, 0, 0), LOW),
+        _item(4, '辣子鸡', 1, 2, 1, 88, (0, 0, 0, 1), MIXED),
+        _item(5, '肠粉', 2, 2, 1, 12, (1, 0, 0, 0), [np.nan] * len(soft_constraints)),
+    ]
+    path = tmp_path / 'item.csv'
+    pd.DataFrame(rows).to_csv(path, index=False)
+    monkeypatch.setattr(meal_service_mod, 'DATASET_ITEM_PATH', path)
+    return MealService()
+
+
+def test_feature_matrix_normalized(service):
+    norms = np.linalg.norm(service._knn_features, axis=1)
+    assert service._knn_features.dtype == np.float32
+    assert service._knn_features.flags['C_CONTIGUOUS']
+    # 全部缺失的行填 0 后保持为零向量
+    assert sorted(np.round(norms, 5).tolist()) == [0.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def test_knn_filters_and_similarity(service):
+    assert service.KNN(_query(features=MIXED))['food_name'] in ('麻婆豆腐', '辣子鸡')
+    assert service.KNN(_query(1, 1, 1, features=MIXED))['food_name'] == '麻婆豆腐'
+    # 辣度与原实现一致：任一辣度列等于查询值即满足
+    assert service.KNN(_query(1, 1, 1, spicy=(1, 9, 9, 9), features=MIXED))['food_name'] == '烤鸭'
+    assert service.KNN(_query(price=[50, 100], features=HIGH))['food_name'] == '辣子鸡'
+    assert service.KNN(_query(price=[10, 15], features=LOW))['id'] == '1_1_3'
+
+
+def test_knn_no_match(service):
+    with pytest.raises(ValueError):
+        service.KNN(_query(9, features=HIGH))
+    with pytest.raises(ValueError):
+        service.KNN(_query(spicy=(9, 9, 9, 9), features=HIGH))
+    with pytest.raises(ValueError):
+        service.KNN(_query(price=[1000, 2000], features=HIGH))
+
+
+def test_knn_many_matches_single_queries(service):
+    queries = [
+        _query(features=MIXED),
+        _query(price=[0, 20], features=LOW),
+        _query(3, features=HIGH),
+        _query(9, features=HIGH),
+    ]
+    batched = service.knn_many(queries, k=2)
+    assert [len(result) for result in batched] == [2, 2, 1, 0]
+    for query, result in zip(queries[:3], batched):
+        assert result.iloc[0]['id'] == service.KNN(query)['id']
+    # 不修改传入的查询
+    assert queries[0]['饮食类型'] == 0
+
+
+def _stub_pipeline(service, monkeypatch, judge_delay=0.0, encode_delay=0.2):
+    import threading, time
+    encoded = []
+    lock = threading.Lock()
+    monkeypatch.setattr(service, 'recommend', lambda user_info, history: ['烤鸭', '汉堡', '奶茶', '披萨'])
+
+    def judge(raw_candidates, retrieved_items):
+        time.sleep(judge_delay)
+        return {'烤鸭': {'food_id': '1_1_1', 'food_name': '烤鸭'}, '汉堡': None, '奶茶': None, '披萨': None}
+
+    def encode(candidate):
+        with lock:
+            encoded.append(candidate)
+        time.sleep(encode_delay)
+        if candidate == '披萨':
+            raise ValueError("No JSON block found in LLM response.")
+        return _query(1, 1, 1, spicy=(1, 9, 9, 9), features=HIGH) if candidate == '汉堡' else _query(3, features=LOW)
+
+    monkeypatch.setattr(service, 'judge', judge)
+    monkeypatch.setattr(service, 'encode', encode)
+    return encoded
+
+
+def test_call_encodes_concurrently(service, monkeypatch):
+    import time
+    encoded = _stub_pipeline(service, monkeypatch)
+    start = time.monotonic()
+    result = service({}, user_info=None, history=[])
+    elapsed = time.monotonic() - start
+    # 3 个未匹配候选并发 encode，失败的候选被跳过，结果保持 judge 的顺序
+    assert elapsed < 0.5
+    assert sorted(encoded) == sorted(['汉堡', '奶茶', '披萨'])
+    assert [item['food_name'] for item in result] == ['烤鸭', '烤鸭', '奶茶']
+
+
+def test_call_speculative_encode(service, monkeypatch):
+    import time
+    service.speculative_encode = True
+    encoded = _stub_pipeline(service, monkeypatch, judge_delay=0.2)
+    start = time.monotonic()
+    result = service({}, user_info=None, history=[])
+    elapsed = time.monotonic() - start
+    # encode 与 judge 同时进行；已匹配的候选也会被 encode，但结果不使用
+    assert elapsed < 0.35
+    assert sorted(encoded) == sorted(['烤鸭', '汉堡', '奶茶', '披萨'])
+    assert [item['food_name'] for item in result] == ['烤鸭', '烤鸭', '奶茶']
+
+
+def test_encode_cache_skips_llm(service, monkeypatch):
+    from src.modules.services.service_basis.encode_cache import EncodeCache
+    calls = []
+
+    def llm(candidate):
+        calls.append(candidate)
+        return _query(features=HIGH)
+
+    monkeypatch.setattr(service, '_encode_with_llm', llm)
+    service.encode_cache = EncodeCache(':memory:')
+    assert service.encode('皇堡') == service.encode(' 皇堡 ')
+    assert calls == ['皇堡']
+
+    # 预热跳过已缓存的名称
+    assert service.warm_encode_cache() == len(set(service.item_names))
+    assert service.warm_encode_cache(['皇堡', '烤鸭']) == 0
+    assert service.encode_cache.stats()['hits'] == 1
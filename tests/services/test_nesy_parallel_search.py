@@ -0,0 +1,198 @@
+import os, sys
+import time
+import itertools
+import threading
+import multiprocessing
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool/chinatravel'))
+import pandas as pd
+import pytest
+from chinatravel.agent.llms import AbstractLLM
+# 使用 nesy_agent 模块实际导入的异常类
+from chinatravel.agent.nesy_agent.nesy_agent import NesyAgent, SearchCancelled, TimeOutError
+from chinatravel.agent.nesy_agent.llm_driven_rec import LLMDrivenAgent
+
+
+class _LLM(AbstractLLM):
+    """
+    每次调用返回不同的推荐列表，并把调用次数记在 input_token_count 上（分支的 token 计数会合并回父进程）。
+    pickle 到子进程时重新构造，计数从 0 开始
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.name = "fake"
+        self.answers = itertools.count()
+
+    def _get_response(self, messages, one_line, json_mode):
+        self.input_token_count += 1
+        n = next(self.answers)
+        return f"AttractionNameList: ['attr{n}']\nRestaurantNameList: ['res{n}']"
+
+
+class _BranchAgent(NesyAgent):
+    """
+    dfs_poi 只按分支名模拟耗时与结果：outcomes[name] = (耗时秒数, True 成功 / False 失败 / None 超时)
+    """
+
+    def __init__(self, outcomes, workers=None, ordered=True):
+        self.query = {"uid": "t", "days": 1, "people_number": 1, "nature_language": "t"}
+        self.outcomes = outcomes
+        self.backbone_llm = _LLM()
+        self.TIME_CUT = 2 * LONG
+        self.time_before_search = time.time()
+        self.llm_inference_time_count = 0
+        for name in self.BRANCH_COUNTERS:
+            setattr(self, name, 0)
+        self.least_plan_schema, self.least_plan_comm, self.least_plan_logic = None, None, None
+        self.least_plan_logical_pass = -1
+        self.required_budget = None
+        self.parallel_search_workers = workers
+        self.parallel_search_ordered = ordered
+        self.preference_search = False
+
+    def dfs_poi(self, query, poi_plan, plan, current_time, current_position, current_day=0):
+        name = poi_plan["name"]
+        delay, outcome = self.outcomes[name]
+        deadline = time.time() + delay
+        while time.time() < deadline:
+            self.search_nodes += 1
+            if self.search_cancelled is not None and self.search_cancelled.is_set():
+                raise SearchCancelled
+            time.sleep(0.005)
+        self.constraints_validation_count += 1
+        self.least_plan_schema = name
+        if outcome is None:
+            raise TimeOutError
+        return outcome, [name]
+
+
+class _RankingAgent(_BranchAgent, LLMDrivenAgent):
+    """
+    在 _BranchAgent 的基础上，每个分支都像 LLMDrivenAgent.dfs_poi 一样请求景点与餐馆推荐
+    """
+
+    def __init__(self, outcomes, workers=None):
+        super().__init__(outcomes, workers)
+        self.memory = {
+            "attractions": pd.DataFrame(columns=["name", "type", "opentime", "endtime", "price"]),
+            "restaurants": pd.DataFrame(columns=["name", "cuisine", "price", "opentime", "endtime", "recommendedfood"]),
+        }
+        self.ranking_attractions_flag = False
+        self.ranking_restaurants_flag = False
+
+    def dfs_poi(self, query, poi_plan, plan, current_time, current_position, current_day=0):
+        success, plan = super().dfs_poi(query, poi_plan, plan, current_time, current_position, current_day)
+        attractions = self._suggest_attractions(self.intercity_with_hotel_cost)
+        restaurants = self._suggest_restaurants(self.intercity_with_hotel_cost)
+        return success, plan + attractions + restaurants
+
+
+def _branches(names):
+    return iter([{"poi_plan": {"name": name}, "intercity_with_hotel_cost": 0} for name in names])
+
+
+def _sequential(agent, names):
+    for branch in _branches(names):
+        status, plan = agent._search_branch(agent.query, branch)
+        result = agent._resolve_branch(status, plan)
+        if result is not None:
+            return result
+    return False, {"error_info": "No solution found."}
+
+
+def _parallel(agent, names, timeout=60):
+    """
+    在单独的线程中运行 _parallel_search 并限定等待时间，进程池卡住时测试失败而不是一直挂起
+    """
+    result = []
+    thread = threading.Thread(target=lambda: result.append(agent._parallel_search(_branches(names))), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "parallel search did not return"
+    return result[0]
+
+
+# 长分支的耗时远大于进程池启动与取消所需的时间，用来判断分支是否被取消
+LONG = 30
+
+OUTCOMES = {
+    "a": (0.2, False),
+    "b": (0.3, True),
+    "c": (0.05, True),
+    "d": (LONG, True),
+}
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_ordered_returns_the_sequential_plan(workers):
+    expected = _sequential(_BranchAgent(OUTCOMES), "abcd")
+
+    agent = _BranchAgent(OUTCOMES, workers=workers)
+    beg_time = time.time()
+    assert _parallel(agent, "abcd") == expected == (True, ["b"])
+    # 成功分支之后的分支被取消，不会等到其搜索结束
+    assert time.time() - beg_time < LONG / 2
+    assert agent.backtrack_count == 1
+    assert agent.constraints_validation_count == 2
+    assert agent.least_plan_schema == "b"
+
+
+def test_unordered_returns_the_first_finished_plan():
+    agent = _BranchAgent(OUTCOMES, workers=4, ordered=False)
+    assert _parallel(agent, "abcd") == (True, ["c"])
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_cancel_with_queued_branches(ordered):
+    # 一个进程时，后面的分支在成功时仍在排队（或刚开始），都应被取消，且返回前子进程全部结束
+    outcomes = {"a": (0.2, True), "b": (LONG, False), "c": (LONG, False), "d": (LONG, False)}
+    agent = _BranchAgent(outcomes, workers=1, ordered=ordered)
+    beg_time = time.time()
+    assert _parallel(agent, "abcd") == (True, ["a"])
+    assert time.time() - beg_time < LONG / 2
+    assert multiprocessing.active_children() == []
+
+
+def test_no_solution_and_timeout():
+    outcomes = {"a": (0, False), "b": (0, False), "c": (0.05, None)}
+    agent = _BranchAgent(outcomes, workers=2)
+    assert _parallel(agent, "ab") == (False, {"error_info": "No solution found."})
+    assert agent.backtrack_count == 2
+
+    agent = _BranchAgent(outcomes, workers=2)
+    assert _parallel(agent, "cab") == (False, {"error_info": "TimeOutError"})
+
+    agent = _BranchAgent(outcomes, workers=2)
+    assert _parallel(agent, "") == (False, {"error_info": "No solution found."})
+
+
+def test_falls_back_to_sequential_search():
+    expected = _sequential(_BranchAgent(OUTCOMES), "abc")
+
+    # 无法 pickle 的 agent 使进程池不可用
+    agent = _BranchAgent(OUTCOMES, workers=2)
+    agent.lock = threading.Lock()
+    assert _parallel(agent, "abc") == expected == (True, ["b"])
+    assert agent.backtrack_count == 1
+
+
+def test_llm_rankings_are_requested_once():
+    outcomes = {"a": (0.1, False), "b": (0.1, False), "c": (0.1, True)}
+    sequential = _RankingAgent(outcomes)
+    expected = _sequential(sequential, "abc")
+    assert sequential.backbone_llm.input_token_count == 2
+
+    agent = _RankingAgent(outcomes, workers=3)
+    assert _parallel(agent, "abc") == expected == (True, ["c", "attr0", "res1"])
+    # 景点、餐馆推荐各请求一次，而不是每个分支各请求一次
+    assert agent.backbone_llm.input_token_count == 2
+
+
+def test_dfs_poi_stops_once_cancelled():
+    agent = _BranchAgent({})
+    agent.search_cancelled = threading.Event()
+    agent.search_cancelled.set()
+    with pytest.raises(SearchCancelled):
+        NesyAgent.dfs_poi(agent, agent.query, {}, plan=[], current_time="", current_position="")
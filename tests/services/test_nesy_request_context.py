@@ -0,0 +1,108 @@
+import os, sys
+import threading
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool/chinatravel'))
+from chinatravel.agent.llms import AbstractLLM
+from chinatravel.agent.utils import request_log
+from chinatravel.agent.nesy_agent.nesy_agent import NesyAgent
+
+
+class _LLM(AbstractLLM):
+    def __init__(self):
+        super().__init__()
+        self.name = "fake"
+        self.llm = object()
+
+    def _get_response(self, messages, one_line, json_mode):
+        return ""
+
+
+class _Env:
+    support_cities = ["北京", "上海"]
+
+    def __init__(self):
+        self.results = []
+
+    def for_request(self):
+        return _Env()
+
+
+def _agent(tmp_path):
+    return NesyAgent(
+        env=_Env(), backbone_llm=_LLM(), cache_dir=str(tmp_path / "cache"), log_dir=str(tmp_path / "logs"),
+        method="NeSy",
+    )
+
+
+def _run_concurrently(target, n):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_request_log_is_per_request(tmp_path, capsys):
+    stdout, stderr = sys.stdout, sys.stderr
+    barrier = threading.Barrier(4)
+
+    def work(i):
+        with request_log(f"u{i}", tmp_path / f"{i}.log", tmp_path / f"{i}.error") as logger:
+            barrier.wait()
+            for _ in range(50):
+                logger.info(f"request {i}")
+            logger.warning(f"error {i}")
+
+    _run_concurrently(work, 4)
+    print("outside")
+
+    for i in range(4):
+        assert (tmp_path / f"{i}.log").read_text(encoding="utf-8") == f"request {i}\n" * 50 + f"error {i}\n"
+        assert (tmp_path / f"{i}.error").read_text(encoding="utf-8") == f"error {i}\n"
+    # 不替换全局的 sys.stdout / sys.stderr
+    assert sys.stdout is stdout and sys.stderr is stderr
+    assert capsys.readouterr().out == "outside\n"
+
+
+def test_request_log_records_exceptions(tmp_path):
+    with pytest.raises(ValueError):
+        with request_log("u", tmp_path / "u.log", tmp_path / "u.error"):
+            raise ValueError("boom")
+    assert "ValueError: boom" in (tmp_path / "u.error").read_text(encoding="utf-8")
+
+
+def test_for_request_separates_search_state(tmp_path):
+    proto = _agent(tmp_path)
+    first, second = proto.for_request(), proto.for_request()
+
+    assert first.memory is not second.memory is not proto.memory
+    assert first.restaurants_visiting is not second.restaurants_visiting
+    assert first.env.results is not proto.env.results
+    assert first.least_plan_logic is None and first.search_nodes == 0
+
+    # token 计数按请求统计，LLM 客户端共享
+    first.backbone_llm.input_token_count += 10
+    assert proto.backbone_llm.input_token_count == 0 == second.backbone_llm.input_token_count
+    assert first.backbone_llm.llm is proto.backbone_llm.llm
+
+
+def test_concurrent_runs_write_their_own_logs(tmp_path):
+    proto = _agent(tmp_path)
+    results = {}
+
+    def work(i):
+        query = {"uid": f"u{i}", "start_city": f"城市{i}", "target_city": "北京"}
+        results[i] = proto.for_request().run(query, oralce_translation=True)
+
+    _run_concurrently(work, 4)
+
+    log_dir = os.path.join(proto.cache_dir, "NeSy_fake_oracletranslation")
+    for i in range(4):
+        succ, plan = results[i]
+        assert not succ and plan["search_nodes"] == 0
+        with open(os.path.join(log_dir, f"u{i}.log"), encoding="utf-8") as f:
+            log = f.read()
+        assert f"城市{i}" in log
+        assert all(f"城市{j}" not in log for j in range(4) if j != i)
@@ -0,0 +1,163 @@
+import os, sys
+import time
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool/chinatravel'))
+import numpy as np
+import pandas as pd
+import pytest
+from chinatravel.agent.nesy_agent.search_state import PlanSearchState
+from chinatravel.agent.nesy_agent.nesy_agent import NesyAgent
+
+
+def _activity(activity_type, position, cost, end_time="12:00"):
+    return {"type": activity_type, "position": position, "cost": cost, "end_time": end_time}
+
+
+def test_push_pop_restores_aggregates():
+    state = PlanSearchState(fixed_cost=100, budget=300)
+    state.push(0, {"type": "train", "cost": 80, "end_time": "09:00"})
+    state.push(0, _activity("lunch", "面馆", 50), poi_index=3)
+    state.push(0, _activity("attraction", "宽窄巷子", 100, "15:00"), poi_index=7)
+
+    assert state.total_cost == 250
+    assert state.current_time == "15:00"
+    assert state.count(0, "lunch") == 1
+    assert state.is_restaurant_visited(index=3)
+    assert state.is_restaurant_visited(name="面馆")
+    assert state.is_attraction_visited(name="宽窄巷子")
+    assert not state.is_attraction_visited(index=3)
+    assert state.exceeds_budget(51) and not state.exceeds_budget(50)
+
+    state.pop()
+    state.pop()
+    assert len(state) == 1
+    assert state.total_cost == 100
+    assert state.current_time == "09:00"
+    assert state.count(0, "lunch") == 0
+    assert not state.is_restaurant_visited(index=3, name="面馆")
+    assert not state.is_attraction_visited(index=7, name="宽窄巷子")
+
+
+def test_no_budget_never_exceeds():
+    state = PlanSearchState()
+    state.push(0, _activity("dinner", "火锅", 10 ** 9))
+    assert not state.exceeds_budget(10 ** 9)
+
+
+class _StubAgent(NesyAgent):
+    """
+    只保留 dfs_poi 的搜索逻辑：一天行程，城内交通为空，完整候选交给 validate 判断
+    """
+
+    def __init__(self, restaurants, attractions, budget, validate):
+        self.query = {"uid": "t", "days": 1, "people_number": 1, "target_city": "成都"}
+        self.memory = {"restaurants": restaurants, "attractions": attractions}
+        self.search_width = None
+        self.TIME_CUT = 60
+        self.time_before_search = time.time()
+        self.llm_inference_time_count = 0
+        self.search_nodes = self.backtrack_count = 0
+        self.restaurants_visiting, self.food_type_visiting = [], []
+        self.attractions_visiting, self.spot_type_visiting, self.attraction_names_visiting = [], [], []
+        self.innercity_transports_ranking_from_query = ["walk"]
+        self.required_budget = budget
+        self.intercity_with_hotel_cost = 0
+        self.plan_state = PlanSearchState(0, budget)
+        self.transport_queries = []
+        self.candidates = []
+        self.validate = validate
+
+    def check_if_too_late(self, *args):
+        return False
+
+    def select_next_poi_type(self, candidates_type, *args):
+        return candidates_type[0], candidates_type
+
+    def ranking_restaurants(self, *args):
+        return list(range(len(self.memory["restaurants"])))
+
+    def ranking_attractions(self, *args):
+        return list(range(len(self.memory["attractions"])))
+
+    def reranking_restaurants_with_constraints(self, *args):
+        return args[-1]
+
+    def reranking_attractions_with_constraints(self, *args):
+        return args[-1]
+
+    def select_poi_time(self, *args, **kwargs):
+        return 60
+
+    def collect_innercity_transport(self, city, start, end, start_time, trans_type):
+        self.transport_queries.append(end)
+        return []
+
+    def constraints_validation(self, query, plan, poi_plan):
+        self.candidates.append([a.get("position") for a in plan[0]["activities"]])
+        if self.validate(plan):
+            return True, plan
+        return False, plan
+
+
+def _transport(begin, end, src, dst):
+    return pd.Series({"BeginTime": begin, "EndTime": end, "From": src, "To": dst,
+                      "Cost": 0, "TrainID": "G1", "FlightID": np.nan})
+
+
+def _poi_plan():
+    return {
+        "go_transport": _transport("07:00", "08:00", "重庆站", "成都东站"),
+        "back_transport": _transport("21:30", "23:00", "成都东站", "重庆站"),
+    }
+
+
+def _restaurants():
+    return pd.DataFrame({
+        "name": ["贵的餐厅", "面馆", "面馆", "火锅"],
+        "price": [500, 30, 30, 80],
+        "cuisine": ["川菜"] * 4,
+        "opentime": ["00:00"] * 4,
+        "endtime": ["23:59"] * 4,
+    })
+
+
+def _attractions():
+    return pd.DataFrame({
+        "name": ["大熊猫基地", "宽窄巷子"],
+        "price": [55, 0],
+        "type": ["动物园", "街区"],
+        "opentime": ["08:00"] * 2,
+        "endtime": ["22:00"] * 2,
+        "recommendmintime": [1, 1],
+    })
+
+
+def test_dfs_poi_prunes_budget_and_repeats_before_transport_queries():
+    agent = _StubAgent(_restaurants(), _attractions(), budget=200, validate=lambda plan: False)
+    success, plan = agent.dfs_poi(agent.query, _poi_plan(), plan=[], current_time="", current_position="")
+
+    assert not success
+    assert agent.candidates
+    for names in agent.candidates:
+        pois = [n for n in names if n not in (None, "大熊猫基地", "宽窄巷子")]
+        assert len(pois) == len(set(pois))
+    # 超出预算的餐厅不会再查询城内交通
+    assert "贵的餐厅" not in agent.transport_queries
+    # 所有 push 都已随回溯 pop
+    assert len(agent.plan_state) == 0 and agent.plan_state.total_cost == 0
+
+
+def test_dfs_poi_returns_first_valid_plan():
+    def has_lunch_and_dinner(plan):
+        types = [a["type"] for a in plan[0]["activities"]]
+        return "lunch" in types and "dinner" in types
+
+    agent = _StubAgent(_restaurants(), _attractions(), budget=None, validate=has_lunch_and_dinner)
+    success, plan = agent.dfs_poi(agent.query, _poi_plan(), plan=[], current_time="", current_position="")
+
+    assert success
+    activities = plan[0]["activities"]
+    assert [a["type"] for a in activities][-1] == "train"
+    assert sum(a["type"] in ("lunch", "dinner") for a in activities) == 2
+    assert agent.plan_state.count(0, "lunch") == 1
@@ -0,0 +1,48 @@
+import os, sys
+import random
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+from geopy.distance import geodesic
+from chinatravel.environment.spatial_index import SpatialIndex, DISTANCE_TOLERANCE
+
+# 南京新街口附近
+CENTER = (32.0415, 118.7781)
+
+
+def _points(n=300, span=0.3, seed=0):
+    rnd = random.Random(seed)
+    lat = [CENTER[0] + rnd.uniform(-span, span) for _ in range(n)]
+    lon = [CENTER[1] + rnd.uniform(-span, span) for _ in range(n)]
+    return lat, lon
+
+
+def test_distances_match_geodesic():
+    lat, lon = _points()
+    index = SpatialIndex(lat, lon)
+    distance = index.distances(*CENTER)
+    for i in range(len(lat)):
+        expected = geodesic(CENTER, (lat[i], lon[i])).km
+        assert abs(distance[i] - expected) <= DISTANCE_TOLERANCE * expected
+
+
+def test_query_topk_and_radius():
+    lat, lon = _points()
+    index = SpatialIndex(lat, lon)
+    expected = sorted(
+        (geodesic(CENTER, (lat[i], lon[i])).km, i) for i in range(len(lat))
+    )
+    idx, distance = index.query(*CENTER, topk=5, dist=20)
+    assert list(idx) == [i for d, i in expected if d <= 20][:5]
+    assert list(distance) == sorted(distance)
+
+    idx, _ = index.query(*CENTER, dist=10)
+    assert set(idx) == {i for d, i in expected if d <= 10}
+
+
+def test_nearest():
+    lat, lon = _points()
+    index = SpatialIndex(lat, lon)
+    i, d = index.nearest(*CENTER)
+    best = min(range(len(lat)), key=lambda j: geodesic(CENTER, (lat[j], lon[j])).km)
+    assert i == best
+    assert SpatialIndex([], []).nearest(*CENTER) == (None, float("inf"))
@@ -0,0 +1,98 @@
+import os, sys
+import pandas as pd
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(PATH_TO_ROOT)
+from src.modules.services.service_basis import ticket_query as ticket_query_mod
+from src.modules.services.service_basis.ticket_store import TicketStore
+from unittest.mock import MagicMock
+
+ROWS = [
+    # 出发日期, 车次, 起始站, 终点站, 出发时间, 到达时间, 历时, 软卧/动卧/一等卧, 硬卧/二等卧, 到达日期
+    ("2025-5-11", "Z258", "重庆北", "上海南", "14:10", "08:18", "18:08", "有", "无", "2025-5-12"),
+    ("2025-5-11", "G1", "北京南", "上海虹桥", "07:00", "11:30", "04:30", "有", None, "2025-5-11"),
+    ("2025-5-10", "G3", "北京南", "上海虹桥", "09:00", "13:30", "04:30", "有", "有", "2025-5-10"),
+    ("2025-5-11", "G5", "北京南", "上海虹桥", "12:00", "16:30", "04:30", "有", "有", "2025-5-11"),
+    ("2025-5-11", "D7", "北京", "上海", "20:00", "08:00", "12:00", "有", "有", "2025-5-12"),
+]
+COLUMNS = ["出发日期", "车次", "起始站", "终点站", "出发时间", "到达时间", "历时", "软卧/动卧/一等卧", "硬卧/二等卧", "到达日期"]
+
+
+@pytest.fixture
+def ticket_csv(tmp_path, monkeypatch):
+    path = tmp_path / "ticket.csv"
+    pd.DataFrame(ROWS, columns=COLUMNS).to_csv(path, index=False)
+    monkeypatch.setattr(ticket_query_mod, "TICKET_CSV_PATH", path)
+    return path
+
+
+@pytest.fixture
+def user_info():
+    # 车票查询不使用用户信息
+    return MagicMock()
+
+
+def test_store_compiled_once(ticket_csv, monkeypatch):
+    store = TicketStore.open(ticket_csv, drop_columns=("软卧/动卧/一等卧",))
+    assert (ticket_csv.parent / "ticket.store" / "meta.json").exists()
+    assert len(store) == len(ROWS)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should load the compiled store")
+    monkeypatch.setattr(TicketStore, "compile", classmethod(fail))
+    reopened = TicketStore.open(ticket_csv, drop_columns=("软卧/动卧/一等卧",))
+    assert reopened.route_range("北京南", "上海虹桥") == store.route_range("北京南", "上海虹桥")
+
+
+def test_route_index_and_date_search(ticket_csv):
+    store = TicketStore.open(ticket_csv)
+    start, end = store.route_range("北京南", "上海虹桥")
+    assert end - start == 3
+    # 线路内按出发日期、出发时间排序
+    assert [store.row(i)["车次"] for i in range(start, end)] == ["G3", "G1", "G5"]
+    day = (pd.Timestamp("2025-5-11") - pd.Timestamp(0)).days
+    lo, hi = store.date_range(start, end, day)
+    assert [store.row(i)["车次"] for i in range(lo, hi)] == ["G1", "G5"]
+    assert store.route_range("上海虹桥", "北京南") is None
+    assert store.route_range("不存在", "北京南") is None
+
+
+def test_stale_store_is_rebuilt(ticket_csv):
+    TicketStore.open(ticket_csv)
+    pd.DataFrame(ROWS[:2], columns=COLUMNS).to_csv(ticket_csv, index=False)
+    os.utime(ticket_csv, ns=(0, 0))
+    assert len(TicketStore.open(ticket_csv)) == 2
+
+
+def test_query_filters(ticket_csv, user_info):
+    query = ticket_query_mod.TicketQuery()
+    result = query({"起始站": "北京南", "终点站": "上海虹桥", "发车日期": "2025-5-11", "最早发车时刻": "08:00"}, user_info, [])
+    assert [r["车次"] for r in result] == ["G5"]
+    row = result[0]
+    assert row["出发日期"] == pd.Timestamp("2025-05-11")
+    assert row["出发时间"].strftime("%H:%M") == "12:00"
+    assert "软卧/动卧/一等卧" not in row
+
+    # 缺失值不输出
+    result = query({"起始站": "北京南", "终点站": "上海虹桥", "发车日期": "2025-5-11", "最晚发车时刻": "08:00"}, user_info, [])
+    assert [r["车次"] for r in result] == ["G1"]
+    assert "硬卧/二等卧" not in result[0]
+
+
+def test_query_messages(ticket_csv, user_info):
+    query = ticket_query_mod.TicketQuery()
+    result = query({"起始站": "北京南", "终点站": "上海虹桥", "发车日期": "2025-6-1"}, user_info, [])
+    assert result[0] == "出发日期为2025-06-01的车次不存在，可用的出发日期有：2025-05-10, 2025-05-11"
+    assert len(result) == 4
+
+    result = query({"起始站": "北京", "终点站": "上海"}, user_info, [])
+    assert result[0].startswith("找到") and "北京南 → 上海虹桥" in result[0]
+
+    result = query({"起始站": "重庆北", "终点站": "北京南"}, user_info, [])
+    assert "找不到从" in result[0]
+
+
+def test_mapping_date_range(ticket_csv):
+    query = ticket_query_mod.TicketQueryMappingDate()
+    assert query.departure_date_range == [pd.Timestamp("2025-05-10"), pd.Timestamp("2025-05-11")]
+    assert query.arrive_date_range == [pd.Timestamp("2025-05-10"), pd.Timestamp("2025-05-12")]
@@ -0,0 +1,47 @@
+import os, sys
+import random
+import itertools
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+from chinatravel.environment.tools.transportation.apis import (
+    MetroRouteTable,
+    apply_start_time,
+    build_graph,
+    dijkstra,
+)
+
+
+def _random_lines(seed=0, n_lines=6, n_stations=40):
+    rnd = random.Random(seed)
+    stations = ["站{}".format(i) for i in range(n_stations)]
+    return {
+        "{}号线".format(i): rnd.sample(stations, rnd.randint(4, 12))
+        for i in range(n_lines)
+    }
+
+
+def test_route_table_matches_dijkstra():
+    for seed in range(5):
+        graph = build_graph(_random_lines(seed))
+        table = MetroRouteTable(graph)
+        for start, end in itertools.product(graph, graph):
+            assert table.path(start, end) == dijkstra(graph, start, end)
+
+
+def test_route_table_unknown_station():
+    table = MetroRouteTable(build_graph({"1号线": ["A", "B", "C"]}))
+    assert table.path("A", "X") == []
+    assert table.path("X", "X") == ["X"]
+
+
+def test_apply_start_time():
+    route = (
+        ("夫子庙", "三山街-地铁站", "walk", 0.25, 0, 1.25),
+        ("三山街-地铁站", "新街口-地铁站", "metro", 0.1, 2, 3.0),
+    )
+    transports = apply_start_time(route, "09:50")
+    assert [(t["start_time"], t["end_time"]) for t in transports] == [
+        ("09:50", "10:05"),
+        ("10:05", "10:11"),
+    ]
+    assert transports[1]["cost"] == 2
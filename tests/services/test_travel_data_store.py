@@ -0,0 +1,81 @@
+import os, sys
+import threading
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(os.path.join(PATH_TO_ROOT, 'src/modules/services/service_basis/travel_tool'))
+import pandas as pd
+from chinatravel.environment.data_store import TravelDataStore, first_value_by_name, first_row_by_name, lookup
+
+
+def test_table_loaded_once(tmp_path):
+    store = TravelDataStore()
+    calls = []
+
+    def loader(path):
+        calls.append(path)
+        return {"path": path}
+
+    first = store.get("poi", str(tmp_path), loader)
+    second = store.get("poi", str(tmp_path) + "/./", loader)
+    assert first is second
+    assert len(calls) == 1
+    assert store.is_loaded("poi", str(tmp_path))
+
+
+def test_tables_keyed_by_kind(tmp_path):
+    store = TravelDataStore()
+    a = store.get("attractions", str(tmp_path), lambda p: ["attractions"])
+    b = store.get("restaurants", str(tmp_path), lambda p: ["restaurants"])
+    assert a == ["attractions"] and b == ["restaurants"]
+
+
+def test_concurrent_first_access(tmp_path):
+    store = TravelDataStore()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader(path):
+        calls.append(path)
+        return object()
+
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(store.get("subways", str(tmp_path), loader))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_clear(tmp_path):
+    store = TravelDataStore()
+    store.get("poi", str(tmp_path), lambda p: {})
+    store.clear()
+    assert not store.is_loaded("poi", str(tmp_path))
+
+
+def test_first_value_by_name_matches_select():
+    table = pd.DataFrame(
+        {"name": ["夫子庙", "中山陵", "夫子庙"], "type": ["历史古迹", "公园", "博物馆/纪念馆"]}
+    )
+    index = first_value_by_name(table, "type")
+    assert index["夫子庙"] == "历史古迹"
+    assert index["中山陵"] == "公园"
+    assert index.get("玄武湖", "") == ""
+
+
+def test_first_row_by_name_matches_select():
+    table = pd.DataFrame(
+        {"name": ["夫子庙", "中山陵", "夫子庙"], "price": [0, 10, 20], "opentime": ["08:00", "09:00", "10:00"]}
+    )
+    index = first_row_by_name(table)
+    assert dict(index["夫子庙"]) == {"name": "夫子庙", "price": 0, "opentime": "08:00"}
+    assert index["中山陵"]["price"] == 10
+    assert lookup(index, "玄武湖") is None
+    assert lookup(index, ["夫子庙"]) is None
+
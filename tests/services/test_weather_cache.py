@@ -0,0 +1,121 @@
+import os, sys
+import json
+import time
+import threading
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from unittest.mock import MagicMock
+import pytest
+PATH_TO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(PATH_TO_ROOT)
+from src.modules.services.service_basis import weather_query as weather_query_mod
+from src.modules.services.service_basis.weather_query import WeatherQuery
+
+CITIES = {"data": {"cityByLetter": {
+    "B": [{"name": "北京", "adcode": "110000"}],
+    "S": [{"name": "上海", "adcode": "310000"}, {"name": "深圳", "adcode": "440300"}],
+}}}
+
+
+def _cast(date):
+    return {"date": date, "week": "6", "dayweather": "晴", "nightweather": "多云", "daytemp": "30",
+            "nighttemp": "20", "daywind": "南", "nightwind": "南", "daypower": "1-3", "nightpower": "1-3"}
+
+
+class StubAMap:
+    """
+    本地模拟的高德天气接口：记录每个 adcode 的请求次数，可设置响应延迟
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                adcode = parse_qs(urlparse(self.path).query)["city"][0]
+                with stub.lock:
+                    stub.calls[adcode] = stub.calls.get(adcode, 0) + 1
+                time.sleep(stub.delay)
+                if adcode == "440300":
+                    body = {"status": "0", "info": "INVALID_USER_KEY"}
+                else:
+                    body = {"status": "1", "forecasts": [{"adcode": adcode, "casts": [_cast("2025-06-07"), _cast("2025-06-08")]}]}
+                data = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端已超时断开
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v3/weather/weatherInfo"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    server = StubAMap()
+    yield server
+    server.server.shutdown()
+
+
+@pytest.fixture
+def weather(stub, tmp_path, monkeypatch):
+    path = tmp_path / "citycode.json"
+    path.write_text(json.dumps(CITIES, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(weather_query_mod, "city_file_path", path)
+    return WeatherQuery(url=stub.url, cache_ttl=60)
+
+
+def test_forecast_cached_per_adcode(weather, stub):
+    user_info = MagicMock()
+    first = weather({"城市名": "北京", "日期": "2025-06-08"}, user_info, [])
+    assert first["日期"] == "2025-06-08"
+    assert first["白天温度"] == "30°C"
+    assert weather({"城市名": "北京"}, user_info, [])["日期"] == "2025-06-07"
+    assert "错误" in weather({"城市名": "北京", "日期": "2025-06-09"}, user_info, [])
+    assert stub.calls == {"110000": 1}
+
+    weather.clear_cache()
+    weather({"城市名": "北京"}, user_info, [])
+    assert stub.calls == {"110000": 2}
+
+
+def test_failed_status_not_cached(weather, stub):
+    for _ in range(2):
+        assert weather({"城市名": "深圳"}, MagicMock(), [])["错误"] == "获取深圳天气信息失败"
+    assert stub.calls == {"440300": 2}
+
+
+def test_unknown_city_suggests_names(weather, stub):
+    result = weather({"城市名": "北京市"}, MagicMock(), [])
+    assert "北京" in result["错误"]
+    assert stub.calls == {}
+
+
+def test_concurrent_requests_single_flight(weather, stub):
+    stub.delay = 0.3
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: weather({"城市名": "上海"}, MagicMock(), []), range(8)))
+    assert all(result["日期"] == "2025-06-07" for result in results)
+    assert stub.calls == {"310000": 1}
+
+
+def test_timeout_reported(stub, tmp_path, monkeypatch):
+    path = tmp_path / "citycode.json"
+    path.write_text(json.dumps(CITIES, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(weather_query_mod, "city_file_path", path)
+    weather = WeatherQuery(url=stub.url, timeout=0.1)
+    stub.delay = 0.5
+    assert weather({"城市名": "北京"}, MagicMock(), [])["错误"].startswith("天气查询服务异常")
@@ -0,0 +1,59 @@
+import time
+import jwt
+import pytest
+from fastapi import HTTPException
+from src.utils import auth_dependency
+from src.utils.auth_dependency import VerifiedTokenCache, decode_user_id, encode_user_id, get_current_user
+
+
+def test_hit_skips_signature_check(monkeypatch):
+    cache = VerifiedTokenCache()
+    token = encode_user_id("u1")
+    assert decode_user_id(token, cache) == "u1"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached token should not be decoded again")
+    monkeypatch.setattr(auth_dependency.jwt, "decode", fail)
+    assert decode_user_id(token, cache) == "u1"
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalid_token_not_cached():
+    cache = VerifiedTokenCache()
+    forged = jwt.encode({"user_id": "u1"}, "other_key", algorithm="HS256")
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            decode_user_id(forged, cache)
+    assert cache.stats()["size"] == 0
+
+
+def test_exp_is_honored():
+    cache = VerifiedTokenCache()
+    exp = int(time.time()) + 1
+    token = jwt.encode({"user_id": "u1", "exp": exp}, auth_dependency.SECRET_KEY, algorithm="HS256")
+    assert decode_user_id(token, cache) == "u1"
+    assert cache.get(token) == "u1"
+    time.sleep(max(0.0, exp - time.time()) + 0.05)
+    assert cache.get(token) is None
+    # 过期后回到 jwt.decode，由它拒绝
+    with pytest.raises(HTTPException):
+        decode_user_id(token, cache)
+
+
+def test_lru_bound():
+    cache = VerifiedTokenCache(max_size=2)
+    tokens = [encode_user_id(f"u{i}") for i in range(3)]
+    for token in tokens:
+        decode_user_id(token, cache)
+    assert cache.get(tokens[0]) is None
+    assert cache.get(tokens[2]) == "u2"
+    with pytest.raises(ValueError):
+        VerifiedTokenCache(max_size=0)
+
+
+def test_get_current_user_uses_shared_cache():
+    auth_dependency.verified_token_cache.clear()
+    header = f"Bearer {encode_user_id('u9')}"
+    assert get_current_user(header) == "u9"
+    assert get_current_user(header) == "u9"
+    assert auth_dependency.verified_token_cache.get(header.split(" ")[1]) == "u9"
@@ -3,6 +3,13 @@ import pytest
 from unittest.mock import patch, MagicMock
 from src.utils import chatgpt
 
+@pytest.fixture(autouse=True)
+def reset_shared_clients():
+    # 共享客户端会缓存首次创建的实例，每个用例前后重置，保证 patch 的 OpenAI 生效
+    chatgpt.reset_llm_clients()
+    yield
+    chatgpt.reset_llm_clients()
+
 def make_fake_chunk(content):
     mock_chunk = MagicMock()
     mock_choice = MagicMock()
@@ -36,6 +43,42 @@ def test_feed_LLM(mock_openai):
     assert result == [fake_chunk]
     mock_client.chat.completions.create.assert_called_once()
 
+def test_llm_client_is_shared():
+    with patch('src.utils.chatgpt.OpenAI') as mock_openai:
+        first = chatgpt.get_llm_client()
+        second = chatgpt.get_llm_client()
+    assert first is second
+    mock_openai.assert_called_once()
+    kwargs = mock_openai.call_args.kwargs
+    assert kwargs["max_retries"] == chatgpt._get_client_config()["max_retries"]
+    assert kwargs["http_client"] is not None
+
+def test_async_llm_client_per_event_loop():
+    import asyncio
+    async def get_clients():
+        return chatgpt.get_async_llm_client(), chatgpt.get_async_llm_client()
+    with patch('src.utils.chatgpt.AsyncOpenAI') as mock_async_openai:
+        mock_async_openai.side_effect = lambda **kwargs: MagicMock()
+        a, b = asyncio.run(get_clients())
+        c, _ = asyncio.run(get_clients())
+    assert a is b
+    assert a is not c
+
+@patch('src.utils.chatgpt.AsyncOpenAI')
+def test_afeed_LLM_full(mock_async_openai):
+    import asyncio
+    fake_chunks = [make_fake_chunk('he'), make_fake_chunk('llo')]
+    async def fake_stream():
+        for chunk in fake_chunks:
+            yield chunk
+    async def fake_create(**kwargs):
+        return fake_stream()
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = fake_create
+    mock_async_openai.return_value = mock_client
+    llm = chatgpt.agather_llm_output(chatgpt.afeed_LLM_full)
+    assert asyncio.run(llm([{"role": "user", "content": "hi"}])) == 'hello'
+
 def test_gather_llm_output():
     @chatgpt.gather_llm_output
     def fake_fn():
@@ -0,0 +1,35 @@
+import pytest
+from src.utils import ttl_cache
+from src.utils.ttl_cache import TTLLRUCache
+
+
+def test_lru_ttl_and_stats(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLLRUCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # b 最久未使用，被淘汰
+    assert cache.get("b") is None
+    # 单个条目的 ttl 覆盖默认值
+    cache.put("d", 4, ttl=20)
+    now[0] += 11
+    assert cache.get("c") is None
+    assert cache.get("d") == 4
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 1, "hit_rate": 0.5}
+    with pytest.raises(ValueError):
+        TTLLRUCache(max_size=0)
+
+
+def test_on_remove():
+    removed = []
+    cache = TTLLRUCache(max_size=1, on_remove=lambda key, value: removed.append((key, value)))
+    cache.put("a", 1)
+    cache.put("a", 2)
+    cache.put("b", 3)
+    cache.pop("b")
+    cache.pop("missing")
+    assert removed == [("a", 1), ("a", 2), ("b", 3)]
+    assert len(cache) == 0
@@ -0,0 +1,44 @@
+import time
+import concurrent.futures
+from src.utils.auth_dependency import VerifiedTokenCache, decode_user_id, encode_user_id
+
+# jwt.decode（HS256 校验签名）与缓存命中在并发下的耗时对比
+# 单独运行：python -m tests.utils.token_cache_speed_test
+
+
+def run_benchmark(workers: int = 8, requests_per_worker: int = 2000, users: int = 100) -> dict:
+    tokens = [encode_user_id(f"user_{i}") for i in range(users)]
+
+    def worker(cache, offset):
+        for i in range(requests_per_worker):
+            decode_user_id(tokens[(offset + i) % users], cache)
+
+    def timed(cache):
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda offset: worker(cache, offset), range(workers)))
+        return time.perf_counter() - start
+
+    total = workers * requests_per_worker
+    decode_seconds = timed(None)
+    cache = VerifiedTokenCache()
+    cached_seconds = timed(cache)
+    return {
+        "requests": total,
+        "decode_us_per_request": decode_seconds / total * 1e6,
+        "cached_us_per_request": cached_seconds / total * 1e6,
+        "speedup": decode_seconds / cached_seconds,
+        "hit_rate": cache.stats()["hit_rate"],
+    }
+
+
+def test_token_cache_speed():
+    result = run_benchmark(workers=4, requests_per_worker=500)
+    print(result)
+    assert result["hit_rate"] > 0.9
+    assert result["cached_us_per_request"] < result["decode_us_per_request"]
+
+
+if __name__ == "__main__":
+    for workers in (1, 8, 32):
+        print(workers, run_benchmark(workers=workers))